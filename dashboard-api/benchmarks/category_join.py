@@ -0,0 +1,83 @@
+"""
+Benchmark del join item -> categoría usado por GET /items/.
+
+Compara el camino anterior (una lectura de categoría por item) con el join
+por lotes de FirebaseStorage (un multi-get por categorías distintas).
+
+Uso:
+    python -m benchmarks.category_join --items 5000 --categories 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.firestore_fake import FakeFirestoreClient  # noqa: E402
+from storage.firebase_storage import FirebaseStorage  # noqa: E402
+
+client = FakeFirestoreClient()
+storage = FirebaseStorage(client)
+
+
+def seed(item_count: int, category_count: int):
+    """Carga los documentos directamente en el cliente falso (sin contar lecturas)"""
+    categories = client._data["categories"]
+    items = client._data["items"]
+    for i in range(category_count):
+        category_id = storage.generate_id()
+        categories[category_id] = {"id": category_id, "name": f"Categoría {i}"}
+    category_ids = list(categories)
+    for i in range(item_count):
+        item_id = storage.generate_id()
+        items[item_id] = {
+            "id": item_id,
+            "name": f"Producto {i}",
+            "description": "",
+            "quantity": random.randint(0, 100),
+            "price": round(random.uniform(1, 500), 2),
+            "categoryId": random.choice(category_ids),
+        }
+
+
+def per_item_lookup():
+    """Camino anterior: una lectura de categoría por cada item"""
+    items = storage.get_all_items()
+    return [storage.get_category_by_id(item.categoryId) for item in items]
+
+
+def measure(name, fn):
+    client.counter.reset()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "path": name,
+        "items": len(result),
+        "documents_read": client.counter.documents_read,
+        "round_trips": client.counter.round_trips,
+        "seconds": round(elapsed, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--categories", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    seed(args.items, args.categories)
+
+    results = [
+        measure("per_item_lookup", per_item_lookup),
+        measure("batched_join", storage.get_all_items_with_category),
+    ]
+    print(json.dumps({"items": args.items, "categories": args.categories, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
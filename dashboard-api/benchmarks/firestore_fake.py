@@ -0,0 +1,105 @@
+"""
+Cliente de Firestore en memoria para benchmarks.
+
+Implementa solo la parte de la API de firestore que usa FirebaseStorage y
+cuenta las lecturas de documentos y los round trips, que es lo que cobra
+Firestore y lo que domina la latencia.
+"""
+from collections import defaultdict
+
+
+class ReadCounter:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.documents_read = 0
+        self.round_trips = 0
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        counter = self._collection._client.counter
+        counter.round_trips += 1
+        counter.documents_read += 1
+        return FakeSnapshot(self.id, self._collection._docs.get(self.id))
+
+    def set(self, data):
+        self._collection._docs[self.id] = dict(data)
+
+    def update(self, data):
+        self._collection._docs[self.id].update(data)
+
+    def delete(self):
+        self._collection._docs.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), limit=None):
+        self._collection = collection
+        self._filters = list(filters)
+        self._limit = limit
+
+    def where(self, field, op, value):
+        if op != "==":
+            raise NotImplementedError(op)
+        return FakeQuery(self._collection, self._filters + [(field, value)], self._limit)
+
+    def limit(self, count):
+        return FakeQuery(self._collection, self._filters, count)
+
+    def stream(self):
+        counter = self._collection._client.counter
+        counter.round_trips += 1
+        returned = 0
+        for doc_id, data in list(self._collection._docs.items()):
+            if all(data.get(field) == value for field, value in self._filters):
+                if self._limit is not None and returned >= self._limit:
+                    break
+                counter.documents_read += 1
+                returned += 1
+                yield FakeSnapshot(doc_id, data)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, name):
+        self._client = client
+        self._docs = client._data[name]
+        super().__init__(self)
+
+    def document(self, doc_id):
+        return FakeDocumentReference(self, doc_id)
+
+
+class FakeFirestoreClient:
+    def __init__(self):
+        self._data = defaultdict(dict)
+        self.counter = ReadCounter()
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.counter.round_trips += 1
+        self.counter.documents_read += len(refs)
+        for ref in refs:
+            yield FakeSnapshot(ref.id, ref._collection._docs.get(ref.id))
+
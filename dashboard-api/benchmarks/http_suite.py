@@ -0,0 +1,315 @@
+"""
+Benchmark HTTP de los routers ejecutando main.app en el mismo proceso.
+
+Siembra un backend local (memoria o SQLite) con el tamaño de datos indicado y
+lanza cada escenario con los niveles de concurrencia pedidos. Reporta en JSON
+el throughput, las latencias p50/p95/p99 y las llamadas al storage por request,
+para comparar resultados entre commits antes de desplegar.
+
+Uso:
+    python -m benchmarks.http_suite --items 1000,10000,100000 --categories 20 --users 50 \\
+        --concurrency 1,16,64 --requests 200 --output results.json
+
+El login usa bcrypt con BCRYPT_ROUNDS (por defecto 12), igual que en producción.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# El backend se reemplaza por uno sembrado antes de cada escenario; evitar inicializar Firebase
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+# Llaves JWT propias del benchmark (la aplicación no las crea)
+os.environ.setdefault("JWT_KEYS_DIR", tempfile.mkdtemp(prefix="benchmark-jwt-keys-"))
+
+import httpx  # noqa: E402
+import main  # noqa: E402
+from storage.async_storage import storage  # noqa: E402
+from storage.memory_storage import MemoryStorage  # noqa: E402
+from storage.sqlite_storage import SQLiteStorage  # noqa: E402
+from utils.jwt_handler import create_access_token, keyring  # noqa: E402
+from utils.password_handler import hash_password  # noqa: E402
+
+PASSWORD = "benchmark123"
+SEED_CHUNK_SIZE = 1000
+
+
+class CountingBackend:
+    """Envuelve un backend y cuenta las llamadas que hacen los routers"""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            self.calls[name] += 1
+            return attr(*args, **kwargs)
+
+        return method
+
+
+class Dataset:
+    """Backend sembrado y los IDs que usan los escenarios"""
+
+    def __init__(self, backend, item_count: int, category_count: int, user_count: int):
+        self.backend = backend
+        password_hash = hash_password(PASSWORD)
+
+        self.users = [
+            backend.create_user({
+                "name": f"Usuario {i}",
+                "lastName": "Benchmark",
+                "email": f"user{i}@example.com",
+                "password": password_hash,
+            })
+            for i in range(user_count)
+        ]
+        self.tokens = [
+            create_access_token({"id": user.id, "email": user.email, "name": user.name, "lastName": user.lastName})
+            for user in self.users
+        ]
+        self.category_ids = [
+            backend.create_category({"name": f"Categoría {i}"}).id
+            for i in range(category_count)
+        ]
+        self.item_ids = []
+        for start in range(0, item_count, SEED_CHUNK_SIZE):
+            items = backend.bulk_create_items([
+                {
+                    "name": f"Producto {i}",
+                    "description": "",
+                    "quantity": random.randint(0, 100),
+                    "price": round(random.uniform(1, 500), 2),
+                    "categoryId": random.choice(self.category_ids),
+                }
+                for i in range(start, min(start + SEED_CHUNK_SIZE, item_count))
+            ])
+            self.item_ids.extend(item.id for item in items)
+        # Categorías que pueden modificar y eliminar los escenarios category_update y category_delete
+        self.created_category_ids = []
+
+    def track_created_categories(self):
+        """Registra las categorías creadas por category_create para que delete las limpie"""
+        seeded = set(self.category_ids)
+        self.created_category_ids = [
+            category_id for category_id in self.backend.get_category_names()
+            if category_id not in seeded
+        ]
+
+    def ensure_created_categories(self, count: int):
+        """Crea directamente en el backend las categorías que falten para update y delete"""
+        while len(self.created_category_ids) < count:
+            category = self.backend.create_category({"name": f"Temporal {len(self.created_category_ids)}"})
+            self.created_category_ids.append(category.id)
+
+
+def login(data: Dataset, i: int):
+    user = data.users[i % len(data.users)]
+    return "POST", "/auth/login", {"json": {"email": user.email, "password": PASSWORD}}
+
+
+def me(data: Dataset, i: int):
+    token = data.tokens[i % len(data.tokens)]
+    return "GET", "/auth/me", {"headers": {"Authorization": f"Bearer {token}"}}
+
+
+def items_list(data: Dataset, i: int):
+    return "GET", "/items/", {}
+
+
+def items_page(data: Dataset, i: int):
+    return "GET", "/items/", {"params": {"limit": 50}}
+
+
+def item_detail(data: Dataset, i: int):
+    return "GET", f"/items/{random.choice(data.item_ids)}", {}
+
+
+def items_by_category(data: Dataset, i: int):
+    return "GET", f"/items/by-category/{random.choice(data.category_ids)}", {}
+
+
+def categories_list(data: Dataset, i: int):
+    return "GET", "/categories/", {}
+
+
+def category_detail(data: Dataset, i: int):
+    return "GET", f"/categories/{random.choice(data.category_ids)}", {}
+
+
+def category_create(data: Dataset, i: int):
+    return "POST", "/categories/", {"json": {"name": f"Nueva {i}"}}
+
+
+def category_update(data: Dataset, i: int):
+    category_id = data.created_category_ids[i % len(data.created_category_ids)]
+    return "PUT", f"/categories/{category_id}", {"json": {"name": f"Editada {i}"}}
+
+
+def category_delete(data: Dataset, i: int):
+    return "DELETE", f"/categories/{data.created_category_ids.pop()}", {}
+
+
+# Escenarios en orden de ejecución (update y delete usan las categorías creadas antes)
+SCENARIOS = {
+    "auth_login": login,
+    "auth_me": me,
+    "items_list": items_list,
+    "items_page": items_page,
+    "item_detail": item_detail,
+    "items_by_category": items_by_category,
+    "categories_list": categories_list,
+    "category_detail": category_detail,
+    "category_create": category_create,
+    "category_update": category_update,
+    "category_delete": category_delete,
+}
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Percentil por rango más cercano"""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, data: Dataset, counter: CountingBackend, build, request_count: int, concurrency: int):
+    """Ejecuta `request_count` requests con `concurrency` clientes simultáneos"""
+    latencies = []
+    statuses = Counter()
+    next_index = iter(range(request_count))
+
+    async def worker():
+        for i in next_index:
+            method, url, kwargs = build(data, i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    counter.calls.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    storage_calls = sum(counter.calls.values())
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+        "storage_calls_per_request": round(storage_calls / len(latencies), 3),
+        "storage_calls": dict(counter.calls.most_common()),
+    }
+
+
+def create_backend(kind: str, workdir: str, name: str):
+    if kind == "sqlite":
+        return SQLiteStorage(os.path.join(workdir, f"{name}.db"))
+    return MemoryStorage()
+
+
+async def run_suite(args):
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        with tempfile.TemporaryDirectory() as workdir:
+            for item_count in args.items:
+                random.seed(args.seed)
+                backend = create_backend(args.backend, workdir, f"items-{item_count}")
+                data = Dataset(backend, item_count, args.categories, args.users)
+                counter = CountingBackend(backend)
+                storage.use_backend(counter)
+
+                for concurrency in args.concurrency:
+                    for name in args.scenarios:
+                        build = SCENARIOS[name]
+                        if name in ("category_update", "category_delete"):
+                            data.ensure_created_categories(args.requests)
+                        # Ronda de calentamiento sin medir (excepto las escrituras que crean o consumen IDs)
+                        if name not in ("category_create", "category_delete") and args.warmup:
+                            await run_scenario(client, data, counter, build, args.warmup, concurrency)
+                        result = await run_scenario(client, data, counter, build, args.requests, concurrency)
+                        if name == "category_create":
+                            data.track_created_categories()
+                        results.append({
+                            "scenario": name,
+                            "items": item_count,
+                            "concurrency": concurrency,
+                            **result,
+                        })
+                        print(
+                            f"{name:<18} items={item_count:<7} c={concurrency:<4} "
+                            f"{result['throughput_rps']:>9} req/s  p99={result['latency_ms']['p99']} ms",
+                            file=sys.stderr
+                        )
+    await main.shutdown_pools()
+    return results
+
+
+def parse_int_list(value: str):
+    return [int(part) for part in value.split(",") if part]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=parse_int_list, default=[1000], help="Tamaños de inventario, separados por coma")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 16], help="Niveles de concurrencia")
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidos por escenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Requests sin medir antes de cada escenario")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS))
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(unknown)}")
+
+    keyring.ensure_key()
+    results = asyncio.run(run_suite(args))
+    report = json.dumps({
+        "config": {
+            "backend": args.backend,
+            "categories": args.categories,
+            "users": args.users,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+        },
+        "results": results,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,146 @@
+"""
+Benchmark de GET /items/search: índice invertido contra recorrer todos los items.
+
+Mide la carga inicial del índice, la actualización por cambio y la latencia de
+consultas de una palabra, de prefijos (búsqueda mientras se escribe), de varias
+palabras y con tildes, comparada con filtrar todos los documentos por
+subcadena como hacía el frontend.
+
+Uso:
+    python -m benchmarks.search --items 10000,100000 --repeat 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# El índice se carga directamente con los documentos; evitar inicializar Firebase
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from storage.base import DocumentChange  # noqa: E402
+from utils.search_index import ItemSearchIndex, fold  # noqa: E402
+
+NOUNS = (
+    "caja", "tornillo", "cable", "monitor", "teclado", "silla", "lámpara", "papel", "cartucho", "batería",
+    "adaptador", "mesa", "carpeta", "cinta", "disco", "impresora", "router", "cámara", "parlante", "cargador",
+    "cuaderno", "bolígrafo", "tijera", "pegamento", "archivador", "escritorio", "auricular", "micrófono",
+    "proyector", "pizarra", "extensión", "enchufe", "ventilador", "calculadora", "etiqueta", "sobre",
+)
+ADJECTIVES = (
+    "rojo", "azul", "negro", "blanco", "pequeño", "grande", "inalámbrico", "ergonómico", "metálico", "plástico",
+    "reforzado", "compacto", "económico", "profesional", "portátil", "recargable", "térmico", "adhesivo",
+)
+BRANDS = ("acme", "nórdica", "técnica", "omega", "andina", "pacífico", "austral", "solar", "güemes", "cóndor")
+
+QUERIES = (
+    "tornillo",            # una palabra
+    "cam",                 # prefijo corto
+    "impre",               # prefijo
+    "camara inalamb",      # varias palabras sin tildes
+    "Lámpara azul",        # con tildes y mayúsculas
+    "bateria recargable acme",
+    "xz",                  # sin resultados
+)
+
+
+def build_rows(count: int):
+    """Documentos de items con nombres y descripciones en español y códigos de modelo"""
+    rows = []
+    for i in range(count):
+        name = f"{random.choice(NOUNS).capitalize()} {random.choice(ADJECTIVES)} {random.choice(BRANDS)} m{random.randint(100, 99999)}"
+        description = " ".join(random.choices(NOUNS + ADJECTIVES + BRANDS, k=random.randint(0, 15)))
+        rows.append({
+            "id": f"{i:032x}",
+            "name": name,
+            "description": description,
+            "quantity": random.randint(0, 100),
+            "price": round(random.uniform(1, 500), 2),
+            "categoryId": f"cat-{random.randint(0, 19):04d}",
+        })
+    return rows
+
+
+def scan(rows, query: str, limit: int):
+    """Camino anterior: recorrer todos los documentos buscando la subcadena"""
+    needle = fold(query)
+    matches = [data for data in rows if needle in fold(data["name"]) or needle in fold(data["description"])]
+    return matches[:limit]
+
+
+def timed(func, repeat: int) -> float:
+    """Mediana en milisegundos"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return round(statistics.median(durations) * 1000, 3)
+
+
+def measure(item_count: int, repeat: int, limit: int):
+    rows = build_rows(item_count)
+    index = ItemSearchIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    load_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    # Actualizaciones incrementales: modificar, agregar y eliminar
+    changes = []
+    for data in random.sample(rows, min(200, len(rows))):
+        changes.append(DocumentChange("modified", data["id"], {**data, "name": data["name"] + " nuevo"}))
+    update_start = time.perf_counter()
+    for change in changes:
+        index.apply([change])
+    update_us = round((time.perf_counter() - update_start) / len(changes) * 1_000_000, 1)
+
+    queries = {}
+    for query in QUERIES:
+        results = index.search(query, limit)
+        queries[query] = {
+            "results": len(results),
+            "index_ms": timed(lambda: index.search(query, limit), repeat),
+            "scan_ms": timed(lambda: scan(rows, query, limit), max(1, repeat // 5)),
+        }
+    return {"items": item_count, "load_ms": load_ms, "update_us": update_us, "queries": queries}
+
+
+def parse_int_list(value: str):
+    return [int(part) for part in value.split(",") if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=parse_int_list, default=[100000], help="Tamaños del inventario, separados por coma")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por consulta (se reporta la mediana)")
+    parser.add_argument("--limit", type=int, default=20, help="Resultados por consulta")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = []
+    for item_count in args.items:
+        result = measure(item_count, args.repeat, args.limit)
+        results.append(result)
+        print(f"items={item_count:<7} carga {result['load_ms']} ms  actualización {result['update_us']} µs/cambio", file=sys.stderr)
+        for query, data in result["queries"].items():
+            print(
+                f"  {query!r:<28} {data['results']:>3} resultados  índice {data['index_ms']} ms  recorrido {data['scan_ms']} ms",
+                file=sys.stderr
+            )
+
+    report = json.dumps({"repeat": args.repeat, "seed": args.seed, "results": results}, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
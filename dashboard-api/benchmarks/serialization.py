@@ -0,0 +1,193 @@
+"""
+Benchmark de conversión, serialización y compresión de GET /items/.
+
+Conversión: documento -> Item -> copia campo a campo en ItemWithCategory
+(camino anterior) contra una sola validación por lote de los documentos como
+ItemWithCategory (BaseStorage._to_items_with_category).
+
+Serialización: validar contra response_model=List[ItemWithCategory],
+jsonable_encoder y json de la biblioteca estándar, sin comprimir (anterior),
+contra FastJSONResponse con orjson; además mide el tamaño en la red con gzip
+y brotli, usando los mismos niveles que CompressionMiddleware.
+
+Uso:
+    python -m benchmarks.serialization --items 1000,10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from models.category import Category  # noqa: E402
+from models.item import Item, ItemWithCategory  # noqa: E402
+from storage.memory_storage import MemoryStorage  # noqa: E402
+from utils.compression import _Compressor, brotli  # noqa: E402
+from utils.responses import FastJSONResponse  # noqa: E402
+
+WORDS = (
+    "caja", "tornillo", "cable", "monitor", "teclado", "silla", "lámpara", "papel", "cartucho", "batería",
+    "adaptador", "mesa", "carpeta", "cinta", "disco", "impresora", "router", "cámara", "parlante", "cargador",
+)
+
+RESPONSE_FIELD = create_response_field(name="Response_get_all_items", type_=List[ItemWithCategory])
+
+
+def build_rows(count: int, category_count: int = 20) -> List[dict]:
+    """Documentos de items como los retorna el storage"""
+    categories = [f"cat-{i:04d}" for i in range(category_count)]
+    return [
+        {
+            "id": f"{i:032x}",
+            "name": " ".join(random.sample(WORDS, 2)).capitalize() + f" {i}",
+            "description": " ".join(random.choices(WORDS, k=random.randint(0, 12))),
+            "quantity": random.randint(0, 100),
+            "price": round(random.uniform(1, 500), 2),
+            "categoryId": random.choice(categories),
+            "createdAt": "2024-01-01T00:00:00",
+        }
+        for i in range(count)
+    ]
+
+
+class BenchmarkStorage(MemoryStorage):
+    """Storage en memoria cuyas categorías se resuelven sin lecturas"""
+
+    def get_categories_by_ids(self, category_ids):
+        return {category_id: Category(id=category_id, name=f"Categoría {category_id[4:]}") for category_id in set(category_ids)}
+
+
+def convert_before(storage: BenchmarkStorage, rows: List[dict]) -> List[ItemWithCategory]:
+    """Documento -> Item y luego copia campo a campo en ItemWithCategory"""
+    items = [Item(
+        id=data["id"],
+        name=data["name"],
+        quantity=data["quantity"],
+        price=data["price"],
+        categoryId=data["categoryId"],
+        description=data.get("description", "")
+    ) for data in rows]
+    categories = storage.get_categories_by_ids(item.categoryId for item in items)
+    return [ItemWithCategory(
+        id=item.id,
+        name=item.name,
+        description=item.description,
+        quantity=item.quantity,
+        price=item.price,
+        categoryId=item.categoryId,
+        categoryName=categories[item.categoryId].name
+    ) for item in items]
+
+
+def convert_after(storage: BenchmarkStorage, rows: List[dict]) -> List[ItemWithCategory]:
+    """Una sola validación por lote desde los documentos"""
+    return storage._to_items_with_category(rows)
+
+
+async def render_before(items: List[ItemWithCategory]) -> bytes:
+    """Camino de FastAPI con response_model y JSONResponse"""
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=items, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def render_after(items: List[ItemWithCategory]) -> bytes:
+    """FastJSONResponse retornada directamente por el endpoint"""
+    return FastJSONResponse(items).body
+
+
+def timed(func, repeat: int):
+    """Mediana en milisegundos y el último resultado"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return round(statistics.median(durations) * 1000, 3), result
+
+
+def measure(item_count: int, repeat: int):
+    rows = build_rows(item_count)
+    storage = BenchmarkStorage()
+    convert_before_ms, converted_before = timed(lambda: convert_before(storage, rows), repeat)
+    convert_after_ms, items = timed(lambda: convert_after(storage, rows), repeat)
+    if [item.model_dump() for item in converted_before] != [item.model_dump() for item in items]:
+        raise AssertionError("Las dos conversiones no producen los mismos modelos")
+
+    loop = asyncio.new_event_loop()
+    try:
+        before_ms, before_body = timed(lambda: loop.run_until_complete(render_before(items)), repeat)
+        after_ms, after_body = timed(lambda: loop.run_until_complete(render_after(items)), repeat)
+    finally:
+        loop.close()
+
+    if json.loads(before_body) != json.loads(after_body):
+        raise AssertionError("Las dos serializaciones no producen el mismo JSON")
+
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    wire = {"identity": {"bytes": len(after_body), "compress_ms": 0.0}}
+    for encoding in encodings:
+        compress_ms, compressed = timed(lambda: _Compressor(encoding).compress_all(after_body), repeat)
+        wire[encoding] = {"bytes": len(compressed), "compress_ms": compress_ms}
+
+    return {
+        "items": item_count,
+        "convert_ms": {
+            "before": convert_before_ms,
+            "after": convert_after_ms,
+            "speedup": round(convert_before_ms / convert_after_ms, 2) if convert_after_ms else None,
+        },
+        "serialize_ms": {
+            "before": before_ms,
+            "after": after_ms,
+            "speedup": round(before_ms / after_ms, 2) if after_ms else None,
+        },
+        "bytes_before": len(before_body),
+        "wire": wire,
+    }
+
+
+def parse_int_list(value: str):
+    return [int(part) for part in value.split(",") if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=parse_int_list, default=[10000], help="Tamaños de lista, separados por coma")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (se reporta la mediana)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = []
+    for item_count in args.items:
+        result = measure(item_count, args.repeat)
+        results.append(result)
+        print(
+            f"items={item_count:<7} convertir {result['convert_ms']['before']} ms -> {result['convert_ms']['after']} ms  "
+            f"serializar {result['serialize_ms']['before']} ms -> "
+            f"{result['serialize_ms']['after']} ms  bytes {result['bytes_before']} -> "
+            + "  ".join(f"{encoding}={data['bytes']}" for encoding, data in result["wire"].items()),
+            file=sys.stderr
+        )
+
+    report = json.dumps({"repeat": args.repeat, "seed": args.seed, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,23 @@ import os
 
 # Obtener la ruta del archivo de credenciales
 service_account_path = os.path.join(
-    os.path.dirname(__file__), 
+    os.path.dirname(__file__),
     "serviceAccountKey.json"
 )
 
-# Inicializar Firebase con las credenciales
-cred = credentials.Certificate(service_account_path)
-firebase_admin.initialize_app(cred)
+_db = None
 
-# Obtener cliente de Firestore
-db = firestore.client()
+def get_db():
+    """
+    Obtiene el cliente de Firestore
+
+    Firebase se inicializa en la primera llamada, así los backends que no usan
+    Firestore pueden importar el proyecto sin serviceAccountKey.json.
+    """
+    global _db
+    if _db is None:
+        # Inicializar Firebase con las credenciales
+        cred = credentials.Certificate(service_account_path)
+        firebase_admin.initialize_app(cred)
+        _db = firestore.client()
+    return _db
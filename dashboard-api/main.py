@@ -1,12 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import auth, categories, items, profile
+from routers import auth, avatars, categories, items, metrics, profile, stats, stream, well_known
+from storage.async_storage import storage
+from utils.avatars import avatar_pool
+from utils.compression import CompressionMiddleware
+from utils.inventory_feed import inventory_feed
+from utils.jwt_handler import keyring
+from utils.metrics import MetricsMiddleware, event_loop_monitor
+from utils.password_handler import password_pool
+from utils.responses import FastJSONResponse
+from utils.search_index import item_search_index
+from utils.tracing import TRACE_HEADERS, TracingMiddleware
 
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="Dashboard API",
     description="API REST para sistema de Dashboard empresarial con autenticación JWT, gestión de categorías e inventario",
     version="1.0.0",
+    # Todas las respuestas JSON se serializan con orjson
+    default_response_class=FastJSONResponse,
 )
 
 # Configurar CORS
@@ -16,13 +28,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=TRACE_HEADERS,
 )
 
+# Latencia por ruta y requests en curso (expuestos en /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Lecturas/escrituras al storage por request (headers X-Storage-*) y log de requests lentos
+app.add_middleware(TracingMiddleware)
+
+# Compresión brotli/gzip según Accept-Encoding (respuestas de al menos COMPRESSION_MIN_SIZE bytes)
+app.add_middleware(CompressionMiddleware)
+
 # Incluir routers
 app.include_router(auth.router)
 app.include_router(profile.router)
+app.include_router(avatars.router)
 app.include_router(categories.router)
 app.include_router(items.router)
+app.include_router(stats.router)
+app.include_router(stream.router)
+app.include_router(metrics.router)
+app.include_router(well_known.router)
+
+@app.on_event("startup")
+async def start_monitors():
+    """
+    Lee las llaves JWT (falla si no hay ninguna) e inicia la medición del retraso del event loop, la carga de la
+    réplica del storage (si está activada) y la del índice de búsqueda
+    """
+    await storage.run(keyring.refresh)
+    event_loop_monitor.start()
+    await storage.start()
+    await item_search_index.start()
+
+@app.on_event("shutdown")
+async def shutdown_pools():
+    """Cierra los listeners (stream de inventario, búsqueda y réplica) y los pools de workers usados por el storage, por bcrypt y por los avatares"""
+    event_loop_monitor.stop()
+    inventory_feed.stop()
+    item_search_index.stop()
+    storage.backend.stop()
+    storage.shutdown()
+    password_pool.shutdown()
+    avatar_pool.shutdown()
 
 @app.get("/")
 async def root():
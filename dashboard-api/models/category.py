@@ -3,12 +3,14 @@ from typing import Optional
 
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Nombre de la categoría")
+    lowStockThreshold: Optional[int] = Field(None, ge=1, description="Cantidad por debajo de la cual un producto de la categoría tiene stock bajo (por defecto 5)")
 
 class CategoryCreate(CategoryBase):
     pass
 
 class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100, description="Nuevo nombre de la categoría")
+    lowStockThreshold: Optional[int] = Field(None, ge=1, description="Nuevo umbral de stock bajo")
 
 class CategoryResponse(CategoryBase):
     id: str = Field(..., description="ID único de la categoría")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Literal, Optional
 
 class ItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Nombre del producto")
@@ -29,4 +29,27 @@ class Item(ItemResponse):
 
 # Modelo con información de categoría incluida
 class ItemWithCategory(ItemResponse):
-    categoryName: str = Field(..., description="Nombre de la categoría")
\ No newline at end of file
+    categoryName: str = Field(..., description="Nombre de la categoría")
+
+    @classmethod
+    def from_item(cls, item: ItemResponse, category_name: Optional[str]) -> "ItemWithCategory":
+        """Agrega el nombre de la categoría a un item ya validado, sin volver a validar sus campos"""
+        return cls.model_construct(**item.__dict__, categoryName=category_name or "Categoría no encontrada")
+
+# Modelos para operaciones masivas
+class ItemBulkUpdate(ItemUpdate):
+    id: str = Field(..., description="ID del producto a actualizar")
+
+class ItemBulkDelete(BaseModel):
+    ids: List[str] = Field(..., min_length=1, description="IDs de los productos a eliminar")
+
+class BulkItemResult(BaseModel):
+    index: int = Field(..., description="Posición de la fila en la solicitud")
+    id: Optional[str] = Field(None, description="ID del producto")
+    status: Literal["created", "updated", "deleted", "error"]
+    detail: Optional[str] = Field(None, description="Motivo del error")
+
+class BulkItemResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(..., description="Elementos de la página")
+    next_cursor: Optional[str] = Field(None, description="Cursor para pedir la siguiente página (null si no hay más)")
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+class DashboardSummary(BaseModel):
+    totalItems: int = Field(..., description="Cantidad de productos")
+    totalCategories: int = Field(..., description="Cantidad de categorías")
+    lowStockItems: int = Field(..., description="Productos con menos de lowStockThreshold unidades (umbral general, sin los umbrales por categoría)")
+    lowStockThreshold: int = Field(..., description="Umbral general de stock bajo con el que se cuenta lowStockItems")
+    totalValue: float = Field(..., description="Valor total del inventario (precio × cantidad)")
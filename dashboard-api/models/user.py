@@ -13,7 +13,8 @@ class UserCreate(UserBase):
 class UserUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=50)
     lastName: Optional[str] = Field(None, min_length=1, max_length=50)
-    avatar: Optional[str] = Field(None, description="URL del avatar del usuario")
+    # Solo URLs: las imágenes se suben a PUT /profile/{id}/avatar en lugar de guardarse en base64
+    avatar: Optional[str] = Field(None, max_length=2048, description="URL del avatar del usuario")
 
 class UserResponse(UserBase):
     id: str = Field(..., description="ID único del usuario")
@@ -23,6 +24,11 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+    @classmethod
+    def from_user(cls, user: "UserResponse") -> "UserResponse":
+        """Copia los campos públicos de un usuario ya validado (sin la contraseña y sin volver a validar)"""
+        return cls.model_construct(**{field: getattr(user, field) for field in cls.model_fields})
+
 class User(UserResponse):
     password: str = Field(..., description="Contraseña hasheada")
 
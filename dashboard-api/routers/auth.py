@@ -1,12 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from models.user import (
     LoginRequest, LoginResponse, ForgotPasswordRequest, 
     ResetPasswordRequest, UserCreate, UserResponse, StandardResponse
 )
-from storage.firebase_storage import storage
-from utils.jwt_handler import create_access_token, verify_access_token
-from utils.password_handler import hash_password, verify_password
-from typing import Optional
+from storage.async_storage import storage
+from storage.base import EmailAlreadyRegistered, USER_ID_FIELDS, USER_LOGIN_FIELDS, USER_PROFILE_FIELDS
+from utils.auth import get_current_user, get_current_user_id
+from utils.helpers import validate_resource_exists
+from utils.jwt_handler import create_access_token
+from utils.password_handler import hash_password_async, verify_password_async, needs_rehash
+from utils.responses import fast_json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -20,29 +26,29 @@ async def register(user_data: UserCreate):
     - **email**: Email único del usuario
     - **password**: Contraseña (mínimo 6 caracteres)
     """
-    # Verificar si el email ya existe
-    existing_user = storage.get_user_by_email(user_data.email)
+    # Verificar si el email ya existe (evita hashear la contraseña; la unicidad la garantiza el storage)
+    existing_user = await storage.get_user_by_email(user_data.email, USER_ID_FIELDS)
     if existing_user:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail="El email ya está registrado"
         )
     
     try:
         # Encriptar la contraseña antes de guardarla
         user_dict = user_data.dict()
-        user_dict['password'] = hash_password(user_dict['password'])
+        user_dict['password'] = await hash_password_async(user_dict['password'])
         
-        user = storage.create_user(user_dict)
-        return UserResponse(
-            id=user.id,
-            name=user.name,
-            lastName=user.lastName,
-            email=user.email,
-            avatar=user.avatar if hasattr(user, 'avatar') else None,
-            resetCode=user.resetCode
+        user = await storage.create_user(user_dict)
+        return fast_json(UserResponse.from_user(user), status_code=status.HTTP_201_CREATED)
+    except EmailAlreadyRegistered:
+        # Otro registro con el mismo email ganó la carrera
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El email ya está registrado"
         )
-    except Exception as e:
+    except Exception:
+        logger.exception("Error registrando usuario")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno del servidor"
@@ -58,7 +64,8 @@ async def login(credentials: LoginRequest):
     
     Retorna un JWT con los datos del usuario en el payload
     """
-    user = storage.get_user_by_email(credentials.email)
+    # Único camino que lee el hash de la contraseña; el avatar va en la respuesta
+    user = await storage.get_user_by_email(credentials.email, USER_LOGIN_FIELDS)
     
     if not user:
         raise HTTPException(
@@ -67,12 +74,17 @@ async def login(credentials: LoginRequest):
         )
     
     # Verificar contraseña usando bcrypt
-    if not verify_password(credentials.password, user.password):
+    if not await verify_password_async(credentials.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña incorrecta"
         )
     
+    # Re-hashear si el factor de costo configurado cambió
+    if needs_rehash(user.password):
+        new_hash = await hash_password_async(credentials.password)
+        await storage.update_user(user.id, {"password": new_hash})
+    
     # Generar JWT con datos del usuario en el payload
     token = create_access_token({
         "id": user.id,
@@ -81,19 +93,12 @@ async def login(credentials: LoginRequest):
         "lastName": user.lastName
     })
     
-    return LoginResponse(
+    return fast_json(LoginResponse(
         message="Login exitoso",
         status="success",
-        user=UserResponse(
-            id=user.id,
-            name=user.name,
-            lastName=user.lastName,
-            email=user.email,
-            avatar=user.avatar if hasattr(user, 'avatar') else None,
-            resetCode=user.resetCode
-        ),
+        user=UserResponse.from_user(user),
         jwt=token
-    )
+    ))
 
 @router.post("/forgot-password", response_model=StandardResponse)
 async def forgot_password(request: ForgotPasswordRequest):
@@ -102,7 +107,7 @@ async def forgot_password(request: ForgotPasswordRequest):
     
     - **email**: Email del usuario registrado
     """
-    reset_code = storage.set_reset_code(request.email)
+    reset_code = await storage.set_reset_code(request.email)
     
     if not reset_code:
         raise HTTPException(
@@ -125,17 +130,17 @@ async def reset_password(request: ResetPasswordRequest):
     - **newPassword**: Nueva contraseña (mínimo 6 caracteres)
     """
     # Verificar código de reset
-    if not storage.verify_reset_code(request.email, request.resetCode):
+    if not await storage.verify_reset_code(request.email, request.resetCode):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Código de verificación inválido o expirado"
         )
     
     # Encriptar la nueva contraseña
-    hashed_password = hash_password(request.newPassword)
+    hashed_password = await hash_password_async(request.newPassword)
     
     # Resetear contraseña
-    success = storage.reset_password(request.email, hashed_password)
+    success = await storage.reset_password(request.email, hashed_password)
     
     if not success:
         raise HTTPException(
@@ -150,56 +155,23 @@ async def reset_password(request: ResetPasswordRequest):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(authorization: Optional[str] = Header(None)):
+async def get_me(
+    user_id: str = Depends(get_current_user_id),
+    include_avatar: bool = Query(False, description="Incluir el avatar del usuario")
+):
     """
     Obtener datos del usuario actual validando el JWT
     
     - **authorization**: Header con el JWT (Bearer {token})
+    - **include_avatar**: Incluir `avatar` (si no, se responde null)
     
-    Decodifica el JWT y retorna la información del usuario
+    Sin `include_avatar` el token verificado y el usuario se toman de caché, sin
+    leer la base en cada llamada. Con `include_avatar` se lee el perfil en una
+    sola lectura proyectada.
     """
-    if not authorization:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token no proporcionado"
-        )
-    
-    try:
-        # Extraer token del header "Bearer {token}"
-        token = authorization.replace("Bearer ", "").strip()
-        
-        # Verificar y decodificar JWT
-        payload = verify_access_token(token)
-        
-        # Obtener usuario de Firestore con el ID del payload
-        user_id = payload.get("id")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token inválido - ID no encontrado"
-            )
-        
-        user = storage.get_user_by_id(user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Usuario no encontrado"
-            )
-        
-        return UserResponse(
-            id=user.id,
-            name=user.name,
-            lastName=user.lastName,
-            email=user.email,
-            avatar=user.avatar if hasattr(user, 'avatar') else None,
-            resetCode=user.resetCode
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error en /auth/me: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token inválido o expirado"
-        )
\ No newline at end of file
+    if include_avatar:
+        user = await storage.get_user_by_id(user_id, USER_PROFILE_FIELDS)
+        validate_resource_exists(user, "Usuario")
+    else:
+        user = await get_current_user(user_id)
+    return fast_json(UserResponse.from_user(user))
@@ -0,0 +1,53 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response, status
+from storage.blobs import IMMUTABLE_CACHE_CONTROL
+from utils.avatars import DIGEST_PATTERN, choose_variant, load_avatar, variant_content_type
+
+router = APIRouter(prefix="/avatars", tags=["Avatars"])
+
+
+def _if_none_match(request: Request) -> List[str]:
+    """ETags del header If-None-Match"""
+    return [candidate.strip() for candidate in request.headers.get("if-none-match", "").split(",")]
+
+
+def _etag_matches(candidates: List[str], etag: str) -> bool:
+    """Indica si If-None-Match incluye el ETag (comparación débil)"""
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+@router.get("/{digest}")
+async def get_avatar(
+    request: Request,
+    digest: str = Path(..., pattern=DIGEST_PATTERN),
+    size: Optional[int] = Query(None, ge=1, le=4096, description="Lado en píxeles con el que se va a mostrar")
+):
+    """
+    Imagen de un avatar
+
+    - **size**: Se responde la variante más chica que lo alcanza (sin `size`, la más grande)
+
+    La URL identifica el contenido, así que la respuesta se cachea como
+    inmutable. El formato depende del header Accept (WebP o JPEG), por eso
+    la respuesta varía por Accept y el ETag incluye la variante.
+    """
+    variant = choose_variant(size, request.headers.get("accept", ""))
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": f'"{digest}-{variant}"',
+        "Vary": "Accept",
+    }
+    candidates = _if_none_match(request)
+    if _etag_matches(candidates, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    data = await load_avatar(digest, variant)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Avatar no encontrado"
+        )
+    # "*" coincide con cualquier versión, pero solo si el avatar existe
+    if "*" in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=data, media_type=variant_content_type(variant), headers=headers)
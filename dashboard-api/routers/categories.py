@@ -1,52 +1,72 @@
-from fastapi import APIRouter, status
-from typing import List
+from fastapi import APIRouter, Query, Request, Response, status
+from typing import List, Optional, Union
 from models.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from models.pagination import Page
 from models.user import StandardResponse
-from storage.firebase_storage import storage
-from utils.helpers import validate_resource_exists
+from storage.async_storage import storage
+from utils.helpers import check_collection_etag, validate_cursor, validate_resource_exists
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import fast_json
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
-@router.get("/", response_model=List[CategoryResponse])
-async def get_all_categories():
-    """Obtener todas las categorías"""
-    categories = storage.get_all_categories()
-    return [CategoryResponse(id=cat.id, name=cat.name) for cat in categories]
+@router.get("/", response_model=Union[Page[CategoryResponse], List[CategoryResponse]])
+async def get_all_categories(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor de la página anterior")
+):
+    """Obtener las categorías (paginado si se envía `limit` o `cursor`; 304 si no cambiaron desde el `ETag`)"""
+    not_modified = await check_collection_etag(request, response, "categories")
+    if not_modified:
+        return not_modified
+    
+    if limit is None and cursor is None:
+        categories = await storage.get_all_categories()
+        return fast_json(categories, response)
+    
+    categories, next_cursor = await validate_cursor(
+        storage.get_categories_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    )
+    return fast_json({
+        "items": categories,
+        "next_cursor": next_cursor
+    }, response)
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: str):
     """Obtener una categoría específica por ID"""
-    category = storage.get_category_by_id(category_id)
+    category = await storage.get_category_by_id(category_id)
     validate_resource_exists(category, "Categoría")
-    return CategoryResponse(id=category.id, name=category.name)
+    return fast_json(category)
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(category_data: CategoryCreate):
     """Crear una nueva categoría"""
-    category = storage.create_category(category_data.dict())
-    return CategoryResponse(id=category.id, name=category.name)
+    category = await storage.create_category(category_data.dict())
+    return fast_json(category, status_code=status.HTTP_201_CREATED)
 
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def update_category(category_id: str, update_data: CategoryUpdate):
     """Actualizar una categoría existente"""
-    category = storage.get_category_by_id(category_id)
-    validate_resource_exists(category, "Categoría")
-    
     update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
     
     if not update_dict:
-        return CategoryResponse(id=category.id, name=category.name)
+        category = await storage.get_category_by_id(category_id)
+        validate_resource_exists(category, "Categoría")
+        return fast_json(category)
     
-    updated_category = storage.update_category(category_id, update_dict)
-    return CategoryResponse(id=updated_category.id, name=updated_category.name)
+    # La existencia se verifica al escribir; la respuesta viene del documento actualizado
+    updated_category = await storage.update_category(category_id, update_dict)
+    validate_resource_exists(updated_category, "Categoría")
+    return fast_json(updated_category)
 
 @router.delete("/{category_id}", response_model=StandardResponse)
 async def delete_category(category_id: str):
     """Eliminar una categoría"""
-    category = storage.get_category_by_id(category_id)
-    validate_resource_exists(category, "Categoría")
-    
-    storage.delete_category(category_id)
+    deleted = await storage.delete_category(category_id)
+    validate_resource_exists(deleted, "Categoría")
     return StandardResponse(
         message="Categoría eliminada exitosamente",
         status="success"
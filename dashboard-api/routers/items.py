@@ -1,91 +1,327 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from models.item import ItemCreate, ItemUpdate, ItemResponse, ItemWithCategory
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Union
+from models.item import (
+    Item, ItemCreate, ItemUpdate, ItemResponse, ItemWithCategory,
+    ItemBulkUpdate, ItemBulkDelete, BulkItemResult, BulkItemResponse
+)
+from models.pagination import Page
 from models.user import StandardResponse
-from storage.firebase_storage import storage
-from utils.helpers import get_item_with_category, validate_category_exists, validate_resource_exists
+from storage.async_storage import storage
+from storage.base import ITEM_SORT_FIELDS, NO_ITEM_FILTERS, ItemFilters
+from utils.helpers import (
+    check_collection_etag, get_item_with_category, get_items_with_category, validate_category_exists,
+    validate_resource_exists, validate_cursor
+)
+from utils.export import EXPORT_MEDIA_TYPES, stream_export
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.responses import fast_json
+from utils.search_index import item_search_index
 
 router = APIRouter(prefix="/items", tags=["Items"])
 
-@router.get("/", response_model=List[ItemWithCategory])
-async def get_all_items():
-    """Obtener todos los productos del inventario"""
-    items = storage.get_all_items()
-    return [get_item_with_category(item) for item in items]
+# Máximo de filas por solicitud masiva
+MAX_BULK_ROWS = 5000
+
+# Máximo de resultados de una búsqueda
+MAX_SEARCH_RESULTS = 100
+
+# Máximo de categorías en category_in
+MAX_FILTER_CATEGORIES = 100
+
+SORT_PATTERN = f"^-?({'|'.join(ITEM_SORT_FIELDS)})$"
+
+def parse_category_ids(category_in: Optional[str]):
+    """IDs de category_in (separados por coma); None si no se envió ninguno"""
+    if category_in is None:
+        return None
+    category_ids = frozenset(part.strip() for part in category_in.split(",") if part.strip())
+    if len(category_ids) > MAX_FILTER_CATEGORIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {MAX_FILTER_CATEGORIES} categorías en category_in"
+        )
+    return category_ids or None
+
+def to_bulk_response(results: List[BulkItemResult]) -> BulkItemResponse:
+    """Construye la respuesta de una operación masiva ordenada por fila"""
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if result.status == "error")
+    return BulkItemResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+async def get_missing_category_ids(category_ids) -> set:
+    """Retorna los IDs de categoría que no existen, consultando cada ID distinto una sola vez"""
+    category_ids = set(category_ids)
+    existing = await storage.get_categories_by_ids(category_ids)
+    return category_ids - set(existing)
+
+@router.get("/", response_model=Union[Page[ItemWithCategory], List[ItemWithCategory]])
+async def get_all_items(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor de la página anterior"),
+    price_min: Optional[float] = Query(None, ge=0, description="Precio mínimo (inclusive)"),
+    price_max: Optional[float] = Query(None, ge=0, description="Precio máximo (inclusive)"),
+    qty_min: Optional[int] = Query(None, ge=0, description="Cantidad mínima (inclusive)"),
+    qty_lt: Optional[int] = Query(None, ge=0, description="Cantidad menor a este valor"),
+    category_in: Optional[str] = Query(None, description="IDs de categoría separados por coma"),
+    sort: Optional[str] = Query(
+        None, pattern=SORT_PATTERN,
+        description="Orden: name, price o quantity; con '-' delante es descendente (ej. -price)"
+    )
+):
+    """
+    Obtener los productos del inventario
+    
+    Sin `limit` ni `cursor` retorna la lista completa. Con alguno de ellos
+    retorna una página `{items, next_cursor}` ordenada de forma estable.
+    Los filtros y el orden se resuelven en el servidor y solo se responden
+    los productos que coinciden; sin `sort`, un listado filtrado por precio o
+    cantidad se ordena por ese campo. El cursor solo es válido con los mismos
+    filtros y orden.
+    Responde 304 si ni los productos ni las categorías cambiaron desde el `ETag` enviado.
+    """
+    filters = ItemFilters(
+        category_ids=parse_category_ids(category_in),
+        price_min=price_min,
+        price_max=price_max,
+        quantity_min=qty_min,
+        quantity_lt=qty_lt
+    )
+    
+    not_modified = await check_collection_etag(request, response, "items", "categories")
+    if not_modified:
+        return not_modified
+    
+    paginated = limit is not None or cursor is not None
+    
+    if filters != NO_ITEM_FILTERS or sort is not None:
+        items, next_cursor = await validate_cursor(storage.get_filtered_items_with_category(
+            filters, sort, limit or DEFAULT_PAGE_SIZE if paginated else None, cursor
+        ))
+        if paginated:
+            return fast_json({"items": items, "next_cursor": next_cursor}, response)
+        return fast_json(items, response)
+    
+    # Los modelos ya vienen validados del storage: se serializan directo con orjson
+    if not paginated:
+        return fast_json(await storage.get_all_items_with_category(), response)
+    
+    items, next_cursor = await validate_cursor(
+        storage.get_items_with_category_page(limit or DEFAULT_PAGE_SIZE, cursor)
+    )
+    return fast_json({"items": items, "next_cursor": next_cursor}, response)
+
+@router.get("/export")
+async def export_items(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Formato de salida: ndjson o csv")
+):
+    """
+    Exportar todo el inventario en streaming
+    
+    Las filas se envían a medida que se leen de Firestore, con el nombre de la
+    categoría incluido.
+    """
+    return StreamingResponse(
+        stream_export(storage, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="inventario.{format}"'}
+    )
+
+@router.get("/low-stock", response_model=Page[ItemWithCategory])
+async def get_low_stock_items(
+    request: Request,
+    response: Response,
+    threshold: Optional[int] = Query(None, ge=1, description="Umbral de cantidad; por defecto el de cada categoría"),
+    category_id: Optional[str] = Query(None, description="Limitar a una categoría"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor de la página anterior")
+):
+    """
+    Obtener productos con stock bajo, de menor a mayor cantidad
+    
+    Solo se leen de Firestore los productos bajo el umbral.
+    """
+    not_modified = await check_collection_etag(request, response, "items", "categories")
+    if not_modified:
+        return not_modified
+    
+    items, next_cursor = await validate_cursor(
+        storage.get_low_stock_items_with_category(limit, cursor, threshold=threshold, category_id=category_id)
+    )
+    return fast_json({"items": items, "next_cursor": next_cursor}, response)
+
+@router.get("/search", response_model=List[ItemWithCategory])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar en nombre y descripción"),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_RESULTS, description="Máximo de resultados")
+):
+    """
+    Buscar productos por nombre y descripción, del más relevante al menos
+    
+    No distingue mayúsculas ni tildes y cada palabra también encuentra las
+    que empiezan con ella ("torn" encuentra "Tornillo"). Deben coincidir todas
+    las palabras; las del nombre pesan más que las de la descripción.
+    """
+    if not item_search_index.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El índice de búsqueda se está cargando, intenta de nuevo en unos segundos"
+        )
+    
+    rows = await storage.run(item_search_index.search, q, limit)
+    items = [Item.model_validate(data) for data in rows]
+    return fast_json(await get_items_with_category(items))
+
+@router.post("/bulk", response_model=BulkItemResponse)
+async def bulk_create_items(items_data: List[ItemCreate] = Body(..., min_length=1, max_length=MAX_BULK_ROWS)):
+    """
+    Crear varios productos en una sola solicitud
+    
+    Las categorías se validan una vez por ID distinto y las escrituras se
+    agrupan en batches de Firestore. Retorna el resultado de cada fila.
+    """
+    missing = await get_missing_category_ids(item.categoryId for item in items_data)
+    
+    results = []
+    valid_rows = []
+    for index, item_data in enumerate(items_data):
+        if item_data.categoryId in missing:
+            results.append(BulkItemResult(index=index, status="error", detail="La categoría especificada no existe"))
+        else:
+            valid_rows.append(index)
+    
+    created = await storage.bulk_create_items([items_data[index].dict() for index in valid_rows])
+    for index, item in zip(valid_rows, created):
+        results.append(BulkItemResult(index=index, id=item.id, status="created"))
+    
+    return to_bulk_response(results)
+
+@router.put("/bulk", response_model=BulkItemResponse)
+async def bulk_update_items(updates: List[ItemBulkUpdate] = Body(..., min_length=1, max_length=MAX_BULK_ROWS)):
+    """
+    Actualizar varios productos en una sola solicitud
+    
+    Cada fila incluye el `id` del producto y los campos a cambiar.
+    """
+    missing = await get_missing_category_ids(
+        update.categoryId for update in updates if update.categoryId
+    )
+    
+    results = []
+    pending = []
+    seen_ids = set()
+    for index, update in enumerate(updates):
+        update_dict = {k: v for k, v in update.dict(exclude={"id"}).items() if v is not None}
+        if update.id in seen_ids:
+            results.append(BulkItemResult(index=index, id=update.id, status="error", detail="ID repetido en la solicitud"))
+        elif update.categoryId in missing:
+            results.append(BulkItemResult(index=index, id=update.id, status="error", detail="La categoría especificada no existe"))
+        elif not update_dict:
+            results.append(BulkItemResult(index=index, id=update.id, status="error", detail="No hay campos para actualizar"))
+        else:
+            pending.append((index, update.id, update_dict))
+        seen_ids.add(update.id)
+    
+    updated = await storage.bulk_update_items([(item_id, update_dict) for _, item_id, update_dict in pending])
+    for index, item_id, _ in pending:
+        if updated.get(item_id):
+            results.append(BulkItemResult(index=index, id=item_id, status="updated"))
+        else:
+            results.append(BulkItemResult(index=index, id=item_id, status="error", detail="Producto no encontrado"))
+    
+    return to_bulk_response(results)
+
+@router.delete("/bulk", response_model=BulkItemResponse)
+async def bulk_delete_items(request: ItemBulkDelete):
+    """Eliminar varios productos en una sola solicitud"""
+    if len(request.ids) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {MAX_BULK_ROWS} productos por solicitud"
+        )
+    
+    deleted = await storage.bulk_delete_items(request.ids)
+    results = []
+    reported = set()
+    for index, item_id in enumerate(request.ids):
+        if item_id in reported:
+            results.append(BulkItemResult(index=index, id=item_id, status="error", detail="ID repetido en la solicitud"))
+        elif deleted.get(item_id):
+            results.append(BulkItemResult(index=index, id=item_id, status="deleted"))
+        else:
+            results.append(BulkItemResult(index=index, id=item_id, status="error", detail="Producto no encontrado"))
+        reported.add(item_id)
+    
+    return to_bulk_response(results)
 
 @router.get("/{item_id}", response_model=ItemWithCategory)
 async def get_item(item_id: str):
     """Obtener un producto específico por ID"""
-    item = storage.get_item_by_id(item_id)
+    item = await storage.get_item_by_id(item_id)
     validate_resource_exists(item, "Producto")
-    return get_item_with_category(item)
-
-@router.get("/by-category/{category_id}", response_model=List[ItemResponse])
-async def get_items_by_category(category_id: str):
-    """Obtener productos por categoría"""
-    validate_category_exists(category_id)
-    items = storage.get_items_by_category(category_id)
-    return [ItemResponse(
-        id=item.id,
-        name=item.name,
-        description=item.description,
-        quantity=item.quantity,
-        price=item.price,
-        categoryId=item.categoryId
-    ) for item in items]
+    return fast_json(await get_item_with_category(item))
+
+@router.get("/by-category/{category_id}", response_model=Union[Page[ItemResponse], List[ItemResponse]])
+async def get_items_by_category(
+    category_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor de la página anterior")
+):
+    """Obtener productos por categoría (paginado si se envía `limit` o `cursor`)"""
+    not_modified = await check_collection_etag(request, response, "items", "categories")
+    if not_modified:
+        return not_modified
+    
+    await validate_category_exists(category_id)
+    
+    next_cursor = None
+    paginated = limit is not None or cursor is not None
+    if paginated:
+        items, next_cursor = await validate_cursor(
+            storage.get_items_by_category_page(category_id, limit or DEFAULT_PAGE_SIZE, cursor)
+        )
+    else:
+        items = await storage.get_items_by_category(category_id)
+    
+    # Item tiene los mismos campos que ItemResponse: se serializa tal cual
+    if paginated:
+        return fast_json({"items": items, "next_cursor": next_cursor}, response)
+    return fast_json(items, response)
 
 @router.post("/", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_item(item_data: ItemCreate):
     """Crear un nuevo producto"""
-    validate_category_exists(item_data.categoryId)
-    item = storage.create_item(item_data.dict())
-    return ItemResponse(
-        id=item.id,
-        name=item.name,
-        description=item.description,
-        quantity=item.quantity,
-        price=item.price,
-        categoryId=item.categoryId
-    )
+    await validate_category_exists(item_data.categoryId)
+    item = await storage.create_item(item_data.dict())
+    return fast_json(item, status_code=status.HTTP_201_CREATED)
 
 @router.put("/{item_id}", response_model=ItemResponse)
 async def update_item(item_id: str, update_data: ItemUpdate):
     """Actualizar un producto existente"""
-    item = storage.get_item_by_id(item_id)
-    validate_resource_exists(item, "Producto")
-    
     if update_data.categoryId:
-        validate_category_exists(update_data.categoryId)
+        await validate_category_exists(update_data.categoryId)
     
     update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
     
     if not update_dict:
-        return ItemResponse(
-            id=item.id,
-            name=item.name,
-            description=item.description,
-            quantity=item.quantity,
-            price=item.price,
-            categoryId=item.categoryId
-        )
+        item = await storage.get_item_by_id(item_id)
+        validate_resource_exists(item, "Producto")
+        return fast_json(item)
     
-    updated_item = storage.update_item(item_id, update_dict)
-    return ItemResponse(
-        id=updated_item.id,
-        name=updated_item.name,
-        description=updated_item.description,
-        quantity=updated_item.quantity,
-        price=updated_item.price,
-        categoryId=updated_item.categoryId
-    )
+    # La existencia se verifica al escribir; la respuesta viene del documento actualizado
+    updated_item = await storage.update_item(item_id, update_dict)
+    validate_resource_exists(updated_item, "Producto")
+    return fast_json(updated_item)
 
 @router.delete("/{item_id}", response_model=StandardResponse)
 async def delete_item(item_id: str):
     """Eliminar un producto"""
-    item = storage.get_item_by_id(item_id)
-    validate_resource_exists(item, "Producto")
-    
-    storage.delete_item(item_id)
+    deleted = await storage.delete_item(item_id)
+    validate_resource_exists(deleted, "Producto")
     return StandardResponse(
         message="Producto eliminado exitosamente",
         status="success"
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Response
+from storage.async_storage import storage
+from utils.auth import token_cache
+from utils.avatars import avatar_pool
+from utils.inventory_feed import inventory_feed
+from utils.metrics import CONTENT_TYPE, Counter, Gauge, registry
+from utils.password_handler import password_pool
+from utils.search_index import item_search_index
+
+router = APIRouter(tags=["Metrics"])
+
+# Estado de los pools de workers (bcrypt y avatares), leído al exponer las métricas
+for prefix, pool, operations, work in (
+    ("password_pool", password_pool, "de contraseña", "bcrypt"),
+    ("avatar_pool", avatar_pool, "de avatares", "las variantes de avatares"),
+):
+    for metric_class, suffix, key, documentation in (
+        (Gauge, "in_flight", "in_flight", f"Operaciones {operations} ejecutándose en el pool"),
+        (Gauge, "waiting", "waiting", f"Operaciones {operations} esperando turno"),
+        (Counter, "completed_total", "completed", f"Operaciones {operations} completadas"),
+        (Counter, "queue_seconds_total", "queue_seconds_total", f"Tiempo total en cola de las operaciones {operations}"),
+        (Counter, "run_seconds_total", "run_seconds_total", f"Tiempo total de ejecución de {work}"),
+    ):
+        registry.register(metric_class(
+            f"{prefix}_{suffix}",
+            documentation,
+            function=lambda pool=pool, key=key: pool.stats()[key],
+        ))
+
+# Aciertos y fallos de las cachés de autenticación
+for prefix, cache, documentation in (
+    ("token_cache", token_cache, "tokens verificados"),
+    ("user_cache", storage.user_cache, "usuarios"),
+):
+    registry.register(Gauge(f"{prefix}_entries", f"Entradas en la caché de {documentation}",
+                            function=lambda cache=cache: len(cache)))
+    registry.register(Counter(f"{prefix}_hits_total", f"Aciertos de la caché de {documentation}",
+                              function=lambda cache=cache: cache.hits))
+    registry.register(Counter(f"{prefix}_misses_total", f"Fallos de la caché de {documentation}",
+                              function=lambda cache=cache: cache.misses))
+
+# Stream de inventario en vivo
+for metric_class, name, attribute, documentation in (
+    (Gauge, "inventory_stream_clients", "clients", "Clientes conectados al stream de inventario"),
+    (Counter, "inventory_stream_changes_total", "changes_received", "Cambios de documentos recibidos por los listeners"),
+    (Counter, "inventory_stream_messages_total", "messages_sent", "Lotes de cambios enviados a los clientes"),
+    (Counter, "inventory_stream_dropped_clients_total", "dropped_clients", "Clientes desconectados por no leer a tiempo"),
+):
+    registry.register(metric_class(
+        name,
+        documentation,
+        function=lambda attribute=attribute: getattr(inventory_feed, attribute),
+    ))
+
+# Índice de búsqueda de productos
+registry.register(Gauge("item_search_documents", "Productos en el índice de búsqueda",
+                        function=lambda: len(item_search_index)))
+registry.register(Gauge("item_search_terms", "Términos distintos en el índice de búsqueda",
+                        function=lambda: item_search_index.terms))
+
+# Réplica en memoria de items y categorías (solo con STORAGE_REPLICA)
+replica = getattr(storage.backend, "replica", None)
+if replica is not None:
+    for metric_class, name, function, documentation in (
+        (Gauge, "storage_replica_ready", lambda: int(replica.ready), "1 si la réplica cargó items y categorías"),
+        (Gauge, "storage_replica_lag_seconds", replica.lag, "Antigüedad de la escritura (propia o de otro proceso) más vieja que la réplica no recibió"),
+        (Counter, "storage_replica_hits_total", lambda: replica.hits, "Lecturas respondidas desde la réplica"),
+        (Counter, "storage_replica_fallbacks_total", lambda: replica.fallbacks, "Lecturas enviadas al backend por réplica no lista o atrasada"),
+        (Counter, "storage_replica_changes_total", lambda: replica.applied_changes, "Cambios aplicados a la réplica"),
+        (Counter, "storage_replica_resyncs_total", lambda: replica.resyncs, "Recargas completas de la réplica"),
+    ):
+        registry.register(metric_class(name, documentation, function=function))
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Métricas en formato de texto de Prometheus
+
+    Latencia por ruta y estado, requests en curso, retraso del event loop,
+    llamadas al storage, estado de los pools de bcrypt y de avatares, de las cachés de autenticación,
+    del stream de inventario, del índice de búsqueda y de la réplica del storage.
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,102 +1,125 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from models.user import UserResponse, UserUpdate, ChangePasswordRequest, UpdateEmailRequest, StandardResponse
-from storage.firebase_storage import storage
-from utils.password_handler import hash_password, verify_password
+from storage.async_storage import storage
+from storage.base import EmailAlreadyRegistered, USER_ID_FIELDS, USER_PASSWORD_FIELDS, USER_PROFILE_FIELDS
+from utils.avatar_images import InvalidAvatar
+from utils.avatars import AVATAR_MAX_BYTES, avatar_url, save_avatar
+from utils.password_handler import hash_password_async, verify_password_async
 from utils.helpers import validate_resource_exists
+from utils.responses import fast_json
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_profile(user_id: str):
     """Obtener perfil del usuario"""
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_PROFILE_FIELDS)
     validate_resource_exists(user, "Usuario")
     
-    return UserResponse(
-        id=user.id,
-        name=user.name,
-        lastName=user.lastName,
-        email=user.email,
-        avatar=user.avatar if hasattr(user, 'avatar') else None,
-        resetCode=user.resetCode
-    )
+    return fast_json(UserResponse.from_user(user))
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_profile(user_id: str, update_data: UserUpdate):
     """Actualizar perfil (nombre, apellido, avatar)"""
-    user = storage.get_user_by_id(user_id)
-    validate_resource_exists(user, "Usuario")
-    
     update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
     
     if not update_dict:
-        return UserResponse(
-            id=user.id,
-            name=user.name,
-            lastName=user.lastName,
-            email=user.email,
-            avatar=user.avatar if hasattr(user, 'avatar') else None,
-            resetCode=user.resetCode
-        )
+        user = await storage.get_user_by_id(user_id, USER_PROFILE_FIELDS)
+        validate_resource_exists(user, "Usuario")
+        return fast_json(UserResponse.from_user(user))
     
-    updated_user = storage.update_user(user_id, update_dict)
+    # La existencia se verifica al escribir; la respuesta viene del documento actualizado
+    updated_user = await storage.update_user(user_id, update_dict)
+    validate_resource_exists(updated_user, "Usuario")
     
-    return UserResponse(
-        id=updated_user.id,
-        name=updated_user.name,
-        lastName=updated_user.lastName,
-        email=updated_user.email,
-        avatar=updated_user.avatar if hasattr(updated_user, 'avatar') else None,
-        resetCode=updated_user.resetCode
+    return fast_json(UserResponse.from_user(updated_user))
+
+# El cuerpo del request es la imagen, sin multipart
+AVATAR_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        content_type: {"schema": {"type": "string", "format": "binary"}}
+        for content_type in ("image/png", "image/jpeg", "image/webp")
+    },
+}
+
+@router.put("/{user_id}/avatar", response_model=UserResponse, openapi_extra={"requestBody": AVATAR_REQUEST_BODY})
+async def upload_avatar(user_id: str, request: Request):
+    """
+    Subir el avatar del usuario (el cuerpo es la imagen PNG, JPEG o WebP)
+
+    La imagen se guarda en el almacén de blobs, recortada y redimensionada en
+    WebP y JPEG; el usuario guarda solo la URL corta `/avatars/<hash>`. Se deja
+    de leer el cuerpo apenas supera AVATAR_MAX_BYTES. El usuario se verifica
+    antes de procesar la imagen, así no quedan blobs sin dueño.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"La imagen no debe superar {AVATAR_MAX_BYTES // (1024 * 1024)}MB"
     )
+    if int(request.headers.get("content-length") or 0) > AVATAR_MAX_BYTES:
+        raise too_large
+
+    user = await storage.get_user_by_id(user_id, USER_ID_FIELDS)
+    validate_resource_exists(user, "Usuario")
+
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > AVATAR_MAX_BYTES:
+            raise too_large
+
+    try:
+        digest = await save_avatar(bytes(data))
+    except InvalidAvatar as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    updated_user = await storage.update_user(user_id, {"avatar": avatar_url(digest)})
+    validate_resource_exists(updated_user, "Usuario")
+
+    return fast_json(UserResponse.from_user(updated_user))
 
 @router.put("/{user_id}/email", response_model=UserResponse)
 async def update_email(user_id: str, request: UpdateEmailRequest):
     """Cambiar email del usuario"""
-    user = storage.get_user_by_id(user_id)
-    validate_resource_exists(user, "Usuario")
-    
     # Verificar que el nuevo email no esté en uso
-    existing_user = storage.get_user_by_email(request.newEmail)
+    existing_user = await storage.get_user_by_email(request.newEmail, USER_ID_FIELDS)
     if existing_user and existing_user.id != user_id:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_409_CONFLICT,
             detail="El email ya está en uso"
         )
     
-    updated_user = storage.update_user(user_id, {"email": request.newEmail})
+    try:
+        updated_user = await storage.update_user(user_id, {"email": request.newEmail})
+    except EmailAlreadyRegistered:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El email ya está en uso"
+        )
+    validate_resource_exists(updated_user, "Usuario")
     
-    return UserResponse(
-        id=updated_user.id,
-        name=updated_user.name,
-        lastName=updated_user.lastName,
-        email=updated_user.email,
-        avatar=updated_user.avatar if hasattr(updated_user, 'avatar') else None,
-        resetCode=updated_user.resetCode
-    )
+    return fast_json(UserResponse.from_user(updated_user))
 
 @router.put("/{user_id}/password", response_model=UserResponse)
 async def change_password(user_id: str, request: ChangePasswordRequest):
     """Cambiar contraseña del usuario"""
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_PASSWORD_FIELDS)
     validate_resource_exists(user, "Usuario")
     
     # Verificar contraseña actual
-    if not verify_password(request.currentPassword, user.password):
+    if not await verify_password_async(request.currentPassword, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Contraseña actual incorrecta"
         )
     
     # Encriptar y guardar nueva contraseña
-    hashed_password = hash_password(request.newPassword)
-    updated_user = storage.update_user(user_id, {"password": hashed_password})
+    hashed_password = await hash_password_async(request.newPassword)
+    updated_user = await storage.update_user(user_id, {"password": hashed_password})
+    validate_resource_exists(updated_user, "Usuario")
     
-    return UserResponse(
-        id=updated_user.id,
-        name=updated_user.name,
-        lastName=updated_user.lastName,
-        email=updated_user.email,
-        avatar=updated_user.avatar if hasattr(updated_user, 'avatar') else None,
-        resetCode=updated_user.resetCode
-    )
+    return fast_json(UserResponse.from_user(updated_user))
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, status
+from models.stats import DashboardSummary
+from storage.async_storage import storage
+from storage.base import LOW_STOCK_THRESHOLD, WriteConflict
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+def to_summary_response(summary: dict) -> DashboardSummary:
+    """Construye la respuesta del resumen"""
+    return DashboardSummary(
+        totalItems=summary["totalItems"],
+        totalCategories=summary["totalCategories"],
+        lowStockItems=summary["lowStockItems"],
+        lowStockThreshold=LOW_STOCK_THRESHOLD,
+        totalValue=round(summary["totalValue"], 2)
+    )
+
+def summary_conflict() -> HTTPException:
+    """Respuesta cuando el recálculo del resumen no pudo confirmarse por escrituras concurrentes"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="El resumen se está recalculando, intenta de nuevo en unos segundos"
+    )
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_summary():
+    """
+    Obtener el resumen del dashboard
+    
+    Los contadores se mantienen al día en cada escritura, así que leerlos
+    cuesta una sola lectura de documento.
+    """
+    try:
+        return to_summary_response(await storage.get_summary())
+    except WriteConflict:
+        raise summary_conflict()
+
+@router.post("/summary/rebuild", response_model=DashboardSummary)
+async def rebuild_summary():
+    """Recalcular el resumen recorriendo todo el inventario (para inicializarlo o corregirlo)"""
+    try:
+        return to_summary_response(await storage.rebuild_summary())
+    except WriteConflict:
+        raise summary_conflict()
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from utils.inventory_feed import StreamFull, inventory_feed
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+
+@router.get("/inventory")
+async def stream_inventory():
+    """
+    Cambios de productos y categorías en vivo (Server-Sent Events)
+
+    - `ready`: conexión lista; el cliente carga (o recarga) los listados
+    - `change`: `{collection, changes: [{type, id, data}]}` con `type` added, modified o removed
+    - `reset`: el cliente no leyó a tiempo y se cierra el stream; al reconectarse recarga los listados
+
+    Todos los clientes comparten un solo listener por colección y proceso.
+    """
+    try:
+        subscription = await inventory_feed.subscribe()
+    except StreamFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados clientes conectados al stream"
+        )
+    return StreamingResponse(
+        inventory_feed.events(subscription),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: que nginx no acumule los eventos
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -3,7 +3,8 @@ from models.user import (
     UserResponse, UserUpdate, ChangePasswordRequest, 
     UpdateEmailRequest, StandardResponse
 )
-from storage.firebase_storage import storage
+from storage.async_storage import storage
+from storage.base import USER_ID_FIELDS, USER_PASSWORD_FIELDS, USER_PROFILE_FIELDS
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,7 +15,7 @@ async def get_user_profile(user_id: str):
     
     - **user_id**: ID único del usuario
     """
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_PROFILE_FIELDS)
     
     if not user:
         raise HTTPException(
@@ -22,13 +23,7 @@ async def get_user_profile(user_id: str):
             detail="Usuario no encontrado"
         )
     
-    return UserResponse(
-        id=user.id,
-        name=user.name,
-        lastName=user.lastName,
-        email=user.email,
-        resetCode=user.resetCode
-    )
+    return UserResponse.from_user(user)
 
 @router.put("/profile/{user_id}", response_model=UserResponse)
 async def update_user_profile(user_id: str, update_data: UserUpdate):
@@ -40,7 +35,7 @@ async def update_user_profile(user_id: str, update_data: UserUpdate):
     - **lastName**: Nuevo apellido (opcional)  
     - **email**: Nuevo email (opcional)
     """
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_PROFILE_FIELDS)
     
     if not user:
         raise HTTPException(
@@ -53,23 +48,11 @@ async def update_user_profile(user_id: str, update_data: UserUpdate):
         update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
         
         if update_dict:
-            updated_user = storage.update_user(user_id, update_dict)
+            updated_user = await storage.update_user(user_id, update_dict)
             
-            return UserResponse(
-                id=updated_user.id,
-                name=updated_user.name,
-                lastName=updated_user.lastName,
-                email=updated_user.email,
-                resetCode=updated_user.resetCode
-            )
+            return UserResponse.from_user(updated_user)
         else:
-            return UserResponse(
-                id=user.id,
-                name=user.name,
-                lastName=user.lastName,
-                email=user.email,
-                resetCode=user.resetCode
-            )
+            return UserResponse.from_user(user)
             
     except ValueError as e:
         raise HTTPException(
@@ -85,7 +68,7 @@ async def update_email(user_id: str, request: UpdateEmailRequest):
     - **user_id**: ID único del usuario
     - **newEmail**: Nuevo email único
     """
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_ID_FIELDS)
     
     if not user:
         raise HTTPException(
@@ -94,7 +77,7 @@ async def update_email(user_id: str, request: UpdateEmailRequest):
         )
     
     try:
-        storage.update_user(user_id, {"email": request.newEmail})
+        await storage.update_user(user_id, {"email": request.newEmail})
         return StandardResponse(
             message="Email actualizado exitosamente",
             status="success"
@@ -114,7 +97,7 @@ async def change_password(user_id: str, request: ChangePasswordRequest):
     - **currentPassword**: Contraseña actual
     - **newPassword**: Nueva contraseña (mínimo 6 caracteres)
     """
-    user = storage.get_user_by_id(user_id)
+    user = await storage.get_user_by_id(user_id, USER_PASSWORD_FIELDS)
     
     if not user:
         raise HTTPException(
@@ -128,7 +111,7 @@ async def change_password(user_id: str, request: ChangePasswordRequest):
             detail="Contraseña actual incorrecta"
         )
     
-    storage.update_user(user_id, {"password": request.newPassword})
+    await storage.update_user(user_id, {"password": request.newPassword})
     
     return StandardResponse(
         message="Contraseña actualizada exitosamente",
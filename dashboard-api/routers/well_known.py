@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from utils.jwt_handler import keyring
+
+router = APIRouter(prefix="/.well-known", tags=["Authentication"])
+
+# Los verificadores pueden cachear las llaves; ante un `kid` desconocido vuelven a pedirlas
+JWKS_MAX_AGE = 300
+
+@router.get("/jwks.json")
+async def get_jwks():
+    """
+    Llaves públicas para verificar los JWT emitidos por esta API (JWKS)
+
+    Otros servicios validan los tokens localmente buscando el `kid` del header
+    del token en esta lista, sin llamar a `/auth/me`.
+    """
+    return JSONResponse(
+        content=keyring.jwks(),
+        headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE}"}
+    )
@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from models.user import User
+from storage.base import USER_ID_FIELDS, USER_PUBLIC_FIELDS, ChangeCallback, normalize_email
+from storage.factory import create_storage
+from storage.shared_watch import SharedWatch
+from utils.cache import ExpiringLRUCache
+from utils.metrics import record_storage_call
+from utils.tracing import storage_span
+
+# Máximo de llamadas al storage ejecutándose en paralelo por worker de uvicorn
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "16"))
+
+# Caché de usuarios para la autenticación: segundos de vigencia y cantidad máxima de usuarios
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+
+class AsyncStorage:
+    """
+    Expone los métodos de un storage síncrono como corutinas.
+
+    Cada llamada se ejecuta en un pool de hilos acotado para que las lecturas y
+    escrituras al backend no bloqueen el event loop de uvicorn. Los métodos se
+    resuelven dinámicamente, así que la superficie es la misma que la del backend.
+
+    Las escrituras de usuarios pasan por métodos propios que invalidan la caché
+    de `get_user_by_id_cached` y avisan a `on_credentials_changed` cuando un
+    usuario se elimina o cambia su contraseña. `watch` reparte los listeners compartidos del
+    proceso en lugar de abrir uno en el backend por observador.
+    """
+
+    def __init__(self, backend, max_workers: int = STORAGE_MAX_WORKERS):
+        self._backend = backend
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="storage"
+        )
+        self.user_cache = ExpiringLRUCache(USER_CACHE_SIZE)
+        self._credential_listeners: List[Callable[[str], None]] = []
+        self._shared_watch: Optional[SharedWatch] = None
+
+    @property
+    def backend(self):
+        """Backend síncrono envuelto"""
+        return self._backend
+
+    def use_backend(self, backend):
+        """Reemplaza el backend envuelto (los benchmarks lo usan para trabajar con datos aislados)"""
+        self._stop_shared_watch()
+        self._backend = backend
+        self.user_cache.clear()
+
+    # =================== CAMBIOS ===================
+
+    @property
+    def shared_watch(self) -> SharedWatch:
+        """Listeners compartidos del proceso: los de la réplica si está activada, si no unos propios"""
+        replica = getattr(self._backend, "replica", None)
+        if replica is not None:
+            return replica
+        if self._shared_watch is None:
+            self._shared_watch = SharedWatch(self._backend)
+        return self._shared_watch
+
+    async def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """
+        Se suscribe a los cambios de una colección (ver BaseStorage.watch)
+
+        Todos los observadores del proceso comparten un listener por colección;
+        el primero lo abre en el pool, porque la carga inicial lee la colección.
+        """
+        return await self.run(self.shared_watch.subscribe, collection, callback, include_initial)
+
+    def _stop_shared_watch(self):
+        if self._shared_watch is not None:
+            self._shared_watch.stop()
+            self._shared_watch = None
+
+    async def run(self, func, *args, **kwargs):
+        """Ejecuta una función bloqueante en el pool de storage conservando el contexto del request"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    def _call(self, name: str, *args, **kwargs):
+        """Llama a un método del backend como span del request y registra su duración (se ejecuta en el pool)"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            with storage_span(name):
+                result = getattr(self._backend, name)(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            record_storage_call(name, time.perf_counter() - start, ok)
+
+    # =================== CACHÉ DE USUARIOS ===================
+
+    async def get_user_by_id_cached(self, user_id: str) -> Optional[User]:
+        """
+        Obtiene un usuario por ID desde la caché (con hasta USER_CACHE_TTL segundos de antigüedad)
+
+        Solo se leen y guardan los campos de USER_PUBLIC_FIELDS: ni el hash de
+        la contraseña ni el avatar pasan por la autenticación.
+        """
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        generation = self.user_cache.generation
+        user = await self.get_user_by_id(user_id, USER_PUBLIC_FIELDS)
+        if user is not None:
+            self.user_cache.set(user_id, user, time.time() + USER_CACHE_TTL, generation)
+        return user
+
+    def on_credentials_changed(self, listener: Callable[[str], None]):
+        """Registra `listener(user_id)`, llamado cuando un usuario se elimina o cambia su contraseña"""
+        self._credential_listeners.append(listener)
+
+    def _credentials_changed(self, user_id: str):
+        for listener in self._credential_listeners:
+            listener(user_id)
+
+    def _invalidate_email(self, email: str):
+        key = normalize_email(email)
+        self.user_cache.invalidate_where(lambda user: normalize_email(user.email) == key)
+
+    # Se invalida también si la escritura falla, por si llegó a aplicarse
+
+    async def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
+        try:
+            return await self.run(self._call, "update_user", user_id, user_data)
+        finally:
+            self.user_cache.invalidate(user_id)
+            if "password" in user_data:
+                self._credentials_changed(user_id)
+
+    async def delete_user(self, user_id: str) -> bool:
+        try:
+            return await self.run(self._call, "delete_user", user_id)
+        finally:
+            self.user_cache.invalidate(user_id)
+            self._credentials_changed(user_id)
+
+    async def set_reset_code(self, email: str) -> Optional[str]:
+        try:
+            return await self.run(self._call, "set_reset_code", email)
+        finally:
+            self._invalidate_email(email)
+
+    async def reset_password(self, email: str, new_password: str) -> bool:
+        # El aviso va por ID: se lee antes porque el reset solo conoce el email
+        user = await self.get_user_by_email(email, USER_ID_FIELDS)
+        try:
+            return await self.run(self._call, "reset_password", email, new_password)
+        finally:
+            self._invalidate_email(email)
+            if user is not None:
+                self._credentials_changed(user.id)
+
+    def shutdown(self):
+        """Cierra los listeners compartidos y libera los hilos del pool"""
+        self._stop_shared_watch()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._backend, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(self._call, name, *args, **kwargs)
+
+        # Cachear el wrapper para no recrearlo en cada llamada (resuelve el backend actual al llamarse)
+        setattr(self, name, method)
+        return method
+
+
+# Instancia global usada por los routers
+storage = AsyncStorage(create_storage())
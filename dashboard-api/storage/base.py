@@ -0,0 +1,698 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from pydantic import TypeAdapter
+from models.user import User
+from models.category import Category
+from models.item import Item, ItemWithCategory
+from utils.pagination import decode_cursor, encode_cursor
+import threading
+import uuid
+import random
+import string
+
+# Un item cuenta como stock bajo si su cantidad es menor a este valor
+LOW_STOCK_THRESHOLD = 5
+
+# Máximo de escrituras por batch/transacción en Firestore
+BATCH_WRITE_LIMIT = 500
+
+# Campos numéricos del documento de resumen del dashboard
+SUMMARY_FIELDS = ("totalItems", "totalCategories", "lowStockItems", "totalValue")
+
+# Colecciones con contador de versión (cambia con cada escritura en la colección)
+VERSIONED_COLLECTIONS = ("items", "categories")
+
+# Validan una lista completa de documentos en una sola llamada a pydantic-core
+ITEM_LIST_ADAPTER = TypeAdapter(List[Item])
+ITEM_WITH_CATEGORY_LIST_ADAPTER = TypeAdapter(List[ItemWithCategory])
+CATEGORY_LIST_ADAPTER = TypeAdapter(List[Category])
+
+# Proyecciones de lectura de usuarios: cada camino lee solo los campos que usa. El hash de la
+# contraseña solo se lee para verificarla y el avatar (que puede ser una imagen en base64) solo
+# donde se muestra
+USER_PUBLIC_FIELDS = ("id", "name", "lastName", "email")
+USER_PROFILE_FIELDS = USER_PUBLIC_FIELDS + ("avatar",)
+USER_LOGIN_FIELDS = USER_PROFILE_FIELDS + ("password",)
+USER_PASSWORD_FIELDS = ("id", "password")
+USER_RESET_FIELDS = ("id", "resetCode")
+USER_ID_FIELDS = ("id",)
+
+# Campos de items que usa el resumen del dashboard
+ITEM_SUMMARY_FIELDS = ("quantity", "price")
+
+# Colecciones que se pueden observar con BaseStorage.watch
+WATCHED_COLLECTIONS = ("items", "categories")
+
+class DocumentChange(NamedTuple):
+    """Cambio de un documento, con los mismos tipos que los listeners de Firestore"""
+    type: str  # "added", "modified" o "removed"
+    id: str
+    data: Optional[Dict[str, Any]]  # Documento después del cambio (None si se eliminó)
+
+ChangeCallback = Callable[[List[DocumentChange]], None]
+
+class ChangeBatch(list):
+    """
+    Lote de cambios de un listener remoto junto con el instante que refleja
+
+    Firestore entrega cada snapshot con su `read_time`: la colección
+    observada ya incluye todas las escrituras confirmadas hasta ese instante.
+    Los backends locales entregan listas comunes, porque cada cambio llega en
+    el mismo hilo que lo escribió.
+    """
+
+    def __init__(self, changes: Iterable[DocumentChange], read_time: Any):
+        super().__init__(changes)
+        self.read_time = read_time
+
+class CollectionVersion(NamedTuple):
+    """Versión de una colección y el instante en que se confirmó la escritura que la fijó"""
+    version: int
+    committed_at: Any = None  # Comparable con ChangeBatch.read_time (None si el backend no lo registra)
+
+# Campos por los que se puede ordenar una consulta de items (con "-" delante, descendente)
+ITEM_SORT_FIELDS = ("name", "price", "quantity")
+
+# Tipos válidos de cada valor de un cursor: se comparan con los del documento al paginar
+CURSOR_FIELD_TYPES = {
+    "__name__": (str,),
+    "name": (str,),
+    "price": (int, float),
+    "quantity": (int,),
+}
+
+class ItemFilters(NamedTuple):
+    """
+    Filtros de una consulta de items (None = sin filtrar ese campo)
+
+    El rango de precio es inclusivo en ambos extremos; el de cantidad incluye
+    `quantity_min` y excluye `quantity_lt`, como el umbral de stock bajo.
+    """
+    category_ids: Optional[FrozenSet[str]] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    quantity_min: Optional[int] = None
+    quantity_lt: Optional[int] = None
+
+    def range_fields(self) -> Tuple[str, ...]:
+        """Campos con filtro de rango"""
+        fields = []
+        if self.price_min is not None or self.price_max is not None:
+            fields.append("price")
+        if self.quantity_min is not None or self.quantity_lt is not None:
+            fields.append("quantity")
+        return tuple(fields)
+
+    def matches(self, data: Dict[str, Any]) -> bool:
+        """Evalúa los filtros sobre un documento"""
+        return (
+            (self.category_ids is None or data["categoryId"] in self.category_ids)
+            and (self.price_min is None or data["price"] >= self.price_min)
+            and (self.price_max is None or data["price"] <= self.price_max)
+            and (self.quantity_min is None or data["quantity"] >= self.quantity_min)
+            and (self.quantity_lt is None or data["quantity"] < self.quantity_lt)
+        )
+
+NO_ITEM_FILTERS = ItemFilters()
+
+class EmailAlreadyRegistered(Exception):
+    """El email ya pertenece a otro usuario (create_user / update_user)"""
+
+class WriteConflict(Exception):
+    """Escrituras concurrentes impidieron completar la operación después de reintentarla"""
+
+
+def normalize_email(email: str) -> str:
+    """Clave del índice de emails: sin espacios y en minúsculas"""
+    return email.strip().lower()
+
+
+def item_summary_delta(old: Optional[dict], new: Optional[dict]) -> Dict[str, float]:
+    """
+    Calcula cuánto cambia el resumen al pasar un item de `old` a `new` (None = no existe)
+
+    `lowStockItems` se cuenta con LOW_STOCK_THRESHOLD y no con el umbral de la
+    categoría: el delta se arma sin leer la categoría del item. Los umbrales
+    por categoría los aplica GET /items/low-stock.
+    """
+    delta = {"totalItems": 0, "lowStockItems": 0, "totalValue": 0.0}
+    for data, sign in ((old, -1), (new, 1)):
+        if data is None:
+            continue
+        delta["totalItems"] += sign
+        delta["lowStockItems"] += sign if data["quantity"] < LOW_STOCK_THRESHOLD else 0
+        delta["totalValue"] += sign * data["price"] * data["quantity"]
+    return {field: value for field, value in delta.items() if value}
+
+def add_summary_deltas(total: Dict[str, float], delta: Dict[str, float]):
+    """Acumula un delta del resumen sobre otro"""
+    for field, value in delta.items():
+        total[field] = total.get(field, 0) + value
+
+def empty_summary() -> Dict[str, Any]:
+    """Resumen del dashboard sin datos"""
+    return {"totalItems": 0, "totalCategories": 0, "lowStockItems": 0, "totalValue": 0.0}
+
+def project(data: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Copia de un documento con solo los campos indicados (None = el documento completo)"""
+    if fields is None:
+        return data
+    return {field: data[field] for field in fields if field in data}
+
+def chunked(values: list, size: int):
+    """Divide una lista en bloques de como máximo `size` elementos"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def decode_page_cursor(cursor: Optional[str], order_fields: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica un cursor y valida que corresponda al orden de la consulta
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    if set(values) != set(order_fields) | {"__name__"}:
+        raise ValueError("Cursor inválido")
+    for field, value in values.items():
+        # bool es subclase de int, pero ningún campo de orden lo guarda
+        if isinstance(value, bool) or not isinstance(value, CURSOR_FIELD_TYPES[field]):
+            raise ValueError("Cursor inválido")
+    return values
+
+def cursor_after(data: Dict[str, Any], order_fields: Tuple[str, ...] = ()) -> str:
+    """Genera el cursor que continúa después del documento dado"""
+    values = {field: data[field] for field in order_fields}
+    values["__name__"] = data["id"]
+    return encode_cursor(values)
+
+def order_key(order_fields: Tuple[str, ...] = ()) -> Callable[[Dict[str, Any]], tuple]:
+    """Clave de ordenamiento en memoria equivalente al orden de las consultas paginadas"""
+    def key(data: Dict[str, Any]) -> tuple:
+        return tuple(data[field] for field in order_fields) + (data["id"],)
+    return key
+
+def parse_item_sort(sort: Optional[str], filters: ItemFilters = NO_ITEM_FILTERS) -> Tuple[Tuple[str, ...], bool]:
+    """
+    Campos de orden y dirección de una consulta de items
+
+    `sort` es un campo de ITEM_SORT_FIELDS, con "-" delante para orden
+    descendente. Sin `sort` se ordena por el primer campo con filtro de rango
+    (así Firestore puede resolver el rango en la consulta) o solo por ID.
+
+    Raises:
+        ValueError: Si el campo no es ordenable
+    """
+    if not sort:
+        return filters.range_fields()[:1], False
+    field = sort[1:] if sort.startswith("-") else sort
+    if field not in ITEM_SORT_FIELDS:
+        raise ValueError("Campo de ordenamiento inválido")
+    return (field,), sort.startswith("-")
+
+
+class LocalChangeFeed:
+    """
+    Suscripciones a los cambios hechos por este proceso
+
+    Los backends sin listeners propios (memory, sqlite) publican aquí cada
+    escritura; los callbacks corren en el hilo que escribió y deben retornar
+    rápido.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: Dict[str, List[ChangeCallback]] = {}
+
+    def subscribe(self, collection: str, callback: ChangeCallback) -> Callable[[], None]:
+        """Registra un callback y retorna la función que cancela la suscripción"""
+        with self._lock:
+            self._callbacks.setdefault(collection, []).append(callback)
+
+        return lambda: self.unsubscribe(collection, callback)
+
+    def unsubscribe(self, collection: str, callback: ChangeCallback):
+        """Cancela una suscripción (no hace nada si no existe)"""
+        with self._lock:
+            callbacks = self._callbacks.get(collection, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, collection: str, changes: List[DocumentChange]):
+        """Entrega un lote de cambios a los suscriptores de la colección"""
+        if not changes:
+            return
+        with self._lock:
+            callbacks = list(self._callbacks.get(collection, ()))
+        for callback in callbacks:
+            callback(changes)
+
+
+class BaseStorage(ABC):
+    """
+    Interfaz común de los backends de almacenamiento.
+
+    Los documentos se manejan como diccionarios con los mismos campos que en
+    Firestore. Las operaciones derivadas (joins, páginas, stock bajo, códigos
+    de reset) se implementan aquí sobre las primitivas de cada backend.
+    """
+
+    def generate_id(self) -> str:
+        """Genera un ID único"""
+        return str(uuid.uuid4())
+
+    def generate_reset_code(self) -> str:
+        """Genera un código de 6 dígitos para reset de contraseña"""
+        return ''.join(random.choices(string.digits, k=6))
+
+    # Los documentos se validan una sola vez, aquí; los routers responden con
+    # estos modelos (o copias sin revalidar) en lugar de reconstruirlos
+
+    def _to_user(self, data: dict, fields: Optional[Sequence[str]] = None) -> User:
+        """
+        Convierte un documento en User
+
+        Con `fields` (lectura proyectada) se construye sin validar y solo con
+        esos campos; los demás quedan en su valor por defecto o sin asignar.
+        """
+        if fields is None:
+            return User.model_validate(data)
+        return User.model_construct(**project(data, fields))
+
+    def _to_category(self, data: dict) -> Category:
+        """Convierte un documento en Category"""
+        return Category.model_validate(data)
+
+    def _to_categories(self, rows: Iterable[dict]) -> List[Category]:
+        """Convierte varios documentos en Category con una sola validación"""
+        return CATEGORY_LIST_ADAPTER.validate_python(list(rows))
+
+    def _to_item(self, data: dict, fields: Optional[Sequence[str]] = None) -> Item:
+        """Convierte un documento en Item (con `fields`, solo esos campos y sin validar)"""
+        if fields is None:
+            return Item.model_validate(data)
+        return Item.model_construct(**project(data, fields))
+
+    def _to_items(self, rows: Iterable[dict]) -> List[Item]:
+        """Convierte varios documentos en Item con una sola validación"""
+        return ITEM_LIST_ADAPTER.validate_python(list(rows))
+
+    # =================== USER OPERATIONS ===================
+
+    @abstractmethod
+    def create_user(self, user_data: dict) -> User:
+        """
+        Crea un nuevo usuario
+
+        Raises:
+            EmailAlreadyRegistered: Si el email ya está registrado
+        """
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por ID (con `fields`, solo esos campos; ver USER_*_FIELDS)"""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por email, sin distinguir mayúsculas (con `fields`, solo esos campos)"""
+
+    @abstractmethod
+    def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
+        """
+        Actualiza un usuario (None si no existe)
+
+        Raises:
+            EmailAlreadyRegistered: Si cambia el email a uno de otro usuario
+        """
+
+    @abstractmethod
+    def delete_user(self, user_id: str) -> bool:
+        """Elimina un usuario"""
+
+    def set_reset_code(self, email: str) -> Optional[str]:
+        """Genera y guarda un código de reset para un usuario"""
+        user = self.get_user_by_email(email, USER_ID_FIELDS)
+        if not user:
+            return None
+
+        reset_code = self.generate_reset_code()
+        self.update_user(user.id, {"resetCode": reset_code})
+        return reset_code
+
+    def verify_reset_code(self, email: str, reset_code: str) -> bool:
+        """Verifica si el código de reset es válido"""
+        user = self.get_user_by_email(email, USER_RESET_FIELDS)
+        if not user:
+            return False
+
+        return user.resetCode == reset_code
+
+    def reset_password(self, email: str, new_password: str) -> bool:
+        """Reestablece la contraseña de un usuario"""
+        user = self.get_user_by_email(email, USER_ID_FIELDS)
+        if not user:
+            return False
+
+        self.update_user(user.id, {
+            "password": new_password,
+            "resetCode": None
+        })
+        return True
+
+    # =================== CATEGORY OPERATIONS ===================
+
+    @abstractmethod
+    def create_category(self, category_data: dict) -> Category:
+        """Crea una nueva categoría"""
+
+    @abstractmethod
+    def get_category_by_id(self, category_id: str) -> Optional[Category]:
+        """Obtiene una categoría por ID"""
+
+    @abstractmethod
+    def get_categories_by_ids(self, category_ids) -> Dict[str, Category]:
+        """Obtiene varias categorías en una sola lectura"""
+
+    @abstractmethod
+    def get_all_categories(self) -> List[Category]:
+        """Obtiene todas las categorías"""
+
+    @abstractmethod
+    def get_categories_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Category], Optional[str]]:
+        """Obtiene una página de categorías ordenadas por ID"""
+
+    @abstractmethod
+    def update_category(self, category_id: str, category_data: dict) -> Optional[Category]:
+        """Actualiza una categoría"""
+
+    @abstractmethod
+    def delete_category(self, category_id: str) -> bool:
+        """Elimina una categoría (False si no existe)"""
+
+    @abstractmethod
+    def category_has_items(self, category_id: str) -> bool:
+        """Verifica si una categoría tiene items"""
+
+    def category_exists(self, category_id: str) -> bool:
+        """Verifica si una categoría existe"""
+        return self.get_category_by_id(category_id) is not None
+
+    def get_category_names(self) -> Dict[str, str]:
+        """Obtiene un mapa ID -> nombre de todas las categorías"""
+        return {category.id: category.name for category in self.get_all_categories()}
+
+    # =================== ITEM OPERATIONS ===================
+
+    @abstractmethod
+    def create_item(self, item_data: dict) -> Item:
+        """Crea un nuevo item"""
+
+    @abstractmethod
+    def get_item_by_id(self, item_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Item]:
+        """Obtiene un item por ID (con `fields`, solo esos campos)"""
+
+    @abstractmethod
+    def get_all_items(self) -> List[Item]:
+        """Obtiene todos los items"""
+
+    @abstractmethod
+    def stream_items(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Recorre los documentos de items sin cargarlos todos en memoria (con `fields`, solo esos campos)"""
+
+    @abstractmethod
+    def get_items_by_category(self, category_id: str) -> List[Item]:
+        """Obtiene items por categoría"""
+
+    @abstractmethod
+    def _query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                     order_fields: Tuple[str, ...] = (),
+                     filters: ItemFilters = NO_ITEM_FILTERS,
+                     descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Consulta paginada de documentos de items
+
+        Aplica `filters`, ordena por `order_fields` y luego por ID (todo
+        descendente si `descending`) y continúa después del cursor. Sin
+        `limit` retorna todos los documentos restantes. Solo recibe los
+        filtros que `_split_item_filters` deja en la consulta.
+
+        Returns:
+            Documentos de la página y cursor de la siguiente (None si no hay más)
+
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+
+    def _split_item_filters(self, filters: ItemFilters,
+                            order_fields: Tuple[str, ...] = ()) -> Tuple[ItemFilters, Optional[ItemFilters]]:
+        """
+        Separa los filtros que el backend resuelve en la consulta de los que se evalúan en memoria
+
+        Por defecto todos van a la consulta; los backends con restricciones
+        (Firestore) lo sobrescriben.
+
+        Returns:
+            Filtros de la consulta y filtros a evaluar en memoria (None si no hay)
+        """
+        return filters, None
+
+    @abstractmethod
+    def update_item(self, item_id: str, item_data: dict) -> Optional[Item]:
+        """Actualiza un item (None si no existe)"""
+
+    @abstractmethod
+    def delete_item(self, item_id: str) -> bool:
+        """Elimina un item (False si no existe)"""
+
+    def _to_items_with_category(self, rows: List[dict]) -> List[ItemWithCategory]:
+        """
+        Convierte documentos de items en ItemWithCategory con una sola validación
+
+        El nombre de la categoría se agrega al documento antes de validar, así
+        cada fila se valida una vez y no se construye un Item intermedio. Las
+        categorías se resuelven en una sola lectura.
+        """
+        categories = self.get_categories_by_ids(data["categoryId"] for data in rows)
+        names = {category_id: category.name for category_id, category in categories.items()}
+        return ITEM_WITH_CATEGORY_LIST_ADAPTER.validate_python([
+            {**data, "categoryName": names.get(data["categoryId"], "Categoría no encontrada")}
+            for data in rows
+        ])
+
+    def get_all_items_with_category(self) -> List[ItemWithCategory]:
+        """Obtiene todos los items con su categoría"""
+        return self._to_items_with_category(list(self.stream_items()))
+
+    def get_items_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Item], Optional[str]]:
+        """Obtiene una página de items ordenados por ID"""
+        rows, next_cursor = self._query_items(limit, cursor)
+        return self._to_items(rows), next_cursor
+
+    def get_items_with_category_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[ItemWithCategory], Optional[str]]:
+        """Obtiene una página de items con su categoría"""
+        rows, next_cursor = self._query_items(limit, cursor)
+        return self._to_items_with_category(rows), next_cursor
+
+    def get_items_by_category_page(self, category_id: str, limit: int,
+                                   cursor: Optional[str] = None) -> Tuple[List[Item], Optional[str]]:
+        """Obtiene una página de items de una categoría ordenados por ID"""
+        rows, next_cursor = self._query_items(limit, cursor, filters=ItemFilters(category_ids=frozenset([category_id])))
+        return self._to_items(rows), next_cursor
+
+    def get_filtered_items_with_category(self, filters: ItemFilters, sort: Optional[str] = None,
+                                         limit: Optional[int] = None,
+                                         cursor: Optional[str] = None) -> Tuple[List[ItemWithCategory], Optional[str]]:
+        """
+        Obtiene los items que cumplen `filters` con su categoría, en el orden de `sort`
+
+        Sin `limit` ni `cursor` retorna todos los que coinciden (y cursor None).
+
+        Raises:
+            ValueError: Si el cursor o el campo de orden no son válidos
+        """
+        order_fields, descending = parse_item_sort(sort, filters)
+        rows, next_cursor = self._filtered_rows(limit, cursor, order_fields, filters, descending)
+        return self._to_items_with_category(rows), next_cursor
+
+    def _filtered_rows(self, limit: Optional[int], cursor: Optional[str] = None,
+                       order_fields: Tuple[str, ...] = (),
+                       filters: ItemFilters = NO_ITEM_FILTERS,
+                       descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Documentos de items filtrados, resolviendo en la consulta todo lo que el backend permite
+
+        Los filtros que el backend no resuelve se evalúan sobre las páginas
+        que retorna la consulta, así solo se responden las filas que
+        coinciden. Para la lista completa se consulta con el orden que deja
+        más filtros en el backend y se ordena después en memoria.
+        """
+        if filters.category_ids is not None and not filters.category_ids:
+            return [], None
+
+        native, residual = self._split_item_filters(filters, order_fields)
+        if residual is None:
+            return self._query_items(limit, cursor, order_fields, native, descending)
+
+        if limit is None and cursor is None:
+            range_order = filters.range_fields()[:1]
+            native, residual = self._split_item_filters(filters, range_order)
+            rows, _ = self._query_items(None, None, range_order, native)
+            if residual is not None:
+                rows = [data for data in rows if residual.matches(data)]
+            rows.sort(key=order_key(order_fields), reverse=descending)
+            return rows, None
+
+        return self._collect_rows(limit, cursor, order_fields, native, descending, residual.matches)
+
+    def _collect_rows(self, limit: Optional[int], cursor: Optional[str], order_fields: Tuple[str, ...],
+                      filters: ItemFilters, descending: bool,
+                      predicate: Callable[[Dict[str, Any]], bool]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Recorre las páginas de una consulta hasta juntar `limit` documentos que cumplen `predicate`"""
+        if limit is None:
+            rows, _ = self._query_items(None, cursor, order_fields, filters, descending)
+            return [data for data in rows if predicate(data)], None
+
+        matched = []
+        while True:
+            rows, page_cursor = self._query_items(limit, cursor, order_fields, filters, descending)
+            for data in rows:
+                cursor = cursor_after(data, order_fields)
+                if predicate(data):
+                    matched.append(data)
+                    if len(matched) == limit:
+                        # Quedan filas por revisar en esta página o en la siguiente
+                        has_more = page_cursor is not None or data is not rows[-1]
+                        return matched, cursor if has_more else None
+            if page_cursor is None:
+                return matched, None
+
+    def get_low_stock_items(self, limit: int, cursor: Optional[str] = None,
+                            threshold: Optional[int] = None,
+                            category_id: Optional[str] = None) -> Tuple[List[Item], Optional[str]]:
+        """Obtiene una página de items con stock bajo, ordenados por cantidad ascendente"""
+        rows, next_cursor = self._low_stock_rows(limit, cursor, threshold, category_id)
+        return self._to_items(rows), next_cursor
+
+    def get_low_stock_items_with_category(self, limit: int, cursor: Optional[str] = None,
+                                          threshold: Optional[int] = None,
+                                          category_id: Optional[str] = None) -> Tuple[List[ItemWithCategory], Optional[str]]:
+        """Obtiene una página de items con stock bajo y su categoría"""
+        rows, next_cursor = self._low_stock_rows(limit, cursor, threshold, category_id)
+        return self._to_items_with_category(rows), next_cursor
+
+    def _low_stock_rows(self, limit: int, cursor: Optional[str] = None,
+                        threshold: Optional[int] = None,
+                        category_id: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Documentos de una página de items con stock bajo, ordenados por cantidad ascendente
+
+        Usa un rango `quantity < umbral`, así solo se leen los items que se
+        muestran. Si no se indica `threshold`, se usa el umbral de cada
+        categoría (o LOW_STOCK_THRESHOLD si no tiene uno).
+        """
+        order_fields = ("quantity",)
+
+        if category_id is not None and threshold is None:
+            category = self.get_category_by_id(category_id)
+            threshold = (category.lowStockThreshold if category else None) or LOW_STOCK_THRESHOLD
+
+        if threshold is not None:
+            filters = ItemFilters(
+                category_ids=frozenset([category_id]) if category_id is not None else None,
+                quantity_lt=threshold
+            )
+            return self._query_items(limit, cursor, order_fields, filters)
+
+        # Umbrales por categoría: consultar con el mayor y filtrar cada fila con el de su categoría
+        thresholds = {
+            category.id: category.lowStockThreshold
+            for category in self.get_all_categories()
+            if category.lowStockThreshold
+        }
+        max_threshold = max([LOW_STOCK_THRESHOLD, *thresholds.values()])
+
+        return self._collect_rows(
+            limit, cursor, order_fields, ItemFilters(quantity_lt=max_threshold), False,
+            lambda data: data["quantity"] < thresholds.get(data["categoryId"], LOW_STOCK_THRESHOLD)
+        )
+
+    # =================== BULK ITEM OPERATIONS ===================
+
+    @abstractmethod
+    def bulk_create_items(self, items_data: List[dict]) -> List[Item]:
+        """Crea varios items"""
+
+    @abstractmethod
+    def bulk_update_items(self, updates: List[Tuple[str, dict]]) -> Dict[str, Optional[Item]]:
+        """
+        Actualiza varios items (IDs sin repetir)
+
+        Returns:
+            Mapa ID -> item actualizado (None si el item no existe)
+        """
+
+    @abstractmethod
+    def bulk_delete_items(self, item_ids: List[str]) -> Dict[str, bool]:
+        """
+        Elimina varios items
+
+        Returns:
+            Mapa ID -> True si se eliminó, False si no existía
+        """
+
+    # =================== DASHBOARD SUMMARY ===================
+
+    @abstractmethod
+    def get_summary(self) -> Dict[str, Any]:
+        """Obtiene el resumen del dashboard"""
+
+    @abstractmethod
+    def rebuild_summary(self) -> Dict[str, Any]:
+        """Recalcula el resumen del dashboard desde los datos"""
+
+    # =================== CICLO DE VIDA ===================
+
+    def start(self):
+        """Inicia el trabajo en segundo plano del backend (al arrancar la aplicación)"""
+
+    def stop(self):
+        """Detiene el trabajo en segundo plano del backend (al cerrar la aplicación)"""
+
+    # =================== CHANGE FEED ===================
+
+    @abstractmethod
+    def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """
+        Observa los cambios de una colección de WATCHED_COLLECTIONS
+
+        Llama a `callback` con cada lote de cambios posterior a la suscripción,
+        desde otro hilo. Con `include_initial` la primera llamada trae todos los
+        documentos actuales como "added" (aunque la colección esté vacía), sin
+        que se pierda ni se repita un cambio entre esa carga y los siguientes.
+        Retorna la función que cancela la suscripción.
+        """
+
+    @abstractmethod
+    def get_collection_versions(self) -> Dict[str, int]:
+        """
+        Obtiene la versión de cada colección de VERSIONED_COLLECTIONS
+
+        La versión cambia con cada escritura en la colección; si no cambió, un
+        listado de esa colección retorna lo mismo que la última vez.
+        """
+
+    def get_collection_commits(self) -> Dict[str, CollectionVersion]:
+        """
+        Versiones de las colecciones con el instante en que se confirmó cada una
+
+        Un listener cuyo último lote tiene `read_time` igual o posterior a
+        `committed_at` ya trajo esa versión. Por defecto el instante no se
+        registra: los listeners de los backends locales reciben cada cambio antes
+        de que la escritura retorne.
+        """
+        return {
+            collection: CollectionVersion(version)
+            for collection, version in self.get_collection_versions().items()
+        }
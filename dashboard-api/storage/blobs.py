@@ -0,0 +1,145 @@
+"""
+Almacenes de blobs (avatares) direccionados por contenido.
+
+La clave de un blob se deriva del hash de su contenido, así que un blob nunca
+cambia: escribir una clave que ya existe no hace nada y los lectores pueden
+cachearlo para siempre. Hay un backend en disco local (`AVATAR_STORE=local`)
+y otro en un bucket de Cloud Storage de Firebase (`AVATAR_STORE=bucket`).
+
+Los métodos son bloqueantes; los routers los ejecutan con `storage.run`.
+"""
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# Backend de blobs: local o bucket
+AVATAR_STORE = os.getenv("AVATAR_STORE", "local")
+
+# Directorio del backend local
+AVATAR_DIR = os.getenv(
+    "AVATAR_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "blobs")
+)
+
+# Bucket del backend bucket (por ejemplo <proyecto>.appspot.com)
+AVATAR_BUCKET = os.getenv("AVATAR_BUCKET")
+
+# Los blobs no cambian nunca; el bucket los sirve con la misma política que la API
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class BlobStore(ABC):
+    """Almacén de blobs inmutables por clave (rutas separadas por "/")"""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str):
+        """Guarda un blob; si la clave ya existe no se reescribe"""
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Contenido de un blob o None si no existe"""
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs como archivos bajo un directorio
+
+    Cada archivo se escribe en uno temporal y se renombra, así un lector
+    nunca ve un blob a medio escribir aunque dos uploads iguales coincidan.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        parts = key.split("/")
+        if any(part in ("", ".", "..") for part in parts):
+            raise ValueError(f"Clave de blob inválida: {key}")
+        return os.path.join(self.root, *parts)
+
+    def put(self, key: str, data: bytes, content_type: str):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+
+class BucketBlobStore(BlobStore):
+    """
+    Blobs en un bucket de Cloud Storage (el de Firebase del proyecto)
+
+    Las escrituras usan `if_generation_match=0`: solo crean el objeto si no
+    existe, sin leerlo antes. Los objetos llevan `Cache-Control` inmutable por
+    si se sirven directo desde el bucket o un CDN.
+    """
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        # Firebase se inicializa en el primer uso, igual que Firestore
+        if self._bucket is None:
+            from firebase_admin import storage as firebase_storage
+            from config.firebase_config import get_db
+            get_db()
+            self._bucket = firebase_storage.bucket(self.bucket_name)
+        return self._bucket
+
+    def put(self, key: str, data: bytes, content_type: str):
+        from google.api_core.exceptions import PreconditionFailed
+        blob = self.bucket.blob(key)
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        try:
+            blob.upload_from_string(data, content_type=content_type, if_generation_match=0)
+        except PreconditionFailed:
+            # Ya existía: mismo contenido por construcción
+            pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+        try:
+            return self.bucket.blob(key).download_as_bytes()
+        except NotFound:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return self.bucket.blob(key).exists()
+
+
+def create_blob_store(backend: str = AVATAR_STORE) -> BlobStore:
+    """Crea el almacén de blobs configurado"""
+    if backend == "local":
+        return LocalBlobStore(AVATAR_DIR)
+    if backend == "bucket":
+        if not AVATAR_BUCKET:
+            raise ValueError("AVATAR_STORE=bucket requiere AVATAR_BUCKET")
+        return BucketBlobStore(AVATAR_BUCKET)
+    raise ValueError(f"AVATAR_STORE inválido: {backend}")
@@ -0,0 +1,42 @@
+import os
+from storage.base import BaseStorage
+
+# Backend de almacenamiento: firebase, memory o sqlite
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firebase")
+
+# Archivo de la base de datos para el backend sqlite
+SQLITE_PATH = os.getenv(
+    "SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "dashboard.db")
+)
+
+
+# Réplica en memoria de items y categorías delante del backend (1 para activarla)
+STORAGE_REPLICA = os.getenv("STORAGE_REPLICA", "0").lower() in ("1", "true", "yes")
+
+
+def create_storage(backend: str = STORAGE_BACKEND, replica: bool = STORAGE_REPLICA) -> BaseStorage:
+    """
+    Crea el backend de almacenamiento configurado, con la réplica en memoria si se pidió
+
+    Los backends se importan bajo demanda para no inicializar Firebase cuando
+    no se usa.
+    """
+    storage = _create_backend(backend)
+    if replica:
+        from storage.replica import ReplicatedStorage
+        return ReplicatedStorage(storage)
+    return storage
+
+
+def _create_backend(backend: str) -> BaseStorage:
+    if backend == "firebase":
+        from storage.firebase_storage import FirebaseStorage
+        return FirebaseStorage()
+    if backend == "memory":
+        from storage.memory_storage import MemoryStorage
+        return MemoryStorage()
+    if backend == "sqlite":
+        from storage.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(SQLITE_PATH)
+    raise ValueError(f"STORAGE_BACKEND inválido: {backend}")
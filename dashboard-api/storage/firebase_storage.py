@@ -1,32 +1,177 @@
-from typing import Dict, List, Optional
+import hashlib
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from google.api_core.exceptions import Aborted, AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1 import SERVER_TIMESTAMP, Increment, Query, transactional
+from google.cloud.firestore_v1.field_path import FieldPath
 from models.user import User
 from models.category import Category  
 from models.item import Item
-from config.firebase_config import db
-import uuid
-import random
-import string
+from config.firebase_config import get_db
+from utils.tracing import count_reads, count_writes
+from storage.base import (
+    BaseStorage, BATCH_WRITE_LIMIT, ITEM_SUMMARY_FIELDS, NO_ITEM_FILTERS, SUMMARY_FIELDS, VERSIONED_COLLECTIONS, ChangeBatch, ChangeCallback,
+    CollectionVersion, DocumentChange, EmailAlreadyRegistered, ItemFilters, WriteConflict, add_summary_deltas, chunked, cursor_after, decode_page_cursor, empty_summary,
+    item_summary_delta, normalize_email
+)
 from datetime import datetime
 
-class FirebaseStorage:
-    def __init__(self):
+# Campo del documento de resumen que indica que sus contadores se calcularon recorriendo las colecciones
+SUMMARY_INITIALIZED = "initialized"
+
+# Contador de recálculos aplicados al resumen: dos recálculos simultáneos no aplican su corrección dos veces
+SUMMARY_REBUILDS = "rebuilds"
+
+# Intentos de una escritura condicionada a la versión leída antes de abandonar por conflictos
+MAX_WRITE_ATTEMPTS = 5
+
+# Proyección que solo trae el ID del documento (consultas que cuentan o verifican existencia)
+ID_ONLY = [FieldPath.document_id()]
+
+# Máximo de valores de un filtro `in` en Firestore
+FIRESTORE_IN_LIMIT = 30
+
+# Límites de rango de ItemFilters: (atributo, campo del documento, operador de Firestore)
+ITEM_RANGE_BOUNDS = (
+    ("price_min", "price", ">="),
+    ("price_max", "price", "<="),
+    ("quantity_min", "quantity", ">="),
+    ("quantity_lt", "quantity", "<"),
+)
+
+class FirebaseStorage(BaseStorage):
+    def __init__(self, db=None):
+        # Cliente de Firestore (por defecto el configurado con serviceAccountKey.json)
+        self.db = db or get_db()
         # Referencias a colecciones en Firestore
-        self.users_ref = db.collection("users")
-        self.categories_ref = db.collection("categories")
-        self.items_ref = db.collection("items")
+        self.users_ref = self.db.collection("users")
+        self.categories_ref = self.db.collection("categories")
+        self.items_ref = self.db.collection("items")
+        # Índice email -> ID de usuario; el ID del documento es el hash del email normalizado
+        self.user_emails_ref = self.db.collection("userEmails")
+        # Documento con agregados del dashboard, actualizado en el mismo batch que cada escritura
+        self.summary_ref = self.db.collection("stats").document("summary")
+    
+    def _stream(self, query, collection: str, read_time: Optional[datetime] = None) -> Iterator[Any]:
+        """
+        Recorre una consulta contando los documentos leídos
         
-    def generate_id(self) -> str:
-        """Genera un ID único"""
-        return str(uuid.uuid4())
+        Firestore cobra cada documento retornado y al menos una lectura por
+        consulta aunque no retorne nada. Con `read_time` lee los documentos
+        como estaban en ese instante (dentro de la última hora).
+        """
+        count = 0
+        try:
+            for doc in query.stream(read_time=read_time):
+                count += 1
+                yield doc
+        finally:
+            count_reads(collection, max(count, 1))
     
-    def generate_reset_code(self) -> str:
-        """Genera un código de 6 dígitos para reset de contraseña"""
-        return ''.join(random.choices(string.digits, k=6))
+    def _write_if_unchanged(self, ref, collection: str, changes: Optional[dict],
+                            extra_writes: Optional[Callable[[Any, dict, Optional[dict]], None]] = None) -> Optional[dict]:
+        """
+        Lee el documento una vez y lo actualiza (o elimina si `changes` es None)
+        con la precondición de que no haya cambiado desde esa lectura
+        
+        Son dos round trips (lectura + commit) en lugar de una transacción o de
+        leer antes y después de escribir; la respuesta se arma con el documento
+        leído y los cambios. Si otro request lo modificó en medio, se reintenta.
+        `extra_writes(batch, old, new)` agrega escrituras al mismo commit.
+        
+        Returns:
+            Documento resultante (el eliminado al borrar) o None si no existe
+        """
+        for _ in range(MAX_WRITE_ATTEMPTS):
+            snapshot = ref.get()
+            count_reads(collection)
+            if not snapshot.exists:
+                return None
+            
+            old = snapshot.to_dict()
+            new = {**old, **changes} if changes is not None else None
+            option = self.db.write_option(last_update_time=snapshot.update_time)
+            batch = self.db.batch()
+            if changes is not None:
+                batch.update(ref, changes, option=option)
+            else:
+                batch.delete(ref, option=option)
+            count_writes(collection)
+            if extra_writes is not None:
+                extra_writes(batch, old, new)
+            
+            try:
+                batch.commit()
+            except FailedPrecondition:
+                continue
+            return new if changes is not None else old
+        
+        raise Aborted(f"Conflicto de escritura concurrente en {ref.path}")
+    
+    def _paginate(self, query, collection: str, limit: Optional[int], cursor: Optional[str] = None,
+                  order_fields: Tuple[str, ...] = (),
+                  descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Ejecuta una consulta paginada con orden estable
+        
+        Ordena por los campos indicados y luego por ID de documento (todo
+        descendente si `descending`, así no hace falta un índice con
+        direcciones mezcladas), y continúa después del cursor recibido. Pide
+        limit + 1 documentos para saber si hay otra página sin una consulta
+        extra; sin `limit` lee todos los documentos restantes.
+        
+        Returns:
+            Documentos de la página y cursor de la siguiente (None si no hay más)
+        
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        direction = Query.DESCENDING if descending else Query.ASCENDING
+        for field in order_fields:
+            query = query.order_by(field, direction=direction)
+        query = query.order_by(FieldPath.document_id(), direction=direction)
+        
+        values = decode_page_cursor(cursor, order_fields)
+        if values:
+            query = query.start_after(values)
+        
+        if limit is None:
+            return [doc.to_dict() for doc in self._stream(query, collection)], None
+        
+        docs = list(self._stream(query.limit(limit + 1), collection))
+        rows = [doc.to_dict() for doc in docs[:limit]]
+        
+        next_cursor = None
+        if len(docs) > limit:
+            next_cursor = cursor_after(rows[-1], order_fields)
+        return rows, next_cursor
     
     # =================== USER OPERATIONS ===================
     
+    def _email_ref(self, email: str):
+        """Documento del índice de emails para un email"""
+        key = hashlib.sha256(normalize_email(email).encode("utf-8")).hexdigest()
+        return self.user_emails_ref.document(key)
+    
+    def _add_email_index_changes(self, writer, old: Optional[dict], new: Optional[dict]):
+        """
+        Agrega al batch los cambios del índice de emails
+        
+        create() falla con AlreadyExists si el email ya tiene dueño, lo que
+        hace fallar el commit completo: la unicidad se garantiza en Firestore.
+        """
+        old_key = normalize_email(old["email"]) if old else None
+        new_key = normalize_email(new["email"]) if new else None
+        if old_key == new_key:
+            return
+        if new is not None:
+            writer.create(self._email_ref(new["email"]), {"email": new["email"], "userId": new["id"]})
+            count_writes("userEmails")
+        if old is not None:
+            writer.delete(self._email_ref(old["email"]))
+            count_writes("userEmails")
+    
     def create_user(self, user_data: dict) -> User:
-        """Crea un nuevo usuario en Firestore"""
+        """Crea un nuevo usuario en Firestore junto con su entrada en el índice de emails"""
         user_id = self.generate_id()
         user = User(
             id=user_id,
@@ -39,7 +184,7 @@ class FirebaseStorage:
         )
         
         # Guardar en Firestore
-        self.users_ref.document(user_id).set({
+        data = {
             "id": user.id,
             "name": user.name,
             "lastName": user.lastName,
@@ -48,52 +193,71 @@ class FirebaseStorage:
             "avatar": user.avatar,
             "resetCode": user.resetCode,
             "createdAt": datetime.now().isoformat()
-        })
+        }
+        batch = self.db.batch()
+        batch.set(self.users_ref.document(user_id), data)
+        count_writes("users")
+        self._add_email_index_changes(batch, None, data)
+        try:
+            batch.commit()
+        except AlreadyExists:
+            raise EmailAlreadyRegistered(user.email)
         
         return user
     
-    def get_user_by_id(self, user_id: str) -> Optional[User]:
-        """Obtiene un usuario por ID desde Firestore"""
-        doc = self.users_ref.document(user_id).get()
+    def get_user_by_id(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """
+        Obtiene un usuario por ID desde Firestore
+        
+        Con `fields` Firestore solo envía esos campos: la lectura se cobra
+        igual, pero no viajan el hash ni un avatar en base64 que no se usan.
+        """
+        doc = self.users_ref.document(user_id).get(field_paths=list(fields) if fields is not None else None)
+        count_reads("users")
         if doc.exists:
             data = doc.to_dict()
-            return User(
-                id=data["id"],
-                name=data["name"],
-                lastName=data["lastName"],
-                email=data["email"],
-                password=data["password"],
-                avatar=data.get("avatar"),
-                resetCode=data.get("resetCode")
-            )
+            return self._to_user(data, fields)
         return None
     
-    def get_user_by_email(self, email: str) -> Optional[User]:
-        """Obtiene un usuario por email desde Firestore"""
-        docs = self.users_ref.where("email", "==", email).stream()
+    def get_user_by_email(self, email: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por email con lecturas directas del índice y del usuario"""
+        index = self._email_ref(email).get()
+        count_reads("userEmails")
+        if index.exists:
+            return self.get_user_by_id(index.to_dict()["userId"], fields)
+        
+        # Usuarios creados antes del índice: buscarlos por consulta y agregarlos al índice
+        query = self.users_ref.where("email", "==", email).limit(1)
+        if fields is not None:
+            query = query.select(sorted({*fields, "id", "email"}))
+        docs = self._stream(query, "users")
         for doc in docs:
             data = doc.to_dict()
-            return User(
-                id=data["id"],
-                name=data["name"],
-                lastName=data["lastName"],
-                email=data["email"],
-                password=data["password"],
-                avatar=data.get("avatar"),
-                resetCode=data.get("resetCode")
-            )
+            try:
+                self._email_ref(data["email"]).create({"email": data["email"], "userId": data["id"]})
+                count_writes("userEmails")
+            except AlreadyExists:
+                pass
+            return self._to_user(data, fields)
         return None
     
     def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
-        """Actualiza un usuario en Firestore"""
-        user_data["updatedAt"] = datetime.now().isoformat()
-        self.users_ref.document(user_id).update(user_data)
-        return self.get_user_by_id(user_id)
+        """Actualiza un usuario en Firestore (None si no existe); un cambio de email actualiza el índice en el mismo commit"""
+        user_data = {**user_data, "updatedAt": datetime.now().isoformat()}
+        try:
+            data = self._write_if_unchanged(
+                self.users_ref.document(user_id), "users", user_data, self._add_email_index_changes
+            )
+        except AlreadyExists:
+            raise EmailAlreadyRegistered(user_data["email"])
+        return self._to_user(data) if data else None
     
     def delete_user(self, user_id: str) -> bool:
-        """Elimina un usuario de Firestore"""
-        self.users_ref.document(user_id).delete()
-        return True
+        """Elimina un usuario de Firestore y su entrada del índice de emails (False si no existe)"""
+        deleted = self._write_if_unchanged(
+            self.users_ref.document(user_id), "users", None, self._add_email_index_changes
+        )
+        return deleted is not None
     
     # =================== CATEGORY OPERATIONS ===================
     
@@ -102,54 +266,84 @@ class FirebaseStorage:
         category_id = self.generate_id()
         category = Category(
             id=category_id,
-            name=category_data["name"]
+            name=category_data["name"],
+            lowStockThreshold=category_data.get("lowStockThreshold")
         )
         
-        # Guardar en Firestore - solo nombre
-        self.categories_ref.document(category_id).set({
+        # Guardar en Firestore
+        batch = self.db.batch()
+        batch.set(self.categories_ref.document(category_id), {
             "id": category.id,
             "name": category.name,
+            "lowStockThreshold": category.lowStockThreshold,
             "createdAt": datetime.now().isoformat()
         })
+        count_writes("categories")
+        self._apply_summary_delta(batch, "categories", {"totalCategories": 1})
+        batch.commit()
         
         return category
     
     def get_category_by_id(self, category_id: str) -> Optional[Category]:
         """Obtiene una categoría por ID desde Firestore"""
         doc = self.categories_ref.document(category_id).get()
+        count_reads("categories")
         if doc.exists:
             data = doc.to_dict()
-            return Category(
-                id=data["id"],
-                name=data["name"]
-            )
+            return self._to_category(data)
         return None
     
+    def get_categories_by_ids(self, category_ids) -> Dict[str, Category]:
+        """Obtiene varias categorías con una sola lectura múltiple (multi-get)"""
+        unique_ids = {category_id for category_id in category_ids if category_id}
+        if not unique_ids:
+            return {}
+        
+        refs = [self.categories_ref.document(category_id) for category_id in unique_ids]
+        # Los IDs que no existen también se cobran como lectura
+        count_reads("categories", len(refs))
+        rows = [doc.to_dict() for doc in self.db.get_all(refs) if doc.exists]
+        return {category.id: category for category in self._to_categories(rows)}
+    
     def get_all_categories(self) -> List[Category]:
         """Obtiene todas las categorías desde Firestore"""
-        categories = []
-        for doc in self.categories_ref.stream():
-            data = doc.to_dict()
-            categories.append(Category(
-                id=data["id"],
-                name=data["name"]
-            ))
-        return categories
+        return self._to_categories(doc.to_dict() for doc in self._stream(self.categories_ref, "categories"))
+    
+    def get_category_names(self) -> Dict[str, str]:
+        """Obtiene un mapa ID -> nombre de todas las categorías"""
+        return {doc.id: doc.to_dict()["name"] for doc in self._stream(self.categories_ref, "categories")}
+    
+    def get_categories_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Category], Optional[str]]:
+        """Obtiene una página de categorías ordenadas por ID"""
+        rows, next_cursor = self._paginate(self.categories_ref, "categories", limit, cursor)
+        return self._to_categories(rows), next_cursor
     
     def update_category(self, category_id: str, category_data: dict) -> Optional[Category]:
-        """Actualiza una categoría en Firestore"""
-        category_data["updatedAt"] = datetime.now().isoformat()
-        self.categories_ref.document(category_id).update(category_data)
-        return self.get_category_by_id(category_id)
+        """Actualiza una categoría en Firestore (None si no existe)"""
+        category_data = {**category_data, "updatedAt": datetime.now().isoformat()}
+        data = self._write_if_unchanged(
+            self.categories_ref.document(category_id), "categories", category_data, self._add_category_version
+        )
+        return self._to_category(data) if data else None
     
     def delete_category(self, category_id: str) -> bool:
-        """Elimina una categoría de Firestore"""
-        self.categories_ref.document(category_id).delete()
+        """Elimina una categoría de Firestore (False si no existe)"""
+        batch = self.db.batch()
+        batch.delete(
+            self.categories_ref.document(category_id),
+            option=self.db.write_option(exists=True)
+        )
+        count_writes("categories")
+        self._apply_summary_delta(batch, "categories", {"totalCategories": -1})
+        try:
+            batch.commit()
+        except NotFound:
+            return False
         return True
     
     def category_has_items(self, category_id: str) -> bool:
         """Verifica si una categoría tiene items"""
-        docs = self.items_ref.where("categoryId", "==", category_id).limit(1).stream()
+        docs = self._stream(self.items_ref.where("categoryId", "==", category_id).select(ID_ONLY).limit(1), "items")
         for _ in docs:
             return True
         return False
@@ -168,8 +362,8 @@ class FirebaseStorage:
             description=item_data.get("description", "")
         )
         
-        # Guardar en Firestore
-        self.items_ref.document(item_id).set({
+        # Guardar en Firestore junto con el delta del resumen
+        data = {
             "id": item.id,
             "name": item.name,
             "quantity": item.quantity,
@@ -177,100 +371,307 @@ class FirebaseStorage:
             "categoryId": item.categoryId,
             "description": item.description,
             "createdAt": datetime.now().isoformat()
-        })
+        }
+        batch = self.db.batch()
+        batch.set(self.items_ref.document(item_id), data)
+        count_writes("items")
+        self._apply_summary_delta(batch, "items", item_summary_delta(None, data))
+        batch.commit()
         
         return item
     
-    def get_item_by_id(self, item_id: str) -> Optional[Item]:
-        """Obtiene un item por ID desde Firestore"""
-        doc = self.items_ref.document(item_id).get()
+    def get_item_by_id(self, item_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Item]:
+        """Obtiene un item por ID desde Firestore (con `fields`, solo esos campos)"""
+        doc = self.items_ref.document(item_id).get(field_paths=list(fields) if fields is not None else None)
+        count_reads("items")
         if doc.exists:
             data = doc.to_dict()
-            return Item(
-                id=data["id"],
-                name=data["name"],
-                quantity=data["quantity"],
-                price=data["price"],
-                categoryId=data["categoryId"],
-                description=data.get("description", "")
-            )
+            return self._to_item(data, fields)
         return None
     
     def get_all_items(self) -> List[Item]:
         """Obtiene todos los items desde Firestore"""
-        items = []
-        for doc in self.items_ref.stream():
-            data = doc.to_dict()
-            items.append(Item(
-                id=data["id"],
-                name=data["name"],
-                quantity=data["quantity"],
-                price=data["price"],
-                categoryId=data["categoryId"],
-                description=data.get("description", "")
-            ))
-        return items
+        return self._to_items(doc.to_dict() for doc in self._stream(self.items_ref, "items"))
+    
+    def stream_items(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Recorre los documentos de items a medida que llegan de Firestore, sin cargarlos todos en memoria"""
+        query = self.items_ref.select(list(fields)) if fields is not None else self.items_ref
+        for doc in self._stream(query, "items"):
+            yield doc.to_dict()
     
     def get_items_by_category(self, category_id: str) -> List[Item]:
         """Obtiene items por categoría desde Firestore"""
-        items = []
-        for doc in self.items_ref.where("categoryId", "==", category_id).stream():
-            data = doc.to_dict()
-            items.append(Item(
-                id=data["id"],
-                name=data["name"],
-                quantity=data["quantity"],
-                price=data["price"],
-                categoryId=data["categoryId"],
-                description=data.get("description", "")
-            ))
-        return items
+        return self._to_items(
+            doc.to_dict() for doc in self._stream(self.items_ref.where("categoryId", "==", category_id), "items")
+        )
+    
+    def _query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                     order_fields: Tuple[str, ...] = (),
+                     filters: ItemFilters = NO_ITEM_FILTERS,
+                     descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Consulta paginada de items en Firestore (categoría + orden o rango requieren índice compuesto)"""
+        query = self.items_ref
+        if filters.category_ids is not None:
+            if len(filters.category_ids) == 1:
+                query = query.where("categoryId", "==", next(iter(filters.category_ids)))
+            else:
+                query = query.where("categoryId", "in", sorted(filters.category_ids))
+        for name, field, operator in ITEM_RANGE_BOUNDS:
+            value = getattr(filters, name)
+            if value is not None:
+                query = query.where(field, operator, value)
+        return self._paginate(query, "items", limit, cursor, order_fields, descending)
+    
+    def _split_item_filters(self, filters: ItemFilters,
+                            order_fields: Tuple[str, ...] = ()) -> Tuple[ItemFilters, Optional[ItemFilters]]:
+        """
+        Deja en la consulta lo que Firestore puede resolver con los índices de firestore.indexes.json
+        
+        Firestore admite `in` con hasta FIRESTORE_IN_LIMIT valores y rangos
+        sobre un solo campo, que además tiene que ser el primero del orden.
+        Los demás filtros se evalúan en memoria sobre las páginas leídas.
+        """
+        native, residual = {}, {}
+        if filters.category_ids is not None:
+            target = native if len(filters.category_ids) <= FIRESTORE_IN_LIMIT else residual
+            target["category_ids"] = filters.category_ids
+        range_field = order_fields[0] if order_fields else None
+        for name, field, _ in ITEM_RANGE_BOUNDS:
+            value = getattr(filters, name)
+            if value is not None:
+                (native if field == range_field else residual)[name] = value
+        return ItemFilters(**native), ItemFilters(**residual) if residual else None
     
     def update_item(self, item_id: str, item_data: dict) -> Optional[Item]:
-        """Actualiza un item en Firestore"""
-        item_data["updatedAt"] = datetime.now().isoformat()
-        self.items_ref.document(item_id).update(item_data)
-        return self.get_item_by_id(item_id)
+        """Actualiza un item en Firestore y ajusta el resumen en el mismo commit (None si no existe)"""
+        item_data = {**item_data, "updatedAt": datetime.now().isoformat()}
+        data = self._write_if_unchanged(self.items_ref.document(item_id), "items", item_data, self._add_item_summary_delta)
+        return self._to_item(data) if data else None
     
     def delete_item(self, item_id: str) -> bool:
-        """Elimina un item de Firestore"""
-        self.items_ref.document(item_id).delete()
-        return True
+        """Elimina un item de Firestore y ajusta el resumen en el mismo commit (False si no existe)"""
+        return self._write_if_unchanged(self.items_ref.document(item_id), "items", None, self._add_item_summary_delta) is not None
     
-    def category_exists(self, category_id: str) -> bool:
-        """Verifica si una categoría existe"""
-        doc = self.categories_ref.document(category_id).get()
-        return doc.exists
+    # =================== BULK ITEM OPERATIONS ===================
+    # Cada bloque usa BATCH_WRITE_LIMIT - 1 escrituras de items más una del resumen
+    
+    def bulk_create_items(self, items_data: List[dict]) -> List[Item]:
+        """Crea varios items con batches de hasta 500 escrituras"""
+        created = []
+        for chunk in chunked(items_data, BATCH_WRITE_LIMIT - 1):
+            batch = self.db.batch()
+            delta = {}
+            items = self._to_items({**item_data, "id": self.generate_id()} for item_data in chunk)
+            for item in items:
+                data = {**item.dict(), "createdAt": datetime.now().isoformat()}
+                batch.set(self.items_ref.document(item.id), data)
+                add_summary_deltas(delta, item_summary_delta(None, data))
+            count_writes("items", len(items))
+            self._apply_summary_delta(batch, "items", delta)
+            batch.commit()
+            created.extend(items)
+        return created
     
-    def set_reset_code(self, email: str) -> Optional[str]:
-        """Genera y guarda un código de reset para un usuario"""
-        user = self.get_user_by_email(email)
-        if not user:
-            return None
+    def bulk_update_items(self, updates: List[Tuple[str, dict]]) -> Dict[str, Optional[Item]]:
+        """
+        Actualiza varios items (IDs sin repetir); cada bloque se lee y escribe en una transacción
         
-        reset_code = self.generate_reset_code()
-        self.update_user(user.id, {"resetCode": reset_code})
-        return reset_code
-    
-    def verify_reset_code(self, email: str, reset_code: str) -> bool:
-        """Verifica si el código de reset es válido"""
-        user = self.get_user_by_email(email)
-        if not user:
-            return False
+        Returns:
+            Mapa ID -> item actualizado (None si el item no existe)
+        """
+        results = {}
+        for chunk in chunked(updates, BATCH_WRITE_LIMIT - 1):
+            refs = [self.items_ref.document(item_id) for item_id, _ in chunk]
+            
+            @transactional
+            def update_chunk(transaction) -> Dict[str, Optional[dict]]:
+                existing = {doc.id: doc.to_dict() for doc in transaction.get_all(refs) if doc.exists}
+                count_reads("items", len(refs))
+                merged = {}
+                delta = {}
+                for ref, (item_id, item_data) in zip(refs, chunk):
+                    old = existing.get(item_id)
+                    if old is None:
+                        merged[item_id] = None
+                        continue
+                    item_data = {**item_data, "updatedAt": datetime.now().isoformat()}
+                    new = {**old, **item_data}
+                    transaction.update(ref, item_data)
+                    count_writes("items")
+                    add_summary_deltas(delta, item_summary_delta(old, new))
+                    merged[item_id] = new
+                self._apply_summary_delta(transaction, "items", delta)
+                return merged
+            
+            for item_id, data in update_chunk(self.db.transaction()).items():
+                results[item_id] = self._to_item(data) if data else None
+        return results
+    
+    def bulk_delete_items(self, item_ids: List[str]) -> Dict[str, bool]:
+        """
+        Elimina varios items; cada bloque se lee y escribe en una transacción
         
-        return user.resetCode == reset_code
+        Returns:
+            Mapa ID -> True si se eliminó, False si no existía
+        """
+        results = {}
+        for chunk in chunked(list(dict.fromkeys(item_ids)), BATCH_WRITE_LIMIT - 1):
+            refs = [self.items_ref.document(item_id) for item_id in chunk]
+            
+            @transactional
+            def delete_chunk(transaction) -> Dict[str, bool]:
+                deleted = {item_id: False for item_id in chunk}
+                delta = {}
+                count_reads("items", len(refs))
+                for doc in transaction.get_all(refs):
+                    if doc.exists:
+                        transaction.delete(doc.reference)
+                        count_writes("items")
+                        add_summary_deltas(delta, item_summary_delta(doc.to_dict(), None))
+                        deleted[doc.id] = True
+                self._apply_summary_delta(transaction, "items", delta)
+                return deleted
+            
+            results.update(delete_chunk(self.db.transaction()))
+        return results
     
-    def reset_password(self, email: str, new_password: str) -> bool:
-        """Reestablece la contraseña de un usuario"""
-        user = self.get_user_by_email(email)
-        if not user:
-            return False
+    # =================== DASHBOARD SUMMARY ===================
+    
+    def _apply_summary_delta(self, writer, collection: str, delta: Dict[str, float]):
+        """
+        Agrega al batch/transacción el incremento de los contadores del resumen
         
-        self.update_user(user.id, {
-            "password": new_password,
-            "resetCode": None
-        })
-        return True
+        También incrementa la versión de `collection` (`itemsVersion` o
+        `categoriesVersion` en el mismo documento) y guarda el instante en que
+        se confirma (`itemsCommittedAt`, `categoriesCommittedAt`), así que se
+        escribe en cada cambio de la colección aunque el delta esté vacío. Como
+        va en el mismo commit que el cambio, un listener de la colección con
+        `read_time` igual o posterior ya lo trajo. Si el documento no
+        existe lo crea solo con el delta, sin la marca de inicializado:
+        `get_summary` lo recalcula la primera vez que lo lee.
+        """
+        changes = {field: Increment(value) for field, value in delta.items()}
+        changes[f"{collection}Version"] = Increment(1)
+        changes[f"{collection}CommittedAt"] = SERVER_TIMESTAMP
+        writer.set(self.summary_ref, changes, merge=True)
+        count_writes("stats")
+    
+    def _add_item_summary_delta(self, writer, old: Optional[dict], new: Optional[dict]):
+        """Agrega al batch el delta del resumen por el cambio de un item"""
+        self._apply_summary_delta(writer, "items", item_summary_delta(old, new))
+    
+    def _add_category_version(self, writer, old: Optional[dict], new: Optional[dict]):
+        """Agrega al batch el cambio de versión de las categorías"""
+        self._apply_summary_delta(writer, "categories", {})
+    
+    def _scan_summary(self, read_time: datetime) -> Dict[str, Any]:
+        """Calcula el resumen recorriendo las colecciones como estaban en `read_time`"""
+        summary = empty_summary()
+        for doc in self._stream(self.items_ref.select(list(ITEM_SUMMARY_FIELDS)), "items", read_time):
+            for field, value in item_summary_delta(None, doc.to_dict()).items():
+                summary[field] += value
+        for _ in self._stream(self.categories_ref.select(ID_ONLY), "categories", read_time):
+            summary["totalCategories"] += 1
+        return summary
+    
+    def rebuild_summary(self) -> Dict[str, Any]:
+        """
+        Recalcula el resumen recorriendo las colecciones (para inicializarlo o corregirlo)
+        
+        Las colecciones se recorren en el instante en que se leyó el documento
+        del resumen, así que la diferencia entre ambos es el error de los
+        contadores en ese momento. Esa diferencia se aplica como un delta más
+        en una transacción: las escrituras concurrentes siguen sumando sus
+        propios deltas y no obligan a volver a recorrer. Si otro recálculo se
+        aplicó en medio, sus contadores ya están corregidos y no se corrige de
+        nuevo. Los contadores de versión se conservan.
+        
+        Raises:
+            WriteConflict: Si la transacción no se pudo confirmar en MAX_WRITE_ATTEMPTS intentos
+        """
+        snapshot = self.summary_ref.get()
+        count_reads("stats")
+        before = snapshot.to_dict() if snapshot.exists else {}
+        scanned = self._scan_summary(snapshot.read_time)
+        correction = {field: scanned[field] - before.get(field, 0) for field in SUMMARY_FIELDS}
+        
+        @transactional
+        def apply_correction(transaction) -> Dict[str, Any]:
+            current = self.summary_ref.get(transaction=transaction)
+            count_reads("stats")
+            data = current.to_dict() if current.exists else {}
+            summary = {field: data.get(field, 0) for field in SUMMARY_FIELDS}
+            if data.get(SUMMARY_REBUILDS, 0) != before.get(SUMMARY_REBUILDS, 0):
+                return summary
+            changes = {field: Increment(value) for field, value in correction.items() if value}
+            changes[SUMMARY_REBUILDS] = Increment(1)
+            changes[SUMMARY_INITIALIZED] = True
+            transaction.set(self.summary_ref, changes, merge=True)
+            count_writes("stats")
+            add_summary_deltas(summary, correction)
+            return summary
+        
+        try:
+            return apply_correction(self.db.transaction(max_attempts=MAX_WRITE_ATTEMPTS))
+        except ValueError as e:
+            # transactional agota los intentos con ValueError
+            raise WriteConflict(f"Conflicto de escritura concurrente en {self.summary_ref.path}") from e
+    
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Obtiene el resumen del dashboard con una sola lectura de documento
+        
+        Los deltas se aplican con merge, así que una escritura anterior al
+        primer recálculo crea el documento solo con su delta; mientras no esté
+        marcado como inicializado se recalcula en lugar de responder esos
+        contadores parciales.
+        """
+        doc = self.summary_ref.get()
+        count_reads("stats")
+        data = doc.to_dict() if doc.exists else {}
+        if not data.get(SUMMARY_INITIALIZED):
+            return self.rebuild_summary()
+        
+        return {field: data.get(field, 0) for field in SUMMARY_FIELDS}
+    
+    def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """
+        Observa una colección con un listener de Firestore (on_snapshot)
+
+        El primer snapshot trae la colección completa (una lectura por
+        documento) y solo se reenvía con `include_initial`; después cada cambio
+        cuesta una lectura, sin importar cuántos suscriptores tenga el proceso.
+        Cada lote es un ChangeBatch con el `read_time` del snapshot.
+        """
+        skip = not include_initial
+
+        def on_snapshot(docs, changes, read_time):
+            nonlocal skip
+            if skip:
+                skip = False
+                return
+            callback(ChangeBatch((
+                DocumentChange(
+                    change.type.name.lower(),
+                    change.document.id,
+                    None if change.type.name == "REMOVED" else change.document.to_dict()
+                )
+                for change in changes
+            ), read_time))
+
+        watch = self.db.collection(collection).on_snapshot(on_snapshot)
+        return watch.unsubscribe
+    
+    def get_collection_versions(self) -> Dict[str, int]:
+        """Obtiene las versiones de las colecciones con una lectura del documento de resumen"""
+        return {collection: commit.version for collection, commit in self.get_collection_commits().items()}
 
-# Instancia global de FirebaseStorage
-storage = FirebaseStorage()
+    def get_collection_commits(self) -> Dict[str, CollectionVersion]:
+        """Versiones y su instante de commit, con una lectura del documento de resumen"""
+        doc = self.summary_ref.get()
+        count_reads("stats")
+        data = doc.to_dict() if doc.exists else {}
+        return {
+            collection: CollectionVersion(data.get(f"{collection}Version", 0), data.get(f"{collection}CommittedAt"))
+            for collection in VERSIONED_COLLECTIONS
+        }
@@ -0,0 +1,320 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from models.user import User
+from models.category import Category
+from models.item import Item
+from storage.base import (
+    BaseStorage, ChangeCallback, DocumentChange, EmailAlreadyRegistered, ItemFilters, LocalChangeFeed, NO_ITEM_FILTERS,
+    VERSIONED_COLLECTIONS, add_summary_deltas, cursor_after, decode_page_cursor, empty_summary, item_summary_delta,
+    normalize_email, order_key, project
+)
+from datetime import datetime
+
+
+def paginate_rows(rows: List[Dict[str, Any]], limit: Optional[int], cursor: Optional[str] = None,
+                  order_fields: Tuple[str, ...] = (),
+                  descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Pagina documentos en memoria con el mismo orden y cursores que Firestore
+
+    Ordena por `order_fields` y luego por ID (todo descendente si
+    `descending`), y continúa después del cursor. Sin `limit` retorna todo.
+    """
+    sort_key = order_key(order_fields)
+
+    values = decode_page_cursor(cursor, order_fields)
+    rows = sorted(rows, key=sort_key, reverse=descending)
+    if values:
+        after = tuple(values[field] for field in order_fields) + (values["__name__"],)
+        if descending:
+            rows = [data for data in rows if sort_key(data) < after]
+        else:
+            rows = [data for data in rows if sort_key(data) > after]
+
+    if limit is None:
+        return rows, None
+    page = rows[:limit]
+    next_cursor = cursor_after(page[-1], order_fields) if len(rows) > limit else None
+    return page, next_cursor
+
+
+class MemoryStorage(BaseStorage):
+    """
+    Backend en memoria con el mismo comportamiento que FirebaseStorage.
+
+    Pensado para pruebas de carga, benchmarks y desarrollo sin credenciales;
+    los datos se pierden al reiniciar el proceso.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users: Dict[str, dict] = {}
+        self._categories: Dict[str, dict] = {}
+        self._items: Dict[str, dict] = {}
+        self._user_ids_by_email: Dict[str, str] = {}
+        self._summary = empty_summary()
+        # Empiezan en un valor distinto en cada proceso: un ETag de antes de reiniciar no debe coincidir
+        start = time.time_ns()
+        self._versions = {collection: start for collection in VERSIONED_COLLECTIONS}
+        # Los cambios se publican con el lock tomado, así llegan en el orden en que se aplicaron
+        self._changes = LocalChangeFeed()
+
+    # =================== USER OPERATIONS ===================
+
+    def create_user(self, user_data: dict) -> User:
+        """Crea un nuevo usuario en memoria"""
+        user = User(
+            id=self.generate_id(),
+            name=user_data["name"],
+            lastName=user_data["lastName"],
+            email=user_data["email"],
+            password=user_data["password"],
+            avatar=user_data.get("avatar"),
+            resetCode=None
+        )
+        with self._lock:
+            if normalize_email(user.email) in self._user_ids_by_email:
+                raise EmailAlreadyRegistered(user.email)
+            self._users[user.id] = {**user.dict(), "createdAt": datetime.now().isoformat()}
+            self._user_ids_by_email[normalize_email(user.email)] = user.id
+        return user
+
+    def get_user_by_id(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por ID"""
+        data = self._users.get(user_id)
+        return self._to_user(data, fields) if data else None
+
+    def get_user_by_email(self, email: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por email"""
+        user_id = self._user_ids_by_email.get(normalize_email(email))
+        return self.get_user_by_id(user_id, fields) if user_id else None
+
+    def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
+        """Actualiza un usuario"""
+        with self._lock:
+            data = self._users.get(user_id)
+            if data is None:
+                return None
+            old_key = normalize_email(data["email"])
+            new_key = normalize_email(user_data.get("email", data["email"]))
+            if new_key != old_key:
+                if new_key in self._user_ids_by_email:
+                    raise EmailAlreadyRegistered(user_data["email"])
+                self._user_ids_by_email.pop(old_key, None)
+                self._user_ids_by_email[new_key] = user_id
+            data.update(user_data, updatedAt=datetime.now().isoformat())
+            return self._to_user(data)
+
+    def delete_user(self, user_id: str) -> bool:
+        """Elimina un usuario"""
+        with self._lock:
+            data = self._users.pop(user_id, None)
+            if data is None:
+                return False
+            self._user_ids_by_email.pop(normalize_email(data["email"]), None)
+            return True
+
+    # =================== CATEGORY OPERATIONS ===================
+
+    def create_category(self, category_data: dict) -> Category:
+        """Crea una nueva categoría"""
+        category = Category(
+            id=self.generate_id(),
+            name=category_data["name"],
+            lowStockThreshold=category_data.get("lowStockThreshold")
+        )
+        with self._lock:
+            data = {**category.dict(), "createdAt": datetime.now().isoformat()}
+            self._categories[category.id] = data
+            self._summary["totalCategories"] += 1
+            self._versions["categories"] += 1
+            self._changes.publish("categories", [DocumentChange("added", category.id, dict(data))])
+        return category
+
+    def get_category_by_id(self, category_id: str) -> Optional[Category]:
+        """Obtiene una categoría por ID"""
+        data = self._categories.get(category_id)
+        return self._to_category(data) if data else None
+
+    def get_categories_by_ids(self, category_ids) -> Dict[str, Category]:
+        """Obtiene varias categorías"""
+        rows = [self._categories.get(category_id) for category_id in set(category_ids)]
+        return {category.id: category for category in self._to_categories(data for data in rows if data)}
+
+    def get_all_categories(self) -> List[Category]:
+        """Obtiene todas las categorías"""
+        return self._to_categories(list(self._categories.values()))
+
+    def get_categories_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Category], Optional[str]]:
+        """Obtiene una página de categorías ordenadas por ID"""
+        rows, next_cursor = paginate_rows(list(self._categories.values()), limit, cursor)
+        return self._to_categories(rows), next_cursor
+
+    def update_category(self, category_id: str, category_data: dict) -> Optional[Category]:
+        """Actualiza una categoría"""
+        with self._lock:
+            data = self._categories.get(category_id)
+            if data is None:
+                return None
+            data.update(category_data, updatedAt=datetime.now().isoformat())
+            self._versions["categories"] += 1
+            self._changes.publish("categories", [DocumentChange("modified", category_id, dict(data))])
+            return self._to_category(data)
+
+    def delete_category(self, category_id: str) -> bool:
+        """Elimina una categoría (False si no existe)"""
+        with self._lock:
+            if self._categories.pop(category_id, None) is None:
+                return False
+            self._summary["totalCategories"] -= 1
+            self._versions["categories"] += 1
+            self._changes.publish("categories", [DocumentChange("removed", category_id, None)])
+            return True
+
+    def category_has_items(self, category_id: str) -> bool:
+        """Verifica si una categoría tiene items"""
+        return any(data["categoryId"] == category_id for data in list(self._items.values()))
+
+    # =================== ITEM OPERATIONS ===================
+
+    def _insert_item(self, item_data: dict, changes: List[DocumentChange]) -> Item:
+        """Inserta un item, ajusta el resumen y la versión y agrega el cambio a `changes` (requiere el lock)"""
+        item = self._to_item({**item_data, "id": self.generate_id()})
+        data = {**item.dict(), "createdAt": datetime.now().isoformat()}
+        self._items[item.id] = data
+        add_summary_deltas(self._summary, item_summary_delta(None, data))
+        self._versions["items"] += 1
+        changes.append(DocumentChange("added", item.id, dict(data)))
+        return item
+
+    def _replace_item(self, item_id: str, item_data: dict, changes: List[DocumentChange]) -> Optional[dict]:
+        """Actualiza un item, ajusta el resumen y la versión y agrega el cambio a `changes` (requiere el lock)"""
+        old = self._items.get(item_id)
+        if old is None:
+            return None
+        new = {**old, **item_data, "updatedAt": datetime.now().isoformat()}
+        self._items[item_id] = new
+        add_summary_deltas(self._summary, item_summary_delta(old, new))
+        self._versions["items"] += 1
+        changes.append(DocumentChange("modified", item_id, dict(new)))
+        return new
+
+    def _remove_item(self, item_id: str, changes: List[DocumentChange]) -> bool:
+        """Elimina un item, ajusta el resumen y la versión y agrega el cambio a `changes` (requiere el lock)"""
+        old = self._items.pop(item_id, None)
+        if old is None:
+            return False
+        add_summary_deltas(self._summary, item_summary_delta(old, None))
+        self._versions["items"] += 1
+        changes.append(DocumentChange("removed", item_id, None))
+        return True
+
+    def create_item(self, item_data: dict) -> Item:
+        """Crea un nuevo item"""
+        changes = []
+        with self._lock:
+            item = self._insert_item(item_data, changes)
+            self._changes.publish("items", changes)
+        return item
+
+    def get_item_by_id(self, item_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Item]:
+        """Obtiene un item por ID"""
+        data = self._items.get(item_id)
+        return self._to_item(data, fields) if data else None
+
+    def get_all_items(self) -> List[Item]:
+        """Obtiene todos los items"""
+        return self._to_items(list(self._items.values()))
+
+    def stream_items(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Recorre los documentos de items"""
+        for data in list(self._items.values()):
+            yield copy.copy(data) if fields is None else project(data, fields)
+
+    def get_items_by_category(self, category_id: str) -> List[Item]:
+        """Obtiene items por categoría"""
+        return self._to_items(data for data in list(self._items.values()) if data["categoryId"] == category_id)
+
+    def _query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                     order_fields: Tuple[str, ...] = (),
+                     filters: ItemFilters = NO_ITEM_FILTERS,
+                     descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Consulta paginada de items en memoria"""
+        rows = [data for data in list(self._items.values()) if filters.matches(data)]
+        return paginate_rows(rows, limit, cursor, order_fields, descending)
+
+    def update_item(self, item_id: str, item_data: dict) -> Optional[Item]:
+        """Actualiza un item (None si no existe)"""
+        changes = []
+        with self._lock:
+            data = self._replace_item(item_id, item_data, changes)
+            self._changes.publish("items", changes)
+        return self._to_item(data) if data else None
+
+    def delete_item(self, item_id: str) -> bool:
+        """Elimina un item (False si no existe)"""
+        changes = []
+        with self._lock:
+            removed = self._remove_item(item_id, changes)
+            self._changes.publish("items", changes)
+        return removed
+
+    # =================== BULK ITEM OPERATIONS ===================
+
+    def bulk_create_items(self, items_data: List[dict]) -> List[Item]:
+        """Crea varios items"""
+        changes = []
+        with self._lock:
+            items = [self._insert_item(item_data, changes) for item_data in items_data]
+            self._changes.publish("items", changes)
+        return items
+
+    def bulk_update_items(self, updates: List[Tuple[str, dict]]) -> Dict[str, Optional[Item]]:
+        """Actualiza varios items (IDs sin repetir)"""
+        results = {}
+        changes = []
+        with self._lock:
+            for item_id, item_data in updates:
+                data = self._replace_item(item_id, item_data, changes)
+                results[item_id] = self._to_item(data) if data else None
+            self._changes.publish("items", changes)
+        return results
+
+    def bulk_delete_items(self, item_ids: List[str]) -> Dict[str, bool]:
+        """Elimina varios items"""
+        changes = []
+        with self._lock:
+            results = {item_id: self._remove_item(item_id, changes) for item_id in dict.fromkeys(item_ids)}
+            self._changes.publish("items", changes)
+        return results
+
+    # =================== DASHBOARD SUMMARY ===================
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Obtiene el resumen del dashboard (mantenido en cada escritura)"""
+        return dict(self._summary)
+
+    def rebuild_summary(self) -> Dict[str, Any]:
+        """Recalcula el resumen recorriendo los datos"""
+        with self._lock:
+            summary = empty_summary()
+            for data in self._items.values():
+                add_summary_deltas(summary, item_summary_delta(None, data))
+            summary["totalCategories"] = len(self._categories)
+            self._summary = summary
+            return dict(summary)
+
+    def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """Observa los cambios de una colección hechos por este proceso"""
+        # Con el lock tomado ninguna escritura se publica entre la carga inicial y la suscripción
+        with self._lock:
+            if include_initial:
+                docs = self._items if collection == "items" else self._categories
+                callback([DocumentChange("added", doc_id, dict(data)) for doc_id, data in docs.items()])
+            return self._changes.subscribe(collection, callback)
+
+    def get_collection_versions(self) -> Dict[str, int]:
+        """Obtiene las versiones de las colecciones"""
+        return dict(self._versions)
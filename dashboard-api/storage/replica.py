@@ -0,0 +1,527 @@
+"""
+Réplica en memoria de items y categorías, mantenida con los listeners del backend.
+
+Se carga una vez con el snapshot inicial de cada colección y después se
+actualiza con cada lote de cambios, así los listados y lecturas por ID no
+llegan a Firestore. Mientras la réplica no está lista, o falta que llegue una
+escritura hecha por este mismo proceso, las lecturas van al backend: un
+request nunca ve datos anteriores a su propia escritura.
+
+Las escrituras de otros procesos se detectan con las versiones del backend
+(`get_collection_commits`): cada versión trae el instante de su commit y cada
+lote del listener el instante que refleja (`read_time`), así se sabe si la
+réplica ya la trajo. Las versiones se leen con cada ETag de los listados y,
+si pasaron REPLICA_MAX_LAG segundos sin leerlas, antes de responder desde la
+réplica; una versión que el listener no trae a tiempo indica que se colgó y
+la réplica se recarga.
+"""
+import bisect
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from models.category import Category
+from models.item import Item
+from models.user import User
+from storage.base import (
+    BaseStorage, ChangeCallback, CollectionVersion, DocumentChange, ItemFilters, NO_ITEM_FILTERS, WATCHED_COLLECTIONS,
+    cursor_after, decode_page_cursor, project
+)
+from storage.memory_storage import paginate_rows
+from storage.shared_watch import SharedWatch
+from utils.metrics import record_replica_apply
+
+logger = logging.getLogger(__name__)
+
+# Segundos que puede tardar en llegar una escritura (propia o de otro proceso) antes de recargar la réplica desde cero
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+
+# Resultado de CatalogReplica.read cuando la réplica no puede responder
+STALE = object()
+
+
+class CatalogReplica(SharedWatch):
+    """
+    Copia de las colecciones de WATCHED_COLLECTIONS con índices de items por
+    categoría y por cantidad
+
+    Los documentos se reemplazan completos en cada cambio (nunca se modifican),
+    así que se pueden retornar sin copiarlos mientras no se modifiquen. Los
+    demás observadores del proceso (stream de inventario, búsqueda) reciben
+    los cambios desde la réplica, sin otros listeners en el backend.
+    """
+
+    def __init__(self, backend: BaseStorage, max_lag: float = REPLICA_MAX_LAG):
+        super().__init__(backend, WATCHED_COLLECTIONS)
+        self.max_lag = max_lag
+        # IDs de items por categoría y pares (cantidad, ID) ordenados
+        self._items_by_category: Dict[str, Set[str]] = {}
+        self._items_by_quantity: List[Tuple[Any, str]] = []
+        # Escrituras propias que el listener todavía no trajo: colección -> ID -> inicio de la escritura
+        self._pending: Dict[str, Dict[str, float]] = {collection: {} for collection in WATCHED_COLLECTIONS}
+        # Momento en que se aplicó el último cambio de cada documento (para escrituras que llegan antes que `expect`)
+        self._applied_at: Dict[str, float] = {}
+        # Instante que refleja el último lote de cada listener (ChangeBatch.read_time; None en backends locales)
+        self._read_time: Dict[str, Any] = {collection: None for collection in WATCHED_COLLECTIONS}
+        # Última versión leída del backend y desde cuándo la réplica no la tiene (time.monotonic())
+        self._known: Dict[str, CollectionVersion] = {}
+        self._behind_since: Dict[str, Optional[float]] = {collection: None for collection in WATCHED_COLLECTIONS}
+        self._checked_at = time.monotonic()
+        self._checking = False
+        self._resyncing = False
+        # Contadores expuestos en /metrics
+        self.hits = 0
+        self.fallbacks = 0
+
+    # =================== LISTENERS ===================
+
+    def resync(self):
+        """Recarga la réplica desde cero con listeners nuevos"""
+        logger.warning("Réplica de storage desactualizada: se recarga desde el backend")
+        try:
+            super().resync()
+        finally:
+            with self._lock:
+                self._resyncing = False
+
+    def _on_start(self, collection: str):
+        self._pending[collection].clear()
+        self._read_time[collection] = None
+        self._behind_since[collection] = None
+
+    def _advance(self, collection: str, changes: List[DocumentChange]):
+        """Registra hasta dónde llegó el listener (requiere el lock)"""
+        self._read_time[collection] = getattr(changes, "read_time", None)
+        if self._has_version(collection):
+            self._behind_since[collection] = None
+
+    def _has_version(self, collection: str) -> bool:
+        """Indica si el listener ya trajo la última versión leída del backend (requiere el lock)"""
+        known = self._known.get(collection)
+        if known is None or known.committed_at is None:
+            return True
+        read_time = self._read_time[collection]
+        return read_time is not None and read_time >= known.committed_at
+
+    def _load(self, collection: str, changes: List[DocumentChange]):
+        """Reemplaza la colección con la carga inicial y arma los índices de una vez (requiere el lock)"""
+        super()._load(collection, changes)
+        self._advance(collection, changes)
+        if collection != "items":
+            return
+        docs = self._docs[collection]
+        self._items_by_category = {}
+        for item_id, data in docs.items():
+            self._items_by_category.setdefault(data["categoryId"], set()).add(item_id)
+        self._items_by_quantity = sorted((data["quantity"], item_id) for item_id, data in docs.items())
+
+    def _apply_batch(self, collection: str, changes: List[DocumentChange]):
+        """Aplica el lote y da por recibidas las escrituras propias que incluye (requiere el lock)"""
+        now = time.monotonic()
+        pending = self._pending[collection]
+        for change in changes:
+            self._apply(collection, change)
+            self._applied_at[change.id] = now
+            started = pending.pop(change.id, None)
+            if started is not None:
+                record_replica_apply(now - started)
+        self._advance(collection, changes)
+
+    def _apply(self, collection: str, change: DocumentChange):
+        """Aplica un cambio a los documentos y a los índices (requiere el lock)"""
+        old = self._docs[collection].get(change.id)
+        super()._apply(collection, change)
+        if collection != "items":
+            return
+        new = self._docs[collection].get(change.id)
+        if old is not None:
+            ids = self._items_by_category.get(old["categoryId"])
+            if ids is not None:
+                ids.discard(change.id)
+                if not ids:
+                    del self._items_by_category[old["categoryId"]]
+            index = bisect.bisect_left(self._items_by_quantity, (old["quantity"], change.id))
+            if index < len(self._items_by_quantity) and self._items_by_quantity[index] == (old["quantity"], change.id):
+                del self._items_by_quantity[index]
+        if new is not None:
+            self._items_by_category.setdefault(new["categoryId"], set()).add(change.id)
+            bisect.insort(self._items_by_quantity, (new["quantity"], change.id))
+
+    # =================== FRESCURA ===================
+
+    def expect(self, collection: str, doc_ids, started: float):
+        """
+        Registra escrituras propias que la réplica debe recibir antes de volver a responder
+
+        `started` es el time.monotonic() de antes de escribir: si el cambio ya
+        llegó después de ese momento no queda pendiente.
+        """
+        with self._lock:
+            if not self._ready[collection]:
+                return
+            now = time.monotonic()
+            pending = self._pending[collection]
+            for doc_id in doc_ids:
+                applied = self._applied_at.get(doc_id)
+                if applied is not None and applied >= started:
+                    continue
+                pending[doc_id] = started
+            # Solo interesan los cambios aplicados hace menos que cualquier escritura en curso
+            if len(self._applied_at) > 10000:
+                self._applied_at = {
+                    doc_id: applied for doc_id, applied in self._applied_at.items() if now - applied < self.max_lag
+                }
+
+    def observe(self, commits: Dict[str, CollectionVersion]):
+        """
+        Registra las versiones leídas del backend
+
+        Mientras el listener de una colección no traiga su versión, las
+        lecturas de esa colección van al backend; así un ETag armado con estas
+        versiones nunca acompaña datos anteriores a ellas.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._checked_at = now
+            for collection, commit in commits.items():
+                if collection not in self._behind_since:
+                    continue
+                known = self._known.get(collection)
+                if known is None or commit.version > known.version:
+                    self._known[collection] = commit
+                if self._has_version(collection):
+                    self._behind_since[collection] = None
+                elif self._behind_since[collection] is None:
+                    self._behind_since[collection] = now
+
+    def check_versions(self):
+        """Lee las versiones del backend para notar escrituras de otros procesos que el listener no trajo"""
+        try:
+            self.observe(self._backend.get_collection_commits())
+        except Exception:
+            logger.exception("Error leyendo las versiones del backend para la réplica")
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def _waiting_since(self, collection: str) -> Optional[float]:
+        """Inicio de la espera más antigua de la colección: escritura propia o versión del backend (requiere el lock)"""
+        starts = list(self._pending[collection].values())
+        if self._behind_since[collection] is not None:
+            starts.append(self._behind_since[collection])
+        return min(starts) if starts else None
+
+    def lag(self) -> float:
+        """Segundos desde la escritura (propia o de otro proceso) más antigua que la réplica todavía no recibió"""
+        with self._lock:
+            starts = [start for start in map(self._waiting_since, WATCHED_COLLECTIONS) if start is not None]
+        return time.monotonic() - min(starts) if starts else 0.0
+
+    def read(self, collections: Tuple[str, ...], func: Callable[..., Any], *args) -> Any:
+        """
+        Ejecuta `func` sobre la réplica si las colecciones están al día, o retorna STALE
+
+        Si las versiones del backend no se leyeron en los últimos
+        REPLICA_MAX_LAG segundos se leen antes de responder. Si una escritura
+        no llega en REPLICA_MAX_LAG segundos se asume que el listener perdió
+        cambios o se colgó y se recarga la réplica.
+        """
+        with self._lock:
+            check = not self._checking and time.monotonic() - self._checked_at > self.max_lag
+            if check:
+                self._checking = True
+        if check:
+            self.check_versions()
+
+        resync = False
+        with self._lock:
+            fresh = True
+            now = time.monotonic()
+            for collection in collections:
+                waiting_since = self._waiting_since(collection)
+                if not self._ready[collection] or waiting_since is not None:
+                    fresh = False
+                    if waiting_since is not None and not self._resyncing and now - waiting_since > self.max_lag:
+                        self._resyncing = resync = True
+            if fresh:
+                self.hits += 1
+                return func(*args)
+            self.fallbacks += 1
+        if resync:
+            self.resync()
+        return STALE
+
+    # =================== CONSULTAS (requieren el lock, vía read) ===================
+
+    def get(self, collection: str, doc_id: str) -> Optional[dict]:
+        return self._docs[collection].get(doc_id)
+
+    def get_many(self, collection: str, doc_ids) -> List[dict]:
+        docs = self._docs[collection]
+        return [docs[doc_id] for doc_id in set(doc_ids) if doc_id in docs]
+
+    def values(self, collection: str) -> List[dict]:
+        return list(self._docs[collection].values())
+
+    def items_in_category(self, category_id: str) -> List[dict]:
+        docs = self._docs["items"]
+        return [docs[item_id] for item_id in self._items_by_category.get(category_id, ())]
+
+    def category_has_items(self, category_id: str) -> bool:
+        return category_id in self._items_by_category
+
+    def query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                    order_fields: Tuple[str, ...] = (),
+                    filters: ItemFilters = NO_ITEM_FILTERS,
+                    descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Consulta paginada con el mismo orden y cursores que el backend, usando los índices"""
+        if order_fields == ("quantity",) and filters.category_ids is None:
+            return self._query_by_quantity(limit, cursor, filters, descending)
+
+        if filters.category_ids is not None:
+            rows = [data for category_id in filters.category_ids for data in self.items_in_category(category_id)]
+        else:
+            rows = self.values("items")
+        rows = [data for data in rows if filters.matches(data)]
+        return paginate_rows(rows, limit, cursor, order_fields, descending)
+
+    def _query_by_quantity(self, limit: Optional[int], cursor: Optional[str],
+                           filters: ItemFilters, descending: bool) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Items por cantidad: el índice ya está en ese orden y el rango de cantidad se corta con búsqueda binaria"""
+        order_fields = ("quantity",)
+        index = self._items_by_quantity
+        start = bisect.bisect_left(index, (filters.quantity_min,)) if filters.quantity_min is not None else 0
+        end = bisect.bisect_left(index, (filters.quantity_lt,)) if filters.quantity_lt is not None else len(index)
+
+        values = decode_page_cursor(cursor, order_fields)
+        if values:
+            after = (values["quantity"], values["__name__"])
+            if descending:
+                end = min(end, bisect.bisect_left(index, after))
+            else:
+                start = max(start, bisect.bisect_right(index, after))
+
+        # El rango de cantidad ya quedó resuelto; el precio se evalúa en cada fila
+        rest = filters._replace(quantity_min=None, quantity_lt=None)
+        matches = None if rest == NO_ITEM_FILTERS else rest.matches
+        docs = self._docs["items"]
+        page = []
+        for position in (range(end - 1, start - 1, -1) if descending else range(start, end)):
+            data = docs[index[position][1]]
+            if matches is None or matches(data):
+                if len(page) == limit:
+                    return page, cursor_after(page[-1], order_fields)
+                page.append(data)
+        return page, None
+
+
+class ReplicatedStorage(BaseStorage):
+    """
+    Backend que sirve las lecturas de items y categorías desde una CatalogReplica
+
+    Las escrituras, los usuarios y el resumen van al backend envuelto. Cada
+    escritura de items o categorías se registra en la réplica para no
+    responder desde ella hasta que el listener la traiga.
+    """
+
+    def __init__(self, backend: BaseStorage, max_lag: float = REPLICA_MAX_LAG):
+        self.backend = backend
+        self.replica = CatalogReplica(backend, max_lag)
+
+    def start(self):
+        """Carga la réplica y la mantiene con los listeners del backend"""
+        self.backend.start()
+        self.replica.start()
+
+    def stop(self):
+        self.replica.stop()
+        self.backend.stop()
+
+    # =================== USER OPERATIONS ===================
+
+    def create_user(self, user_data: dict) -> User:
+        return self.backend.create_user(user_data)
+
+    def get_user_by_id(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        return self.backend.get_user_by_id(user_id, fields)
+
+    def get_user_by_email(self, email: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        return self.backend.get_user_by_email(email, fields)
+
+    def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
+        return self.backend.update_user(user_id, user_data)
+
+    def delete_user(self, user_id: str) -> bool:
+        return self.backend.delete_user(user_id)
+
+    # =================== CATEGORY OPERATIONS ===================
+
+    def create_category(self, category_data: dict) -> Category:
+        started = time.monotonic()
+        category = self.backend.create_category(category_data)
+        self.replica.expect("categories", [category.id], started)
+        return category
+
+    def get_category_by_id(self, category_id: str) -> Optional[Category]:
+        data = self.replica.read(("categories",), self.replica.get, "categories", category_id)
+        if data is STALE:
+            return self.backend.get_category_by_id(category_id)
+        return self._to_category(data) if data else None
+
+    def get_categories_by_ids(self, category_ids) -> Dict[str, Category]:
+        category_ids = list(category_ids)
+        rows = self.replica.read(("categories",), self.replica.get_many, "categories", category_ids)
+        if rows is STALE:
+            return self.backend.get_categories_by_ids(category_ids)
+        return {category.id: category for category in self._to_categories(rows)}
+
+    def get_all_categories(self) -> List[Category]:
+        rows = self.replica.read(("categories",), self.replica.values, "categories")
+        if rows is STALE:
+            return self.backend.get_all_categories()
+        return self._to_categories(rows)
+
+    def get_category_names(self) -> Dict[str, str]:
+        rows = self.replica.read(("categories",), self.replica.values, "categories")
+        if rows is STALE:
+            return self.backend.get_category_names()
+        return {data["id"]: data["name"] for data in rows}
+
+    def get_categories_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Category], Optional[str]]:
+        page = self.replica.read(
+            ("categories",), lambda: paginate_rows(self.replica.values("categories"), limit, cursor)
+        )
+        if page is STALE:
+            return self.backend.get_categories_page(limit, cursor)
+        rows, next_cursor = page
+        return self._to_categories(rows), next_cursor
+
+    def update_category(self, category_id: str, category_data: dict) -> Optional[Category]:
+        started = time.monotonic()
+        category = self.backend.update_category(category_id, category_data)
+        if category is not None:
+            self.replica.expect("categories", [category_id], started)
+        return category
+
+    def delete_category(self, category_id: str) -> bool:
+        started = time.monotonic()
+        deleted = self.backend.delete_category(category_id)
+        if deleted:
+            self.replica.expect("categories", [category_id], started)
+        return deleted
+
+    def category_has_items(self, category_id: str) -> bool:
+        has_items = self.replica.read(("items",), self.replica.category_has_items, category_id)
+        if has_items is STALE:
+            return self.backend.category_has_items(category_id)
+        return has_items
+
+    def category_exists(self, category_id: str) -> bool:
+        data = self.replica.read(("categories",), self.replica.get, "categories", category_id)
+        if data is STALE:
+            return self.backend.category_exists(category_id)
+        return data is not None
+
+    # =================== ITEM OPERATIONS ===================
+
+    def create_item(self, item_data: dict) -> Item:
+        started = time.monotonic()
+        item = self.backend.create_item(item_data)
+        self.replica.expect("items", [item.id], started)
+        return item
+
+    def get_item_by_id(self, item_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Item]:
+        data = self.replica.read(("items",), self.replica.get, "items", item_id)
+        if data is STALE:
+            return self.backend.get_item_by_id(item_id, fields)
+        return self._to_item(data, fields) if data else None
+
+    def get_all_items(self) -> List[Item]:
+        rows = self.replica.read(("items",), self.replica.values, "items")
+        if rows is STALE:
+            return self.backend.get_all_items()
+        return self._to_items(rows)
+
+    def stream_items(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        rows = self.replica.read(("items",), self.replica.values, "items")
+        if rows is STALE:
+            yield from self.backend.stream_items(fields)
+            return
+        for data in rows:
+            yield dict(data) if fields is None else project(data, fields)
+
+    def get_items_by_category(self, category_id: str) -> List[Item]:
+        rows = self.replica.read(("items",), self.replica.items_in_category, category_id)
+        if rows is STALE:
+            return self.backend.get_items_by_category(category_id)
+        return self._to_items(rows)
+
+    def _query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                     order_fields: Tuple[str, ...] = (),
+                     filters: ItemFilters = NO_ITEM_FILTERS,
+                     descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        page = self.replica.read(
+            ("items",), self.replica.query_items, limit, cursor, order_fields, filters, descending
+        )
+        if page is STALE:
+            # El backend puede no resolver todos los filtros en la consulta (Firestore)
+            return self.backend._filtered_rows(limit, cursor, order_fields, filters, descending)
+        return page
+
+    def update_item(self, item_id: str, item_data: dict) -> Optional[Item]:
+        started = time.monotonic()
+        item = self.backend.update_item(item_id, item_data)
+        if item is not None:
+            self.replica.expect("items", [item_id], started)
+        return item
+
+    def delete_item(self, item_id: str) -> bool:
+        started = time.monotonic()
+        deleted = self.backend.delete_item(item_id)
+        if deleted:
+            self.replica.expect("items", [item_id], started)
+        return deleted
+
+    # =================== BULK ITEM OPERATIONS ===================
+
+    def bulk_create_items(self, items_data: List[dict]) -> List[Item]:
+        started = time.monotonic()
+        items = self.backend.bulk_create_items(items_data)
+        self.replica.expect("items", [item.id for item in items], started)
+        return items
+
+    def bulk_update_items(self, updates: List[Tuple[str, dict]]) -> Dict[str, Optional[Item]]:
+        started = time.monotonic()
+        results = self.backend.bulk_update_items(updates)
+        self.replica.expect("items", [item_id for item_id, item in results.items() if item is not None], started)
+        return results
+
+    def bulk_delete_items(self, item_ids: List[str]) -> Dict[str, bool]:
+        started = time.monotonic()
+        results = self.backend.bulk_delete_items(item_ids)
+        self.replica.expect("items", [item_id for item_id, deleted in results.items() if deleted], started)
+        return results
+
+    # =================== DASHBOARD SUMMARY ===================
+
+    def get_summary(self) -> Dict[str, Any]:
+        return self.backend.get_summary()
+
+    def rebuild_summary(self) -> Dict[str, Any]:
+        return self.backend.rebuild_summary()
+
+    # =================== CHANGE FEED ===================
+
+    def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """Reutiliza los listeners de la réplica en lugar de abrir otros en el backend"""
+        return self.replica.subscribe(collection, callback, include_initial)
+
+    def get_collection_versions(self) -> Dict[str, int]:
+        """Versiones del backend; las lecturas no usan la réplica hasta que el listener las traiga"""
+        commits = self.get_collection_commits()
+        return {collection: commit.version for collection, commit in commits.items()}
+
+    def get_collection_commits(self) -> Dict[str, CollectionVersion]:
+        commits = self.backend.get_collection_commits()
+        self.replica.observe(commits)
+        return commits
@@ -0,0 +1,184 @@
+"""
+Listeners del backend compartidos por todos los observadores del proceso.
+
+El índice de búsqueda, el stream de inventario y la réplica necesitan los
+cambios de las mismas colecciones; cada listener de Firestore cobra la lectura
+inicial de la colección completa y mantiene su propio stream. `SharedWatch`
+abre uno solo por colección, guarda una copia de los documentos para entregar
+la carga inicial a los observadores que llegan después y reparte cada lote
+a todos.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from storage.base import BaseStorage, ChangeCallback, DocumentChange, LocalChangeFeed, WATCHED_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class SharedWatch:
+    """
+    Un listener del backend por colección con reparto a los observadores del proceso
+
+    Cada colección se abre con el primer observador y queda abierta hasta
+    `stop` (reabrirla en Firestore vuelve a cobrar la lectura inicial). Los
+    documentos se reemplazan completos en cada cambio, así que la copia
+    comparte los diccionarios con los observadores en lugar de duplicarlos.
+    """
+
+    def __init__(self, backend: BaseStorage, collections: Iterable[str] = WATCHED_COLLECTIONS):
+        self._backend = backend
+        self.collections = tuple(collections)
+        self._lock = threading.RLock()
+        self._start_lock = threading.Lock()
+        self._docs: Dict[str, Dict[str, dict]] = {collection: {} for collection in self.collections}
+        self._ready: Dict[str, bool] = {collection: False for collection in self.collections}
+        # Colecciones con listener abierto (se reabren en `resync`)
+        self._active: Set[str] = set()
+        # Los listeners cerrados por `stop` se ignoran aunque todavía entreguen algún lote
+        self._generation = 0
+        self._unsubscribers: List[Callable[[], None]] = []
+        self._changes = LocalChangeFeed()
+        # Observadores que esperan la carga inicial de una colección para recibirla completa
+        self._waiting: Dict[str, List[ChangeCallback]] = {collection: [] for collection in self.collections}
+        self._loaded: Dict[str, bool] = {collection: False for collection in self.collections}
+        # Contadores expuestos en /metrics
+        self.applied_changes = 0
+        self.resyncs = 0
+
+    # =================== LISTENERS ===================
+
+    def start(self, collections: Optional[Iterable[str]] = None):
+        """Abre un listener por colección (todas por defecto); cada una queda lista con su primer snapshot"""
+        collections = tuple(self.collections if collections is None else collections)
+        with self._lock:
+            generation = self._generation
+            for collection in collections:
+                self._ready[collection] = False
+                self._on_start(collection)
+            self._active.update(collections)
+        # Sin el lock: los backends locales entregan la carga inicial con su propio lock tomado
+        unsubscribers = [
+            self._backend.watch(collection, self._listener(collection, generation), include_initial=True)
+            for collection in collections
+        ]
+        with self._lock:
+            self._unsubscribers.extend(unsubscribers)
+
+    def stop(self):
+        """Cierra los listeners; `resync` los vuelve a abrir"""
+        with self._lock:
+            self._generation += 1
+            unsubscribers, self._unsubscribers = self._unsubscribers, []
+            for collection in self.collections:
+                self._ready[collection] = False
+        for unsubscribe in unsubscribers:
+            try:
+                unsubscribe()
+            except Exception:
+                logger.exception("Error cerrando un listener compartido")
+
+    def resync(self):
+        """Recarga las colecciones abiertas desde cero con listeners nuevos"""
+        self.resyncs += 1
+        with self._lock:
+            collections = [collection for collection in self.collections if collection in self._active]
+        self.stop()
+        self.start(collections)
+
+    def _ensure_started(self, collection: str):
+        with self._start_lock:
+            if collection not in self._active:
+                self.start((collection,))
+
+    def _on_start(self, collection: str):
+        """Se llama al abrir el listener de una colección (con el lock tomado)"""
+        pass
+
+    def _listener(self, collection: str, generation: int) -> ChangeCallback:
+        def on_changes(changes: List[DocumentChange]):
+            self._on_changes(collection, generation, changes)
+        return on_changes
+
+    def _on_changes(self, collection: str, generation: int, changes: List[DocumentChange]):
+        """Aplica un lote del listener y lo reparte (el primero de cada listener es la colección completa)"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            if not self._ready[collection]:
+                old = self._docs[collection]
+                self._load(collection, changes)
+                self._ready[collection] = True
+                logger.info("Listener de %s cargado con %d documentos", collection, len(changes))
+                if self._loaded[collection]:
+                    # Recarga: los observadores reciben lo que cambió mientras no había listener
+                    self._changes.publish(collection, self._diff(old, self._docs[collection]))
+                self._loaded[collection] = True
+                waiting, self._waiting[collection] = self._waiting[collection], []
+                for callback in waiting:
+                    self._deliver_initial(collection, callback)
+                return
+
+            self._apply_batch(collection, changes)
+            self.applied_changes += len(changes)
+            self._changes.publish(collection, changes)
+
+    def _load(self, collection: str, changes: List[DocumentChange]):
+        """Reemplaza la colección con la carga inicial (requiere el lock)"""
+        self._docs[collection] = {change.id: change.data for change in changes if change.data is not None}
+
+    def _apply_batch(self, collection: str, changes: List[DocumentChange]):
+        """Aplica un lote posterior a la carga inicial (requiere el lock)"""
+        for change in changes:
+            self._apply(collection, change)
+
+    def _apply(self, collection: str, change: DocumentChange):
+        """Aplica un cambio a los documentos (requiere el lock)"""
+        docs = self._docs[collection]
+        docs.pop(change.id, None)
+        if change.type != "removed" and change.data is not None:
+            docs[change.id] = change.data
+
+    @staticmethod
+    def _diff(old: Dict[str, dict], new: Dict[str, dict]) -> List[DocumentChange]:
+        """Cambios que llevan de `old` a `new`"""
+        changes = [DocumentChange("removed", doc_id, None) for doc_id in old if doc_id not in new]
+        for doc_id, data in new.items():
+            previous = old.get(doc_id)
+            if previous is None:
+                changes.append(DocumentChange("added", doc_id, data))
+            elif previous != data:
+                changes.append(DocumentChange("modified", doc_id, data))
+        return changes
+
+    def _deliver_initial(self, collection: str, callback: ChangeCallback):
+        """Entrega la colección completa y suscribe al callback (requiere el lock, así no se pierde ningún cambio)"""
+        callback([DocumentChange("added", doc_id, data) for doc_id, data in self._docs[collection].items()])
+        self._changes.subscribe(collection, callback)
+
+    def subscribe(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """
+        Recibe los cambios de una colección, sin abrir otro listener en el backend
+
+        Con `include_initial` el primer lote es la colección completa; si
+        todavía no cargó, se entrega apenas termine.
+        """
+        self._ensure_started(collection)
+        with self._lock:
+            if not include_initial:
+                self._changes.subscribe(collection, callback)
+            elif self._ready[collection]:
+                self._deliver_initial(collection, callback)
+            else:
+                self._waiting[collection].append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._waiting[collection]:
+                    self._waiting[collection].remove(callback)
+            self._changes.unsubscribe(collection, callback)
+        return unsubscribe
+
+    @property
+    def ready(self) -> bool:
+        return all(self._ready.values())
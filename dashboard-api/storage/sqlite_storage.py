@@ -0,0 +1,466 @@
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from models.user import User
+from models.category import Category
+from models.item import Item
+from storage.base import (
+    BaseStorage, ChangeCallback, DocumentChange, EmailAlreadyRegistered, ItemFilters, LocalChangeFeed, LOW_STOCK_THRESHOLD,
+    NO_ITEM_FILTERS, VERSIONED_COLLECTIONS, WATCHED_COLLECTIONS, cursor_after, decode_page_cursor, normalize_email,
+    project
+)
+from datetime import datetime
+
+# Columnas de cada tabla (los campos de los diccionarios que se pueden guardar)
+USER_COLUMNS = ("id", "name", "lastName", "email", "password", "avatar", "resetCode", "createdAt", "updatedAt")
+CATEGORY_COLUMNS = ("id", "name", "lowStockThreshold", "createdAt", "updatedAt")
+ITEM_COLUMNS = ("id", "name", "description", "quantity", "price", "categoryId", "createdAt", "updatedAt")
+
+# Filas leídas por consulta al recorrer todos los items
+STREAM_CHUNK_SIZE = 500
+
+VERSION_TRIGGERS = "\n".join(
+    f"""CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+    UPDATE versions SET version = version + 1 WHERE collection = '{table}';
+END;"""
+    for table in VERSIONED_COLLECTIONS
+    for event in ("INSERT", "UPDATE", "DELETE")
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    lastName TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    avatar TEXT,
+    resetCode TEXT,
+    createdAt TEXT,
+    updatedAt TEXT
+);
+-- Unicidad del email sin distinguir mayúsculas (lower() de SQLite solo convierte ASCII)
+DROP INDEX IF EXISTS idx_users_email;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_key ON users (lower(email));
+
+CREATE TABLE IF NOT EXISTS categories (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    lowStockThreshold INTEGER,
+    createdAt TEXT,
+    updatedAt TEXT
+);
+
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    categoryId TEXT NOT NULL,
+    createdAt TEXT,
+    updatedAt TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_category ON items (categoryId, id);
+CREATE INDEX IF NOT EXISTS idx_items_quantity ON items (quantity, id);
+CREATE INDEX IF NOT EXISTS idx_items_category_quantity ON items (categoryId, quantity, id);
+CREATE INDEX IF NOT EXISTS idx_items_price ON items (price, id);
+CREATE INDEX IF NOT EXISTS idx_items_name ON items (name, id);
+
+-- Resumen del dashboard, mantenido por triggers en la misma transacción que cada escritura
+CREATE TABLE IF NOT EXISTS summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    totalItems INTEGER NOT NULL,
+    totalCategories INTEGER NOT NULL,
+    lowStockItems INTEGER NOT NULL,
+    totalValue REAL NOT NULL
+);
+INSERT OR IGNORE INTO summary VALUES (1, 0, 0, 0, 0.0);
+
+CREATE TRIGGER IF NOT EXISTS items_summary_insert AFTER INSERT ON items BEGIN
+    UPDATE summary SET
+        totalItems = totalItems + 1,
+        lowStockItems = lowStockItems + (NEW.quantity < {LOW_STOCK_THRESHOLD}),
+        totalValue = totalValue + NEW.price * NEW.quantity
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS items_summary_update AFTER UPDATE OF quantity, price ON items BEGIN
+    UPDATE summary SET
+        lowStockItems = lowStockItems - (OLD.quantity < {LOW_STOCK_THRESHOLD}) + (NEW.quantity < {LOW_STOCK_THRESHOLD}),
+        totalValue = totalValue - OLD.price * OLD.quantity + NEW.price * NEW.quantity
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS items_summary_delete AFTER DELETE ON items BEGIN
+    UPDATE summary SET
+        totalItems = totalItems - 1,
+        lowStockItems = lowStockItems - (OLD.quantity < {LOW_STOCK_THRESHOLD}),
+        totalValue = totalValue - OLD.price * OLD.quantity
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS categories_summary_insert AFTER INSERT ON categories BEGIN
+    UPDATE summary SET totalCategories = totalCategories + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS categories_summary_delete AFTER DELETE ON categories BEGIN
+    UPDATE summary SET totalCategories = totalCategories - 1 WHERE id = 1;
+END;
+
+-- Versión de cada colección, incrementada por triggers en cada escritura
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+-- Empiezan en la hora de creación: si se borra la base, un ETag anterior no vuelve a coincidir
+INSERT OR IGNORE INTO versions
+    SELECT 'items', CAST(strftime('%s', 'now') AS INTEGER) UNION ALL SELECT 'categories', CAST(strftime('%s', 'now') AS INTEGER);
+{VERSION_TRIGGERS}
+"""
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Backend SQLite con el mismo comportamiento que FirebaseStorage.
+
+    Usa índices por categoría y cantidad para las consultas paginadas y de
+    stock bajo; para despliegues pequeños evita los round trips a Firestore.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+        # Solo ve las escrituras de este proceso; se publican tras el commit y con el lock tomado
+        self._changes = LocalChangeFeed()
+
+    def _fetch_one(self, sql: str, params=()) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def _fetch_all(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _select_list(columns: Tuple[str, ...], fields: Optional[Sequence[str]] = None) -> str:
+        """Columnas del SELECT de una lectura proyectada (None = todas)"""
+        if fields is None:
+            return "*"
+        if not set(fields) <= set(columns):
+            raise ValueError("Campo inválido en la proyección")
+        return ", ".join(dict.fromkeys(fields)) or "id"
+
+    def _insert(self, table: str, columns: Tuple[str, ...], data: dict):
+        """Inserta una fila (requiere el lock y una transacción abierta)"""
+        values = {column: data.get(column) for column in columns}
+        self._conn.execute(
+            f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+            tuple(values.values())
+        )
+
+    def _update(self, table: str, columns: Tuple[str, ...], row_id: str, data: dict) -> Optional[Dict[str, Any]]:
+        """Actualiza las columnas conocidas de una fila y la retorna (requiere el lock y una transacción abierta)"""
+        values = {column: value for column, value in data.items() if column in columns and column != "id"}
+        values["updatedAt"] = datetime.now().isoformat()
+        cursor = self._conn.execute(
+            f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in values)} WHERE id = ?",
+            (*values.values(), row_id)
+        )
+        if cursor.rowcount == 0:
+            return None
+        return dict(self._conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,)).fetchone())
+
+    # =================== USER OPERATIONS ===================
+
+    def create_user(self, user_data: dict) -> User:
+        """Crea un nuevo usuario"""
+        user = User(
+            id=self.generate_id(),
+            name=user_data["name"],
+            lastName=user_data["lastName"],
+            email=user_data["email"],
+            password=user_data["password"],
+            avatar=user_data.get("avatar"),
+            resetCode=None
+        )
+        try:
+            with self._lock, self._conn:
+                self._insert("users", USER_COLUMNS, {**user.dict(), "createdAt": datetime.now().isoformat()})
+        except sqlite3.IntegrityError:
+            raise EmailAlreadyRegistered(user.email)
+        return user
+
+    def get_user_by_id(self, user_id: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por ID"""
+        columns = self._select_list(USER_COLUMNS, fields)
+        data = self._fetch_one(f"SELECT {columns} FROM users WHERE id = ?", (user_id,))
+        return self._to_user(data, fields) if data else None
+
+    def get_user_by_email(self, email: str, fields: Optional[Sequence[str]] = None) -> Optional[User]:
+        """Obtiene un usuario por email"""
+        columns = self._select_list(USER_COLUMNS, fields)
+        data = self._fetch_one(f"SELECT {columns} FROM users WHERE lower(email) = ? LIMIT 1", (normalize_email(email),))
+        return self._to_user(data, fields) if data else None
+
+    def update_user(self, user_id: str, user_data: dict) -> Optional[User]:
+        """Actualiza un usuario"""
+        try:
+            with self._lock, self._conn:
+                data = self._update("users", USER_COLUMNS, user_id, user_data)
+        except sqlite3.IntegrityError:
+            raise EmailAlreadyRegistered(user_data.get("email"))
+        return self._to_user(data) if data else None
+
+    def delete_user(self, user_id: str) -> bool:
+        """Elimina un usuario"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM users WHERE id = ?", (user_id,)).rowcount > 0
+
+    # =================== CATEGORY OPERATIONS ===================
+
+    def create_category(self, category_data: dict) -> Category:
+        """Crea una nueva categoría"""
+        category = Category(
+            id=self.generate_id(),
+            name=category_data["name"],
+            lowStockThreshold=category_data.get("lowStockThreshold")
+        )
+        data = {**category.dict(), "createdAt": datetime.now().isoformat()}
+        with self._lock:
+            with self._conn:
+                self._insert("categories", CATEGORY_COLUMNS, data)
+            self._changes.publish("categories", [DocumentChange("added", category.id, data)])
+        return category
+
+    def get_category_by_id(self, category_id: str) -> Optional[Category]:
+        """Obtiene una categoría por ID"""
+        data = self._fetch_one("SELECT * FROM categories WHERE id = ?", (category_id,))
+        return self._to_category(data) if data else None
+
+    def get_categories_by_ids(self, category_ids) -> Dict[str, Category]:
+        """Obtiene varias categorías en una sola consulta"""
+        unique_ids = list({category_id for category_id in category_ids if category_id})
+        if not unique_ids:
+            return {}
+        rows = self._fetch_all(
+            f"SELECT * FROM categories WHERE id IN ({', '.join('?' * len(unique_ids))})",
+            unique_ids
+        )
+        return {category.id: category for category in self._to_categories(rows)}
+
+    def get_all_categories(self) -> List[Category]:
+        """Obtiene todas las categorías"""
+        return self._to_categories(self._fetch_all("SELECT * FROM categories"))
+
+    def get_categories_page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Category], Optional[str]]:
+        """Obtiene una página de categorías ordenadas por ID"""
+        rows, next_cursor = self._paginate("categories", limit, cursor)
+        return self._to_categories(rows), next_cursor
+
+    def update_category(self, category_id: str, category_data: dict) -> Optional[Category]:
+        """Actualiza una categoría"""
+        with self._lock:
+            with self._conn:
+                data = self._update("categories", CATEGORY_COLUMNS, category_id, category_data)
+            if data:
+                self._changes.publish("categories", [DocumentChange("modified", category_id, data)])
+        return self._to_category(data) if data else None
+
+    def delete_category(self, category_id: str) -> bool:
+        """Elimina una categoría (False si no existe)"""
+        with self._lock:
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM categories WHERE id = ?", (category_id,)).rowcount > 0
+            if deleted:
+                self._changes.publish("categories", [DocumentChange("removed", category_id, None)])
+        return deleted
+
+    def category_has_items(self, category_id: str) -> bool:
+        """Verifica si una categoría tiene items"""
+        return self._fetch_one("SELECT 1 AS found FROM items WHERE categoryId = ? LIMIT 1", (category_id,)) is not None
+
+    # =================== ITEM OPERATIONS ===================
+
+    def _paginate(self, table: str, limit: Optional[int], cursor: Optional[str] = None,
+                  order_fields: Tuple[str, ...] = (),
+                  clauses: Optional[List[str]] = None,
+                  params: Optional[list] = None,
+                  descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Consulta paginada por keyset: ordena por `order_fields` y luego por ID (sin `limit`, todo)"""
+        clauses = list(clauses or [])
+        params = list(params or [])
+        order_columns = [*order_fields, "id"]
+        direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+
+        values = decode_page_cursor(cursor, order_fields)
+        if values:
+            clauses.append(f"({', '.join(order_columns)}) {comparison} ({', '.join('?' * len(order_columns))})")
+            params += [values[field] for field in order_fields] + [values["__name__"]]
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order_by = ", ".join(f"{column} {direction}" for column in order_columns)
+        # LIMIT -1 en SQLite es sin límite
+        rows = self._fetch_all(
+            f"SELECT * FROM {table} {where} ORDER BY {order_by} LIMIT ?",
+            (*params, -1 if limit is None else limit + 1)
+        )
+        if limit is None:
+            return rows, None
+        next_cursor = cursor_after(rows[limit - 1], order_fields) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def create_item(self, item_data: dict) -> Item:
+        """Crea un nuevo item"""
+        return self.bulk_create_items([item_data])[0]
+
+    def get_item_by_id(self, item_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Item]:
+        """Obtiene un item por ID"""
+        columns = self._select_list(ITEM_COLUMNS, fields)
+        data = self._fetch_one(f"SELECT {columns} FROM items WHERE id = ?", (item_id,))
+        return self._to_item(data, fields) if data else None
+
+    def get_all_items(self) -> List[Item]:
+        """Obtiene todos los items"""
+        return self._to_items(self._fetch_all("SELECT * FROM items"))
+
+    def stream_items(self, fields: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Recorre los items por bloques ordenados por ID, sin cargarlos todos en memoria"""
+        # El ID se lee siempre porque marca dónde sigue el próximo bloque
+        columns = "*" if fields is None else self._select_list(ITEM_COLUMNS, ("id", *fields))
+        last_id = ""
+        while True:
+            rows = self._fetch_all(
+                f"SELECT {columns} FROM items WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, STREAM_CHUNK_SIZE)
+            )
+            if fields is None or "id" in fields:
+                yield from rows
+            else:
+                yield from (project(data, fields) for data in rows)
+            if len(rows) < STREAM_CHUNK_SIZE:
+                return
+            last_id = rows[-1]["id"]
+
+    def get_items_by_category(self, category_id: str) -> List[Item]:
+        """Obtiene items por categoría"""
+        rows = self._fetch_all("SELECT * FROM items WHERE categoryId = ?", (category_id,))
+        return self._to_items(rows)
+
+    def _query_items(self, limit: Optional[int], cursor: Optional[str] = None,
+                     order_fields: Tuple[str, ...] = (),
+                     filters: ItemFilters = NO_ITEM_FILTERS,
+                     descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Consulta paginada de items usando los índices por categoría, cantidad, precio y nombre"""
+        if not set(order_fields) <= set(ITEM_COLUMNS):
+            raise ValueError("Campo de ordenamiento inválido")
+
+        clauses, params = [], []
+        if filters.category_ids is not None:
+            clauses.append(f"categoryId IN ({', '.join('?' * len(filters.category_ids))})")
+            params += sorted(filters.category_ids)
+        for column, operator, value in (
+            ("price", ">=", filters.price_min),
+            ("price", "<=", filters.price_max),
+            ("quantity", ">=", filters.quantity_min),
+            ("quantity", "<", filters.quantity_lt),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        return self._paginate("items", limit, cursor, order_fields, clauses, params, descending)
+
+    def update_item(self, item_id: str, item_data: dict) -> Optional[Item]:
+        """Actualiza un item (None si no existe)"""
+        with self._lock:
+            with self._conn:
+                data = self._update("items", ITEM_COLUMNS, item_id, item_data)
+            if data:
+                self._changes.publish("items", [DocumentChange("modified", item_id, data)])
+        return self._to_item(data) if data else None
+
+    def delete_item(self, item_id: str) -> bool:
+        """Elimina un item (False si no existe)"""
+        return self.bulk_delete_items([item_id])[item_id]
+
+    # =================== BULK ITEM OPERATIONS ===================
+
+    def bulk_create_items(self, items_data: List[dict]) -> List[Item]:
+        """Crea varios items en una sola transacción"""
+        items = self._to_items({**item_data, "id": self.generate_id()} for item_data in items_data)
+        created_at = datetime.now().isoformat()
+        changes = []
+        with self._lock:
+            with self._conn:
+                for item in items:
+                    data = {**item.dict(), "createdAt": created_at}
+                    self._insert("items", ITEM_COLUMNS, data)
+                    changes.append(DocumentChange("added", item.id, data))
+            self._changes.publish("items", changes)
+        return items
+
+    def bulk_update_items(self, updates: List[Tuple[str, dict]]) -> Dict[str, Optional[Item]]:
+        """Actualiza varios items (IDs sin repetir) en una sola transacción"""
+        results = {}
+        changes = []
+        with self._lock:
+            with self._conn:
+                for item_id, item_data in updates:
+                    data = self._update("items", ITEM_COLUMNS, item_id, item_data)
+                    results[item_id] = self._to_item(data) if data else None
+                    if data:
+                        changes.append(DocumentChange("modified", item_id, data))
+            self._changes.publish("items", changes)
+        return results
+
+    def bulk_delete_items(self, item_ids: List[str]) -> Dict[str, bool]:
+        """Elimina varios items en una sola transacción"""
+        with self._lock:
+            with self._conn:
+                results = {
+                    item_id: self._conn.execute("DELETE FROM items WHERE id = ?", (item_id,)).rowcount > 0
+                    for item_id in dict.fromkeys(item_ids)
+                }
+            self._changes.publish("items", [
+                DocumentChange("removed", item_id, None) for item_id, deleted in results.items() if deleted
+            ])
+        return results
+
+    # =================== DASHBOARD SUMMARY ===================
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Obtiene el resumen del dashboard (mantenido por triggers)"""
+        return self._fetch_one("SELECT totalItems, totalCategories, lowStockItems, totalValue FROM summary WHERE id = 1")
+
+    def rebuild_summary(self) -> Dict[str, Any]:
+        """Recalcula el resumen desde las tablas"""
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                UPDATE summary SET
+                    totalItems = (SELECT COUNT(*) FROM items),
+                    totalCategories = (SELECT COUNT(*) FROM categories),
+                    lowStockItems = (SELECT COUNT(*) FROM items WHERE quantity < {LOW_STOCK_THRESHOLD}),
+                    totalValue = (SELECT COALESCE(SUM(price * quantity), 0.0) FROM items)
+                WHERE id = 1
+            """)
+        return self.get_summary()
+
+    def watch(self, collection: str, callback: ChangeCallback, include_initial: bool = False) -> Callable[[], None]:
+        """Observa los cambios de una colección hechos por este proceso (no ve otros procesos sobre el mismo archivo)"""
+        if collection not in WATCHED_COLLECTIONS:
+            raise ValueError(f"Colección no observable: {collection}")
+        # Con el lock tomado ninguna escritura se publica entre la carga inicial y la suscripción
+        with self._lock:
+            if include_initial:
+                rows = self._fetch_all(f"SELECT * FROM {collection}")
+                callback([DocumentChange("added", data["id"], data) for data in rows])
+            return self._changes.subscribe(collection, callback)
+
+    def get_collection_versions(self) -> Dict[str, int]:
+        """Obtiene las versiones de las colecciones (mantenidas por triggers)"""
+        rows = self._fetch_all("SELECT collection, version FROM versions")
+        return {row["collection"]: row["version"] for row in rows}
@@ -0,0 +1,74 @@
+"""
+Configuración de los tests: backends locales (memory y sqlite), sin Firebase.
+
+Las variables de entorno se fijan antes de importar la aplicación, porque el
+storage y el directorio de llaves JWT se configuran al importar los módulos.
+"""
+import os
+import sys
+import tempfile
+
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["STORAGE_REPLICA"] = "0"
+os.environ.setdefault("JWT_KEYS_DIR", tempfile.mkdtemp(prefix="jwt-keys-"))
+os.environ.setdefault("AVATAR_DIR", tempfile.mkdtemp(prefix="blobs-"))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_POOL_KIND", "thread")
+os.environ.setdefault("AVATAR_POOL_KIND", "thread")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jwt_keys import KeyRing  # noqa: E402
+
+# La aplicación no crea llaves JWT: se crea la primera como con `python -m utils.jwt_keys init`
+KeyRing(os.environ["JWT_KEYS_DIR"]).ensure_key()
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from storage.memory_storage import MemoryStorage  # noqa: E402
+from storage.sqlite_storage import SQLiteStorage  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Backend vacío de cada tipo local"""
+    if request.param == "memory":
+        backend = MemoryStorage()
+    else:
+        backend = SQLiteStorage(str(tmp_path / "dashboard.db"))
+    backend.start()
+    yield backend
+    backend.stop()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """La aplicación arranca una vez: al apagarse cierra los pools del proceso"""
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client):
+    """Cliente HTTP de la aplicación sobre un backend en memoria vacío"""
+    from storage.async_storage import storage
+
+    storage.use_backend(MemoryStorage())
+    return app_client
+
+
+def add_category(backend, name: str = "General", **fields):
+    return backend.create_category({"name": name, **fields})
+
+
+def add_item(backend, category_id: str, name: str = "Producto", quantity: int = 10, price: float = 1.0,
+             description: str = ""):
+    return backend.create_item({
+        "name": name,
+        "description": description,
+        "quantity": quantity,
+        "price": price,
+        "categoryId": category_id,
+    })
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from storage.async_storage import storage
+from utils.auth import token_cache
+from utils.cache import ExpiringLRUCache
+
+PASSWORD = "secreto123"
+
+
+@pytest.fixture
+def session(client):
+    """Usuario registrado, su token y `/auth/me` ya respondido desde las cachés"""
+    client.post("/auth/register", json={
+        "name": "Ana", "lastName": "Pérez", "email": "ana@example.com", "password": PASSWORD
+    })
+    login = client.post("/auth/login", json={"email": "ana@example.com", "password": PASSWORD}).json()
+    headers = {"Authorization": f"Bearer {login['jwt']}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert token_cache.get(login["jwt"]) is not None
+    assert storage.user_cache.get(login["user"]["id"]) is not None
+    return login["user"]["id"], login["jwt"], headers
+
+
+def reset_password(client, new_password):
+    message = client.post("/auth/forgot-password", json={"email": "ana@example.com"}).json()["message"]
+    code = message.rsplit(" ", 1)[-1]
+    return client.post("/auth/reset-password", json={
+        "email": "ana@example.com", "resetCode": code, "newPassword": new_password
+    })
+
+
+def test_user_writes_invalidate_the_cached_user(client):
+    user = storage.backend.create_user({
+        "name": "Ana", "lastName": "Pérez", "email": "ana@example.com", "password": "hash"
+    })
+
+    async def scenario():
+        assert (await storage.get_user_by_id_cached(user.id)).name == "Ana"
+        await storage.update_user(user.id, {"name": "Ana María"})
+        assert (await storage.get_user_by_id_cached(user.id)).name == "Ana María"
+
+        await storage.set_reset_code("ANA@example.com")
+        assert storage.user_cache.get(user.id) is None
+        await storage.get_user_by_id_cached(user.id)
+        await storage.reset_password("ana@example.com", "otro-hash")
+        assert storage.user_cache.get(user.id) is None
+
+        await storage.get_user_by_id_cached(user.id)
+        await storage.delete_user(user.id)
+        assert await storage.get_user_by_id_cached(user.id) is None
+
+    asyncio.run(scenario())
+
+
+def test_read_started_before_a_write_is_not_cached():
+    cache = ExpiringLRUCache(10)
+    generation = cache.generation
+
+    cache.invalidate("u1")
+
+    assert cache.set("u1", "viejo", float("inf"), generation) is False
+    assert cache.get("u1") is None
+
+
+def test_deleted_user_is_rejected_with_a_cached_token(client, session):
+    user_id, token, headers = session
+
+    asyncio.run(storage.delete_user(user_id))
+
+    assert token_cache.get(token) is None
+    assert client.get("/auth/me", headers=headers).status_code == 404
+
+
+def test_password_reset_drops_the_cached_token_and_user(client, session):
+    user_id, token, headers = session
+
+    assert reset_password(client, "nueva-clave").status_code == 200
+
+    assert token_cache.get(token) is None
+    assert storage.user_cache.get(user_id) is None
+    assert client.post("/auth/login", json={"email": "ana@example.com", "password": PASSWORD}).status_code == 401
+    assert client.post("/auth/login", json={"email": "ana@example.com", "password": "nueva-clave"}).status_code == 200
+
+
+def test_password_change_drops_the_cached_token(client, session):
+    user_id, token, headers = session
+
+    response = client.put(f"/profile/{user_id}/password", json={
+        "currentPassword": PASSWORD, "newPassword": "nueva-clave"
+    })
+
+    assert response.status_code == 200
+    assert token_cache.get(token) is None
@@ -0,0 +1,98 @@
+import io
+import os
+import pytest
+from PIL import Image
+from storage.async_storage import storage
+
+
+def image_bytes(width=400, height=300, image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def stored_blobs():
+    return sum(len(files) for _, _, files in os.walk(os.environ["AVATAR_DIR"]))
+
+
+@pytest.fixture
+def user(client):
+    return storage.backend.create_user({
+        "name": "Ana", "lastName": "Pérez", "email": "ana@example.com", "password": "hash"
+    })
+
+
+def upload(client, user_id, data, content_type="image/png"):
+    return client.put(f"/profile/{user_id}/avatar", content=data, headers={"Content-Type": content_type})
+
+
+def test_upload_stores_the_avatar_url(client, user):
+    response = upload(client, user.id, image_bytes())
+
+    assert response.status_code == 200
+    avatar = response.json()["avatar"]
+    assert avatar.startswith("/avatars/")
+    assert storage.backend.get_user_by_id(user.id).avatar == avatar
+    # La misma imagen da la misma URL sin volver a generar las variantes
+    blobs = stored_blobs()
+    assert upload(client, user.id, image_bytes()).json()["avatar"] == avatar
+    assert stored_blobs() == blobs
+
+
+@pytest.mark.parametrize("size, accept, side, content_type", [
+    (None, "image/webp,*/*", 256, "image/webp"),
+    (64, "image/webp", 96, "image/webp"),
+    (200, "image/jpeg", 256, "image/jpeg"),
+    (1000, "", 256, "image/jpeg"),
+])
+def test_variant_follows_size_and_accept(client, user, size, accept, side, content_type):
+    avatar = upload(client, user.id, image_bytes()).json()["avatar"]
+
+    params = {} if size is None else {"size": size}
+    response = client.get(avatar, params=params, headers={"Accept": accept})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+    assert response.headers["vary"] == "Accept"
+    assert Image.open(io.BytesIO(response.content)).size == (side, side)
+
+
+def test_matching_etag_returns_304(client, user):
+    avatar = upload(client, user.id, image_bytes()).json()["avatar"]
+    etag = client.get(avatar, headers={"Accept": "image/webp"}).headers["etag"]
+
+    cached = client.get(avatar, headers={"Accept": "image/webp", "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    # Otra variante tiene otro ETag
+    assert client.get(avatar, headers={"Accept": "image/jpeg", "If-None-Match": etag}).status_code == 200
+    assert client.get(avatar, headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_unknown_avatar_is_404_even_with_wildcard(client):
+    assert client.get("/avatars/" + "0" * 32).status_code == 404
+    assert client.get("/avatars/" + "0" * 32, headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_too_large_upload_returns_413(client, user, monkeypatch):
+    monkeypatch.setattr("routers.profile.AVATAR_MAX_BYTES", 1000)
+    data = image_bytes(600, 600)
+
+    assert upload(client, user.id, data).status_code == 413
+    # Sin Content-Length se corta al leer el cuerpo
+    chunks = (data[start:start + 256] for start in range(0, len(data), 256))
+    assert upload(client, user.id, chunks).status_code == 413
+    assert storage.backend.get_user_by_id(user.id).avatar is None
+
+
+def test_invalid_image_returns_400(client, user):
+    assert upload(client, user.id, b"no es una imagen").status_code == 400
+
+
+def test_unknown_user_does_not_store_blobs(client):
+    blobs = stored_blobs()
+
+    response = upload(client, "no-existe", image_bytes(320, 240))
+
+    assert response.status_code == 404
+    assert stored_blobs() == blobs
@@ -0,0 +1,93 @@
+from conftest import add_category, add_item
+
+
+def item_row(category_id, name="Producto", quantity=10, price=2.0):
+    return {"name": name, "quantity": quantity, "price": price, "categoryId": category_id}
+
+
+def test_bulk_update_and_delete_report_missing_ids(backend):
+    category = add_category(backend)
+    first = add_item(backend, category.id, "Primero")
+    second = add_item(backend, category.id, "Segundo")
+
+    updated = backend.bulk_update_items([(first.id, {"quantity": 1}), ("no-existe", {"quantity": 2})])
+    assert updated[first.id].quantity == 1
+    assert updated["no-existe"] is None
+
+    deleted = backend.bulk_delete_items([second.id, "no-existe"])
+    assert deleted == {second.id: True, "no-existe": False}
+    assert backend.get_item_by_id(second.id) is None
+    assert backend.get_item_by_id(first.id).quantity == 1
+
+
+def test_bulk_create_reports_each_row(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+
+    response = client.post("/items/bulk", json=[
+        item_row(category["id"], "Uno"),
+        item_row("no-existe", "Dos"),
+        item_row(category["id"], "Tres"),
+    ])
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [result["status"] for result in body["results"]] == ["created", "error", "created"]
+    assert body["results"][1]["detail"] == "La categoría especificada no existe"
+    names = sorted(item["name"] for item in client.get("/items/").json())
+    assert names == ["Tres", "Uno"]
+
+
+def test_bulk_update_partial_failure(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+    created = client.post("/items/bulk", json=[item_row(category["id"], f"P{i}") for i in range(3)]).json()
+    first, second, third = (result["id"] for result in created["results"])
+
+    response = client.put("/items/bulk", json=[
+        {"id": first, "quantity": 3},
+        {"id": "no-existe", "quantity": 3},
+        {"id": first, "quantity": 4},
+        {"id": second, "categoryId": "no-existe"},
+        {"id": third},
+    ])
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 4)
+    assert [(result["index"], result["status"], result["detail"]) for result in body["results"]] == [
+        (0, "updated", None),
+        (1, "error", "Producto no encontrado"),
+        (2, "error", "ID repetido en la solicitud"),
+        (3, "error", "La categoría especificada no existe"),
+        (4, "error", "No hay campos para actualizar"),
+    ]
+    assert client.get(f"/items/{first}").json()["quantity"] == 3
+
+
+def test_bulk_delete_partial_failure(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+    created = client.post("/items/bulk", json=[item_row(category["id"], f"P{i}") for i in range(3)]).json()
+    ids = [result["id"] for result in created["results"]]
+
+    response = client.request("DELETE", "/items/bulk", json={"ids": [ids[0], "no-existe", ids[0], ids[2]]})
+
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [result["status"] for result in body["results"]] == ["deleted", "error", "error", "deleted"]
+    assert [item["id"] for item in client.get("/items/").json()] == [ids[1]]
+
+
+def test_bulk_writes_keep_summary_in_sync(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+    created = client.post("/items/bulk", json=[
+        item_row(category["id"], "A", quantity=2, price=10.0),
+        item_row(category["id"], "B", quantity=8, price=1.5),
+    ]).json()
+    first, second = (result["id"] for result in created["results"])
+
+    client.put("/items/bulk", json=[{"id": first, "quantity": 6}])
+    client.request("DELETE", "/items/bulk", json={"ids": [second]})
+
+    summary = client.get("/stats/summary").json()
+    assert summary["totalItems"] == 1
+    assert summary["lowStockItems"] == 0
+    assert summary["totalValue"] == 60.0
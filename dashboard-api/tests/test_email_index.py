@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import httpx
+import pytest
+from storage.base import EmailAlreadyRegistered
+
+
+def user_data(email, name="Ana"):
+    return {"name": name, "lastName": "Pérez", "email": email, "password": "hash"}
+
+
+def test_duplicate_email_is_rejected_ignoring_case(backend):
+    user = backend.create_user(user_data("ana@example.com"))
+
+    with pytest.raises(EmailAlreadyRegistered):
+        backend.create_user(user_data(" ANA@Example.com ", "Otra"))
+    assert backend.get_user_by_email("Ana@Example.com").id == user.id
+
+
+def test_changed_email_releases_the_old_one(backend):
+    ana = backend.create_user(user_data("ana@example.com"))
+    luis = backend.create_user(user_data("luis@example.com", "Luis"))
+
+    with pytest.raises(EmailAlreadyRegistered):
+        backend.update_user(luis.id, {"email": "ANA@example.com"})
+    assert backend.get_user_by_id(luis.id).email == "luis@example.com"
+
+    backend.update_user(ana.id, {"email": "ana.perez@example.com"})
+
+    assert backend.get_user_by_email("ana@example.com") is None
+    assert backend.get_user_by_email("ana.perez@example.com").id == ana.id
+    # El email liberado puede volver a registrarse
+    assert backend.create_user(user_data("ana@example.com", "Nueva")).id not in (ana.id, luis.id)
+
+
+def test_deleted_user_releases_the_email(backend):
+    user = backend.create_user(user_data("ana@example.com"))
+
+    backend.delete_user(user.id)
+
+    assert backend.get_user_by_email("ana@example.com") is None
+    backend.create_user(user_data("ana@example.com"))
+
+
+def test_concurrent_registrations_store_one_user(backend):
+    barrier = threading.Barrier(8)
+    created, rejected = [], []
+
+    def register(i):
+        barrier.wait()
+        try:
+            created.append(backend.create_user(user_data("ana@example.com", f"Ana {i}")))
+        except EmailAlreadyRegistered:
+            rejected.append(i)
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (len(created), len(rejected)) == (1, 7)
+    assert backend.get_user_by_email("ana@example.com").id == created[0].id
+
+
+def register_payload(name="Ana"):
+    return {"name": name, "lastName": "Pérez", "email": "ana@example.com", "password": "secreto123"}
+
+
+def test_register_duplicate_returns_409(client):
+    assert client.post("/auth/register", json=register_payload()).status_code == 201
+
+    response = client.post("/auth/register", json=register_payload("Otra"))
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "El email ya está registrado"
+
+
+def test_change_to_taken_email_returns_409(client):
+    ana = client.post("/auth/register", json=register_payload()).json()
+    luis = client.post("/auth/register", json={**register_payload("Luis"), "email": "luis@example.com"}).json()
+
+    response = client.put(f"/profile/{luis['id']}/email", json={"newEmail": "ANA@example.com"})
+
+    assert response.status_code == 409
+    assert client.put(f"/profile/{ana['id']}/email", json={"newEmail": "ana2@example.com"}).status_code == 200
+
+
+def test_concurrent_register_requests_return_409(client):
+    from main import app
+
+    # Las dos requests pasan la verificación previa antes de que alguna guarde el usuario
+    async def register_both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post("/auth/register", json=register_payload(f"Ana {i}")) for i in range(2)
+            ))
+
+    responses = asyncio.run(register_both())
+
+    assert sorted(response.status_code for response in responses) == [201, 409]
@@ -0,0 +1,107 @@
+from collections import Counter
+import pytest
+from conftest import add_category, add_item
+from storage.async_storage import storage
+from storage.memory_storage import MemoryStorage
+
+
+class CountingBackend:
+    """Envuelve un backend y cuenta las llamadas que hacen los routers"""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            self.calls[name] += 1
+            return attr(*args, **kwargs)
+
+        return method
+
+
+@pytest.fixture
+def counting(client):
+    backend = MemoryStorage()
+    category = add_category(backend)
+    add_item(backend, category.id, "Tornillo", quantity=2)
+    add_item(backend, category.id, "Tuerca", quantity=50)
+    counting = CountingBackend(backend)
+    storage.use_backend(counting)
+    counting.category_id = category.id
+    return counting
+
+
+LIST_URLS = ["/items/", "/items/?limit=1", "/items/low-stock", "/categories/"]
+
+
+@pytest.mark.parametrize("url", LIST_URLS)
+def test_current_etag_returns_304_without_reading_the_collection(client, counting, url):
+    etag = client.get(url).headers["etag"]
+    counting.calls.clear()
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert set(counting.calls) == {"get_collection_versions"}
+
+
+def test_by_category_etag(client, counting):
+    url = f"/items/by-category/{counting.category_id}"
+    etag = client.get(url).headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("url, write", [
+    ("/items/", lambda client, counting: client.post("/items/", json={
+        "name": "Cable", "description": "", "quantity": 5, "price": 2.5, "categoryId": counting.category_id
+    })),
+    ("/items/", lambda client, counting: client.put(f"/categories/{counting.category_id}", json={"name": "Otra"})),
+    ("/categories/", lambda client, counting: client.post("/categories/", json={"name": "Nueva"})),
+])
+def test_write_changes_the_etag(client, counting, url, write):
+    etag = client.get(url).headers["etag"]
+
+    assert write(client, counting).status_code in (200, 201)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_item_write_keeps_the_categories_etag(client, counting):
+    etag = client.get("/categories/").headers["etag"]
+
+    client.post("/items/", json={
+        "name": "Cable", "description": "", "quantity": 5, "price": 2.5, "categoryId": counting.category_id
+    })
+
+    assert client.get("/categories/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_each_query_has_its_own_etag(client, counting):
+    urls = [
+        "/items/",
+        "/items/?limit=1",
+        "/items/?limit=2",
+        "/items/?qty_lt=10",
+        "/items/?sort=name",
+        "/items/low-stock?threshold=5",
+    ]
+    first_page = client.get("/items/?limit=1").json()
+    urls.append(f"/items/?limit=1&cursor={first_page['next_cursor']}")
+
+    etags = [client.get(url).headers["etag"] for url in urls]
+
+    assert len(set(etags)) == len(urls)
+    for url, etag in zip(urls[1:], etags[1:]):
+        assert client.get("/items/", headers={"If-None-Match": etag}).status_code == 200, url
+    # El orden de los parámetros no cambia el ETag
+    assert client.get("/items/?qty_lt=10&limit=1").headers["etag"] == client.get("/items/?limit=1&qty_lt=10").headers["etag"]
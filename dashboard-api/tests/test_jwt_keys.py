@@ -0,0 +1,106 @@
+import os
+from datetime import timedelta
+import jwt
+import pytest
+from utils.jwt_keys import KeyRing, NoSigningKeys
+
+
+def sign(keyring, payload=None):
+    key = keyring.signing_key()
+    return jwt.encode(payload or {"id": "u1"}, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
+
+
+def verify(keyring, token):
+    key = keyring.get(jwt.get_unverified_header(token)["kid"])
+    return jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+
+
+def test_empty_directory_is_an_error_until_init(tmp_path):
+    keyring = KeyRing(str(tmp_path / "keys"))
+
+    with pytest.raises(NoSigningKeys):
+        keyring.refresh()
+    assert not os.path.exists(tmp_path / "keys")
+
+    created = keyring.ensure_key()
+    assert created.kid == keyring.signing_key().kid
+    assert keyring.ensure_key() is None
+    assert oct(os.stat(tmp_path / "keys" / f"{created.kid}.pem").st_mode & 0o777) == "0o600"
+
+
+@pytest.mark.parametrize("algorithm", ["EdDSA", "ES256"])
+def test_sign_and_verify_with_published_key(tmp_path, algorithm):
+    keyring = KeyRing(str(tmp_path), algorithm)
+    keyring.ensure_key()
+    token = sign(keyring)
+
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    [jwk] = keyring.jwks()["keys"]
+    assert (jwk["kid"], jwk["alg"], jwk["use"]) == (keyring.signing_key().kid, algorithm, "sig")
+    assert "d" not in jwk
+    public_key = jwt.PyJWK(jwk).key
+    assert jwt.decode(token, public_key, algorithms=[algorithm]) == {"id": "u1"}
+
+
+def test_rotation_keeps_old_tokens_valid_until_the_old_key_expires(tmp_path):
+    keyring = KeyRing(str(tmp_path), token_lifetime=timedelta(hours=1))
+    first = keyring.ensure_key()
+    old_token = sign(keyring)
+
+    second = keyring.rotate()
+
+    assert keyring.signing_key().kid == second.kid != first.kid
+    assert verify(keyring, old_token) == {"id": "u1"}
+    assert {jwk["kid"] for jwk in keyring.jwks()["keys"]} == {first.kid, second.kid}
+
+    # Sin tokens vigentes posibles, las llaves reemplazadas se eliminan al rotar
+    keyring.token_lifetime = timedelta(seconds=-10)
+    third = keyring.rotate()
+    assert [jwk["kid"] for jwk in keyring.jwks()["keys"]] == [third.kid]
+    assert keyring.get(first.kid) is None
+
+
+def test_reload_reports_removed_keys(tmp_path):
+    keyring = KeyRing(str(tmp_path), reload_interval=0)
+    first = keyring.ensure_key()
+    keyring.rotate()
+    removed = []
+    keyring.on_keys_removed(removed.append)
+
+    os.remove(tmp_path / f"{first.kid}.pem")
+    keyring.refresh()
+
+    assert removed == [{first.kid}]
+    assert keyring.get(first.kid) is None
+
+
+def test_api_tokens_verify_and_jwks_endpoint(client):
+    from utils.jwt_handler import create_access_token, keyring, verify_access_token
+
+    token = create_access_token({"id": "u1", "email": "ana@example.com"})
+
+    assert jwt.get_unverified_header(token)["kid"] == keyring.signing_key().kid
+    assert verify_access_token(token)["id"] == "u1"
+    response = client.get("/.well-known/jwks.json")
+    assert response.headers["cache-control"].startswith("public")
+    assert keyring.signing_key().kid in {jwk["kid"] for jwk in response.json()["keys"]}
+
+
+def test_cached_token_is_rejected_once_its_key_is_removed(client, monkeypatch):
+    from utils.auth import token_cache, verify_token_cached
+    from utils.jwt_handler import UnknownSigningKey, create_access_token, keyring
+
+    monkeypatch.setattr("utils.jwt_keys.MIN_FORCED_RELOAD_SECONDS", 0)
+    old_kid = keyring.signing_key().kid
+    token = create_access_token({"id": "u1"})
+    assert verify_token_cached(token)["id"] == "u1"
+    assert token_cache.get(token) is not None
+
+    keyring.rotate()
+    os.remove(os.path.join(keyring.directory, f"{old_kid}.pem"))
+    keyring.refresh(force=True)
+
+    assert token_cache.get(token) is None
+    with pytest.raises(UnknownSigningKey):
+        verify_token_cached(token)
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
@@ -0,0 +1,126 @@
+import pytest
+from conftest import add_category, add_item
+from storage.base import NO_ITEM_FILTERS, ItemFilters, parse_item_sort
+from storage.memory_storage import paginate_rows
+from utils.pagination import encode_cursor
+
+
+def collect_pages(fetch, limit):
+    """Recorre todas las páginas siguiendo next_cursor"""
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = fetch(limit, cursor)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+def test_items_pages_cover_everything_once(backend):
+    category = add_category(backend)
+    ids = {add_item(backend, category.id, f"Producto {i}").id for i in range(23)}
+
+    pages = collect_pages(backend.get_items_page, 5)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    seen = [item.id for page in pages for item in page]
+    assert seen == sorted(ids)
+
+
+def test_exact_multiple_ends_without_empty_page(backend):
+    category = add_category(backend)
+    for i in range(10):
+        add_item(backend, category.id, f"Producto {i}")
+
+    pages = collect_pages(backend.get_items_page, 5)
+
+    assert [len(page) for page in pages] == [5, 5]
+
+
+def test_items_created_behind_the_cursor_do_not_shift_pages(backend):
+    category = add_category(backend)
+    for i in range(6):
+        add_item(backend, category.id, f"Producto {i}")
+
+    first, cursor = backend.get_items_page(3)
+    # Un item eliminado de la primera página no hace repetir ni saltear filas
+    backend.delete_item(first[0].id)
+    second, cursor = backend.get_items_page(3, cursor)
+
+    assert cursor is None
+    assert len(second) == 3
+    assert not {item.id for item in first} & {item.id for item in second}
+
+
+def test_sorted_and_filtered_pages(backend):
+    category = add_category(backend)
+    for quantity in (7, 3, 3, 9, 1, 12, 3):
+        add_item(backend, category.id, f"Producto {quantity}", quantity=quantity)
+
+    filters = ItemFilters(quantity_min=3)
+    pages = collect_pages(
+        lambda limit, cursor: backend.get_filtered_items_with_category(filters, "-quantity", limit, cursor), 2
+    )
+
+    quantities = [item.quantity for page in pages for item in page]
+    assert quantities == [12, 9, 7, 3, 3, 3]
+
+
+def test_category_pages(backend):
+    names = {add_category(backend, f"Categoría {i}").id for i in range(7)}
+
+    pages = collect_pages(backend.get_categories_page, 3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert {category.id for page in pages for category in page} == names
+
+
+def test_invalid_cursor_is_rejected(backend):
+    with pytest.raises(ValueError):
+        backend.get_items_page(5, "no-es-un-cursor")
+
+
+def test_items_endpoint_pages(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+    for i in range(7):
+        client.post("/items/", json={"name": f"Producto {i}", "quantity": i, "price": 1.5, "categoryId": category["id"]})
+
+    first = client.get("/items/", params={"limit": 4}).json()
+    second = client.get("/items/", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+
+    assert len(first["items"]) == 4 and first["next_cursor"]
+    assert len(second["items"]) == 3 and second["next_cursor"] is None
+    assert all(item["categoryName"] == "General" for item in first["items"] + second["items"])
+    # Sin limit ni cursor se mantiene la lista completa
+    assert len(client.get("/items/").json()) == 7
+
+
+def test_endpoint_rejects_invalid_cursor(client):
+    assert client.get("/items/", params={"cursor": "no-es-un-cursor"}).status_code == 400
+    assert client.get("/categories/", params={"cursor": "no-es-un-cursor"}).status_code == 400
+
+
+@pytest.mark.parametrize("values, sort", [
+    ({"price": "abc", "__name__": "x"}, "price"),
+    ({"quantity": True, "__name__": "x"}, "-quantity"),
+    ({"name": 3, "__name__": "x"}, "name"),
+    ({"__name__": 5}, None),
+])
+def test_forged_cursor_with_wrong_types_is_rejected(backend, values, sort):
+    order_fields, descending = parse_item_sort(sort)
+
+    with pytest.raises(ValueError):
+        backend.get_filtered_items_with_category(NO_ITEM_FILTERS, sort, 5, encode_cursor(values))
+    with pytest.raises(ValueError):
+        paginate_rows([], 5, encode_cursor(values), order_fields, descending)
+
+
+def test_endpoints_reject_forged_cursors(client):
+    assert client.get("/items/", params={
+        "sort": "price", "cursor": encode_cursor({"price": "abc", "__name__": "x"})
+    }).status_code == 400
+    assert client.get("/items/", params={"cursor": encode_cursor({"__name__": 5})}).status_code == 400
+    assert client.get("/items/low-stock", params={
+        "cursor": encode_cursor({"quantity": "a", "__name__": "x"})
+    }).status_code == 400
+    assert client.get("/categories/", params={"cursor": encode_cursor({"__name__": ["x"]})}).status_code == 400
@@ -0,0 +1,167 @@
+import time
+from conftest import add_category, add_item
+from storage.base import ChangeBatch
+from storage.memory_storage import MemoryStorage
+from storage.replica import ReplicatedStorage
+
+
+class RemoteLikeStorage(MemoryStorage):
+    """
+    Backend en memoria con listeners como los de Firestore
+
+    Cada escritura avanza un reloj de commits: los lotes llevan ese instante
+    como `read_time` y las versiones su instante de commit. `stall` deja
+    colgados los listeners abiertos hasta ese momento (sus lotes quedan en
+    cola hasta `flush`); los que se abren después funcionan.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.clock = 0
+        self.committed = {}
+        self.opened = []
+        self.stalled = set()
+        self.queued = []
+
+    def watch(self, collection, callback, include_initial=False):
+        def deliver(changes):
+            self.clock += 1
+            self.committed[collection] = self.clock
+            batch = ChangeBatch(changes, self.clock)
+            if deliver in self.stalled:
+                self.queued.append((callback, batch))
+            else:
+                callback(batch)
+        self.opened.append(deliver)
+        return super().watch(collection, deliver, include_initial)
+
+    def stall(self):
+        self.stalled.update(self.opened)
+
+    def flush(self):
+        self.stalled.clear()
+        queued, self.queued = self.queued, []
+        for callback, batch in queued:
+            callback(batch)
+
+    def get_collection_commits(self):
+        return {
+            collection: commit._replace(committed_at=self.committed.get(collection))
+            for collection, commit in super().get_collection_commits().items()
+        }
+
+
+def replicated(backend, max_lag=5.0):
+    storage = ReplicatedStorage(backend, max_lag)
+    storage.start()
+    return storage
+
+
+def test_reads_come_from_the_replica_once_loaded(backend):
+    category = add_category(backend)
+    item = add_item(backend, category.id, quantity=3)
+    storage = ReplicatedStorage(backend)
+
+    assert storage.get_item_by_id(item.id).quantity == 3
+    assert storage.replica.fallbacks == 1
+
+    storage.start()
+    storage.update_item(item.id, {"quantity": 4})
+    assert storage.get_item_by_id(item.id).quantity == 4
+    assert [found.id for found in storage.get_items_by_category(category.id)] == [item.id]
+    assert storage.replica.hits == 2
+    storage.stop()
+
+
+def test_own_write_is_read_from_backend_until_the_listener_brings_it():
+    backend = RemoteLikeStorage()
+    category = add_category(backend)
+    item = add_item(backend, category.id, quantity=3)
+    storage = replicated(backend)
+
+    backend.stall()
+    storage.update_item(item.id, {"quantity": 9})
+
+    assert storage.get_item_by_id(item.id).quantity == 9
+    assert storage.replica.fallbacks == 1
+    assert storage.replica.lag() > 0
+
+    backend.flush()
+    assert storage.get_item_by_id(item.id).quantity == 9
+    assert storage.replica.hits == 1
+    assert storage.replica.lag() == 0
+
+
+def test_write_from_another_process_is_not_served_stale_after_reading_versions():
+    backend = RemoteLikeStorage()
+    category = add_category(backend)
+    item = add_item(backend, category.id, quantity=3)
+    storage = replicated(backend)
+
+    backend.stall()
+    # Escritura directa en el backend: la réplica no la espera como propia
+    backend.update_item(item.id, {"quantity": 7})
+    versions = storage.get_collection_versions()
+
+    assert versions == backend.get_collection_versions()
+    assert storage.get_item_by_id(item.id).quantity == 7
+    assert storage.replica.fallbacks == 1
+    # Las categorías no cambiaron: se siguen respondiendo desde la réplica
+    assert storage.get_category_by_id(category.id).name == category.name
+    assert storage.replica.hits == 1
+
+    backend.flush()
+    assert storage.get_item_by_id(item.id).quantity == 7
+    assert storage.replica.hits == 2
+
+
+def test_versions_are_checked_when_not_read_for_max_lag():
+    backend = RemoteLikeStorage()
+    category = add_category(backend)
+    item = add_item(backend, category.id, quantity=3)
+    storage = replicated(backend, max_lag=0.3)
+
+    backend.stall()
+    backend.update_item(item.id, {"quantity": 7})
+    # Todavía no se leyeron las versiones: la réplica responde lo que tiene
+    assert storage.get_item_by_id(item.id).quantity == 3
+
+    time.sleep(0.35)
+    assert storage.get_item_by_id(item.id).quantity == 7
+    assert storage.replica.lag() > 0
+
+
+def test_stalled_listener_triggers_resync():
+    backend = RemoteLikeStorage()
+    category = add_category(backend)
+    item = add_item(backend, category.id, quantity=3)
+    storage = replicated(backend, max_lag=0.05)
+
+    backend.stall()
+    storage.update_item(item.id, {"quantity": 5})
+    time.sleep(0.06)
+
+    assert storage.get_item_by_id(item.id).quantity == 5
+    assert storage.replica.resyncs == 1
+    # Los listeners nuevos cargaron el estado actual
+    assert storage.get_item_by_id(item.id).quantity == 5
+    assert storage.replica.hits == 1
+    assert storage.replica.lag() == 0
+
+
+def test_replica_indexes_follow_changes(backend):
+    category = add_category(backend)
+    other = add_category(backend, "Otra")
+    storage = replicated(backend)
+    items = [storage.create_item({"name": f"P{quantity}", "quantity": quantity, "price": 1.0, "categoryId": category.id})
+             for quantity in (4, 1, 8)]
+
+    storage.update_item(items[0].id, {"categoryId": other.id, "quantity": 0})
+    storage.delete_item(items[2].id)
+
+    assert [item.id for item in storage.get_items_by_category(other.id)] == [items[0].id]
+    assert storage.category_has_items(category.id)
+    page, _ = storage.get_low_stock_items(10, threshold=5)
+    assert [item.quantity for item in page] == [0, 1]
+    assert storage.replica.fallbacks == 0
+    storage.stop()
@@ -0,0 +1,172 @@
+import math
+import random
+from conftest import add_category, add_item
+from storage.base import DocumentChange
+from storage.shared_watch import SharedWatch
+from utils.search_index import (
+    MIN_PREFIX_LENGTH, PREFIX_FACTOR, ItemSearchIndex, document_terms, tokenize
+)
+
+WORDS = ["tornillo", "torno", "tuerca", "cámara", "camión", "lámpara", "led", "batería", "cable", "caja", "azul"]
+
+
+def row(item_id, name, description=""):
+    return {"id": item_id, "name": name, "description": description}
+
+
+def names(results):
+    return [data["name"] for data in results]
+
+
+def expected_ranking(docs, query, limit):
+    """Puntajes recorriendo todos los documentos, con la fórmula documentada en utils/search_index.py"""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    frequency = {}
+    for data in docs.values():
+        for term in document_terms(data):
+            frequency[term] = frequency.get(term, 0) + 1
+    ranked = []
+    for data in docs.values():
+        total = 0.0
+        for token in tokens:
+            best = 0.0
+            for term, weight in document_terms(data).items():
+                if term == token:
+                    factor = 1.0
+                elif len(token) >= MIN_PREFIX_LENGTH and term.startswith(token):
+                    factor = PREFIX_FACTOR
+                else:
+                    continue
+                best = max(best, weight * factor * math.log(1 + len(docs) / frequency[term]))
+            if not best:
+                break
+            total += best
+        else:
+            ranked.append((-round(total, 9), data["id"], data["name"]))
+    # Los empates en el corte se resuelven por ID y el resultado se ordena por nombre
+    top = sorted(ranked)[:limit]
+    return [item_id for _, item_id, _ in sorted(top, key=lambda entry: (entry[0], entry[2]))]
+
+
+def test_name_match_ranks_above_description_match():
+    index = ItemSearchIndex()
+    index.load([
+        row("1", "Caja de herramientas", "incluye tornillo"),
+        row("2", "Tornillo M6", "acero"),
+    ])
+
+    assert names(index.search("tornillo")) == ["Tornillo M6", "Caja de herramientas"]
+
+
+def test_whole_word_ranks_above_prefix_and_all_words_must_match():
+    index = ItemSearchIndex()
+    index.load([
+        row("1", "Tornillo"),
+        row("2", "Torno"),
+        row("3", "Torno azul"),
+    ])
+
+    assert names(index.search("torno")) == ["Torno", "Torno azul"]
+    assert names(index.search("tor")) == ["Tornillo", "Torno", "Torno azul"]
+    assert names(index.search("torno azul")) == ["Torno azul"]
+    assert index.search("torno rojo") == []
+
+
+def test_accents_and_case_are_ignored():
+    index = ItemSearchIndex()
+    index.load([row("1", "Cámara WEB"), row("2", "Batería")])
+
+    assert names(index.search("camara web")) == ["Cámara WEB"]
+    assert names(index.search("BATER")) == ["Batería"]
+
+
+def test_single_letter_only_matches_whole_words():
+    index = ItemSearchIndex()
+    index.load([row("1", "Cable a tierra"), row("2", "Caja")])
+
+    assert names(index.search("a")) == ["Cable a tierra"]
+
+
+def test_ranking_matches_full_scan_after_changes():
+    rng = random.Random(5)
+    docs = {}
+    for i in range(300):
+        docs[str(i)] = row(str(i), " ".join(rng.sample(WORDS, 2)), " ".join(rng.sample(WORDS, 3)))
+    index = ItemSearchIndex()
+    index.load(docs.values())
+
+    for step in range(200):
+        item_id = rng.choice(list(docs))
+        if rng.random() < 0.3:
+            del docs[item_id]
+            index.apply([DocumentChange("removed", item_id, None)])
+        else:
+            item_id = item_id if rng.random() < 0.5 else f"n{step}"
+            change_type = "modified" if item_id in docs else "added"
+            docs[item_id] = row(item_id, " ".join(rng.sample(WORDS, 2)), " ".join(rng.sample(WORDS, 2)))
+            index.apply([DocumentChange(change_type, item_id, docs[item_id])])
+
+    for query in ["tornillo", "tor", "cam", "caja azul", "led ca", "bateria", "x"]:
+        for limit in (1, 5, 50):
+            assert [data["id"] for data in index.search(query, limit)] == expected_ranking(docs, query, limit), query
+
+
+class CountingStorage:
+    """Cuenta los listeners que se abren en el backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.opened = []
+
+    def watch(self, collection, callback, include_initial=False):
+        self.opened.append(collection)
+        return self.backend.watch(collection, callback, include_initial)
+
+
+def test_shared_watch_opens_one_listener_per_collection(backend):
+    category = add_category(backend)
+    add_item(backend, category.id, "Tornillo")
+    counting = CountingStorage(backend)
+    watch = SharedWatch(counting)
+    first, second, late = [], [], []
+
+    watch.subscribe("items", first.extend)
+    unsubscribe = watch.subscribe("items", second.extend)
+    watch.subscribe("categories", lambda changes: None)
+    add_item(backend, category.id, "Tuerca")
+    unsubscribe()
+    add_item(backend, category.id, "Cable")
+    # Un observador que llega tarde recibe la colección completa del listener ya abierto
+    watch.subscribe("items", late.extend, include_initial=True)
+
+    assert counting.opened == ["items", "categories"]
+    assert [change.data["name"] for change in first] == ["Tuerca", "Cable"]
+    assert [change.data["name"] for change in second] == ["Tuerca"]
+    assert sorted(change.data["name"] for change in late) == ["Cable", "Tornillo", "Tuerca"]
+    assert all(change.type == "added" for change in late)
+    watch.stop()
+
+
+def test_index_fed_by_shared_watch_matches_backend(backend):
+    category = add_category(backend)
+    lamp = add_item(backend, category.id, "Lámpara LED", description="luz cálida")
+    watch = SharedWatch(backend)
+    index = ItemSearchIndex()
+    batches = []
+
+    def on_changes(changes):
+        # El primer lote es la colección completa, como en ItemSearchIndex._on_changes
+        if batches:
+            index.apply(changes)
+        else:
+            index.load(change.data for change in changes)
+        batches.append(changes)
+
+    watch.subscribe("items", on_changes, include_initial=True)
+
+    add_item(backend, category.id, "Lámpara de pie")
+    backend.update_item(lamp.id, {"name": "Foco LED"})
+
+    assert names(index.search("lampara")) == ["Lámpara de pie"]
+    assert names(index.search("led")) == ["Foco LED"]
+    watch.stop()
@@ -0,0 +1,93 @@
+import random
+import pytest
+from conftest import add_category, add_item
+from storage.base import LOW_STOCK_THRESHOLD, WriteConflict
+
+
+def test_summary_follows_each_write(backend):
+    category = add_category(backend)
+    assert backend.get_summary()["totalCategories"] == 1
+
+    item = add_item(backend, category.id, quantity=LOW_STOCK_THRESHOLD - 1, price=2.5)
+    summary = backend.get_summary()
+    assert (summary["totalItems"], summary["lowStockItems"]) == (1, 1)
+    assert summary["totalValue"] == pytest.approx(2.5 * (LOW_STOCK_THRESHOLD - 1))
+
+    backend.update_item(item.id, {"quantity": LOW_STOCK_THRESHOLD + 5})
+    summary = backend.get_summary()
+    assert summary["lowStockItems"] == 0
+    assert summary["totalValue"] == pytest.approx(2.5 * (LOW_STOCK_THRESHOLD + 5))
+
+    backend.delete_item(item.id)
+    summary = backend.get_summary()
+    assert (summary["totalItems"], summary["lowStockItems"]) == (0, 0)
+    assert summary["totalValue"] == pytest.approx(0)
+
+
+def test_incremental_summary_matches_rebuild(backend):
+    rng = random.Random(7)
+    categories = [add_category(backend, f"Categoría {i}").id for i in range(3)]
+    items = []
+    for step in range(150):
+        action = rng.random()
+        if action < 0.4 or not items:
+            items.append(add_item(
+                backend, rng.choice(categories), f"P{step}", quantity=rng.randint(0, 12), price=rng.randint(1, 500) / 4
+            ).id)
+        elif action < 0.7:
+            backend.update_item(rng.choice(items), {"quantity": rng.randint(0, 12), "price": rng.randint(1, 500) / 4})
+        elif action < 0.8:
+            updates = [(item_id, {"quantity": rng.randint(0, 12)}) for item_id in rng.sample(items, min(3, len(items)))]
+            backend.bulk_update_items(updates)
+        else:
+            item_id = items.pop(rng.randrange(len(items)))
+            backend.delete_item(item_id)
+
+    incremental = backend.get_summary()
+    rebuilt = backend.rebuild_summary()
+
+    assert incremental["totalItems"] == rebuilt["totalItems"] == len(items)
+    assert incremental["totalCategories"] == rebuilt["totalCategories"] == 3
+    assert incremental["lowStockItems"] == rebuilt["lowStockItems"]
+    assert incremental["totalValue"] == pytest.approx(rebuilt["totalValue"])
+
+
+def test_collection_versions_change_with_writes(backend):
+    category = add_category(backend)
+    before = backend.get_collection_versions()
+
+    add_item(backend, category.id)
+    after_item = backend.get_collection_versions()
+    assert after_item["items"] > before["items"]
+    assert after_item["categories"] == before["categories"]
+
+    backend.update_category(category.id, {"name": "Otra"})
+    assert backend.get_collection_versions()["categories"] > after_item["categories"]
+
+
+def test_summary_endpoint(client):
+    category = client.post("/categories/", json={"name": "General"}).json()
+    client.post("/items/", json={"name": "A", "quantity": 1, "price": 3.0, "categoryId": category["id"]})
+
+    summary = client.get("/stats/summary").json()
+    assert summary == {
+        "totalItems": 1,
+        "totalCategories": 1,
+        "lowStockItems": 1,
+        "lowStockThreshold": LOW_STOCK_THRESHOLD,
+        "totalValue": 3.0,
+    }
+    assert client.post("/stats/summary/rebuild").json() == summary
+
+
+def test_summary_write_conflict_returns_503(client, monkeypatch):
+    from storage.async_storage import storage
+
+    def conflict():
+        raise WriteConflict("Conflicto de escritura concurrente en stats/summary")
+
+    monkeypatch.setattr(storage.backend, "get_summary", conflict)
+    monkeypatch.setattr(storage.backend, "rebuild_summary", conflict)
+
+    assert client.get("/stats/summary").status_code == 503
+    assert client.post("/stats/summary/rebuild").status_code == 503
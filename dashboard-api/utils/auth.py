@@ -0,0 +1,117 @@
+import logging
+import os
+from typing import Any, Dict, NamedTuple, Optional, Set
+import jwt
+from fastapi import Depends, Header, HTTPException, status
+from models.user import User
+from storage.async_storage import storage
+from utils.cache import ExpiringLRUCache
+from utils.jwt_handler import UnknownSigningKey, keyring, verify_access_token
+
+logger = logging.getLogger(__name__)
+
+# Tokens ya verificados que se recuerdan (cada uno hasta su `exp`)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+token_cache = ExpiringLRUCache(TOKEN_CACHE_SIZE)
+
+
+class VerifiedToken(NamedTuple):
+    """Payload de un token verificado y la llave que lo firmó"""
+    kid: Optional[str]
+    payload: Dict[str, Any]
+
+
+def _forget_tokens_signed_with(kids: Set[str]):
+    """Una llave retirada deja de validar sus tokens, aunque ya estuvieran verificados"""
+    token_cache.invalidate_where(lambda entry: entry.kid in kids)
+
+
+keyring.on_keys_removed(_forget_tokens_signed_with)
+
+
+def _forget_tokens_of_user(user_id: str):
+    """Un usuario eliminado o con contraseña nueva no conserva verificaciones hechas antes del cambio"""
+    token_cache.invalidate_where(lambda entry: entry.payload.get("id") == user_id)
+
+
+storage.on_credentials_changed(_forget_tokens_of_user)
+
+
+def verify_token_cached(token: str) -> Dict[str, Any]:
+    """
+    Verifica un JWT, reutilizando el resultado si ya se verificó antes
+
+    Un token no cambia, así que verificarlo una vez basta hasta su expiración
+    o hasta que se retire la llave que lo firmó; los tokens inválidos no se
+    guardan.
+
+    Raises:
+        UnknownSigningKey: Si el `kid` del token no está entre las llaves leídas
+        Exception: Si el token es inválido o expirado
+    """
+    entry = token_cache.get(token)
+    if entry is not None:
+        return entry.payload
+
+    # Si una llave se retira mientras se verifica con ella, el resultado no se guarda
+    generation = token_cache.generation
+    payload = verify_access_token(token)
+    if "exp" in payload:
+        kid = jwt.get_unverified_header(token).get("kid")
+        token_cache.set(token, VerifiedToken(kid, payload), payload["exp"], generation)
+    return payload
+
+
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    Dependencia que retorna el ID del usuario del JWT del header Authorization, sin leer la base
+
+    - **authorization**: Header con el JWT (Bearer {token})
+    """
+    if not authorization:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token no proporcionado"
+        )
+
+    # Extraer token del header "Bearer {token}"
+    token = authorization.replace("Bearer ", "").strip()
+    try:
+        try:
+            payload = verify_token_cached(token)
+        except UnknownSigningKey:
+            # La llave pudo rotarse en otro proceso: se relee el directorio en el pool y se reintenta
+            await storage.run(keyring.refresh, True)
+            payload = verify_token_cached(token)
+    except Exception as e:
+        logger.warning("Token rechazado: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido o expirado"
+        )
+
+    user_id = payload.get("id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido - ID no encontrado"
+        )
+    return user_id
+
+
+async def get_current_user(user_id: str = Depends(get_current_user_id)) -> User:
+    """
+    Dependencia que retorna el usuario autenticado por el header Authorization
+
+    El usuario sale de la caché de storage, así que un request autenticado no
+    lee de la base mientras el usuario siga en caché. Solo trae los campos de
+    USER_PUBLIC_FIELDS (sin contraseña ni avatar).
+    """
+    user = await storage.get_user_by_id_cached(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario no encontrado"
+        )
+    return user
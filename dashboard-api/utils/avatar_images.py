@@ -0,0 +1,90 @@
+"""
+Variantes de avatares: recorte cuadrado, redimensionado y conversión a WebP.
+
+Estas funciones corren en el pool de workers de avatares (procesos por
+defecto), así que el módulo solo importa Pillow: un worker no inicializa el
+storage ni Firebase al cargarlo.
+"""
+import hashlib
+import io
+from typing import Dict, Iterable, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Formatos de origen aceptados (los que detecta Pillow, no el Content-Type del upload)
+SOURCE_FORMATS = ("JPEG", "PNG", "WEBP")
+
+# Formatos de las variantes: WebP para los navegadores que lo aceptan, JPEG para el resto
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+
+
+class InvalidAvatar(ValueError):
+    """El archivo subido no es una imagen aceptada"""
+    pass
+
+
+def avatar_digest(data: bytes, spec: str) -> str:
+    """
+    Clave de un avatar: hash del archivo original y de la configuración de variantes
+
+    Incluir la configuración (tamaños, calidad) hace que cambiarla genere
+    claves nuevas en lugar de reutilizar variantes viejas que ya están
+    cacheadas como inmutables.
+    """
+    return hashlib.sha256(spec.encode() + b"\0" + data).hexdigest()[:32]
+
+
+def render_variants(data: bytes, sizes: Iterable[int], quality: int, max_pixels: int) -> Dict[str, Tuple[bytes, str]]:
+    """
+    Genera las variantes de un avatar
+
+    Args:
+        data: Archivo subido
+        sizes: Lados en píxeles de las variantes cuadradas
+        quality: Calidad de WebP y JPEG (1-100)
+        max_pixels: Máximo de píxeles de la imagen original
+
+    Returns:
+        "<lado>.<formato>" -> (bytes, content type), para cada lado y formato de VARIANT_FORMATS
+
+    Raises:
+        InvalidAvatar: si no es una imagen aceptada o es demasiado grande
+    """
+    try:
+        # open solo lee el encabezado; el tamaño se valida antes de decodificar los píxeles
+        with Image.open(io.BytesIO(data)) as source:
+            if source.format not in SOURCE_FORMATS:
+                raise InvalidAvatar("Formato de imagen no permitido (PNG, JPEG o WebP)")
+            if source.width * source.height > max_pixels:
+                raise InvalidAvatar("La imagen tiene demasiados píxeles")
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise InvalidAvatar("El archivo no es una imagen válida") from e
+
+    # JPEG no tiene transparencia: el fondo transparente queda blanco
+    if has_alpha:
+        opaque = Image.new("RGB", image.size, (255, 255, 255))
+        opaque.paste(image, mask=image.getchannel("A"))
+    else:
+        opaque = image
+
+    variants = {}
+    side = min(image.size)
+    for size in sizes:
+        # Recorte centrado; una imagen más chica que la variante no se agranda
+        target = (min(size, side),) * 2
+        for extension, (image_format, content_type) in VARIANT_FORMATS.items():
+            base = image if image_format == "WEBP" else opaque
+            resized = ImageOps.fit(base, target, method=Image.LANCZOS)
+            buffer = io.BytesIO()
+            if image_format == "WEBP":
+                resized.save(buffer, image_format, quality=quality, method=4)
+            else:
+                resized.save(buffer, image_format, quality=quality, optimize=True, progressive=True)
+            variants[f"{size}.{extension}"] = (buffer.getvalue(), content_type)
+    return variants
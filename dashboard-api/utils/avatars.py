@@ -0,0 +1,89 @@
+"""
+Avatares de usuario: subida, variantes y lectura desde el almacén de blobs.
+
+Un avatar se identifica con el hash de la imagen subida (`avatar_digest`) y
+el documento del usuario guarda solo la URL corta `/avatars/<hash>`. Al
+subirlo se generan variantes cuadradas de cada lado de AVATAR_SIZES, en WebP
+y en JPEG, en un pool de workers; `/avatars/<hash>?size=` elige la más chica
+que alcanza para el tamaño pedido y el formato según el header Accept.
+"""
+import os
+from typing import Dict, Optional, Tuple
+
+from storage.async_storage import storage
+from storage.blobs import create_blob_store
+from utils.avatar_images import VARIANT_FORMATS, avatar_digest, render_variants
+from utils.worker_pool import WorkerPool
+
+# Lados en píxeles de las variantes (por defecto: perfil y header en pantallas 2x)
+AVATAR_SIZES = tuple(sorted({int(size) for size in os.getenv("AVATAR_SIZES", "256,96").split(",") if size}, reverse=True))
+# Calidad de WebP y JPEG
+AVATAR_QUALITY = int(os.getenv("AVATAR_QUALITY", "80"))
+# Tamaño máximo del archivo subido y cantidad máxima de píxeles de la imagen
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+AVATAR_MAX_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(40_000_000)))
+# Pool para generar las variantes: "process" (por defecto) o "thread"
+AVATAR_POOL_KIND = os.getenv("AVATAR_POOL_KIND", "process")
+AVATAR_POOL_WORKERS = int(os.getenv("AVATAR_POOL_WORKERS", str(min(os.cpu_count() or 1, 2))))
+AVATAR_MAX_CONCURRENCY = int(os.getenv("AVATAR_MAX_CONCURRENCY", str(AVATAR_POOL_WORKERS * 2)))
+
+# Forma del hash en las URLs de avatares
+DIGEST_PATTERN = r"^[0-9a-f]{32}$"
+
+# Configuración de las variantes; forma parte del hash
+AVATAR_SPEC = f"{','.join(map(str, AVATAR_SIZES))}:{AVATAR_QUALITY}"
+
+# La variante más grande en WebP se escribe al final: si existe, el avatar está completo
+COMPLETE_VARIANT = f"{AVATAR_SIZES[0]}.webp"
+
+avatar_store = create_blob_store()
+avatar_pool = WorkerPool("avatar", AVATAR_POOL_KIND, AVATAR_POOL_WORKERS, AVATAR_MAX_CONCURRENCY)
+
+
+def avatar_url(digest: str) -> str:
+    """URL corta que se guarda en el documento del usuario"""
+    return f"/avatars/{digest}"
+
+
+def _blob_key(digest: str, variant: str) -> str:
+    return f"avatars/{digest}/{variant}"
+
+
+def _put_variants(digest: str, variants: Dict[str, Tuple[bytes, str]]):
+    for variant, (data, content_type) in sorted(variants.items(), key=lambda entry: entry[0] == COMPLETE_VARIANT):
+        avatar_store.put(_blob_key(digest, variant), data, content_type)
+
+
+async def save_avatar(data: bytes) -> str:
+    """
+    Guarda un avatar subido y retorna su hash
+
+    Si la misma imagen ya se subió (de este u otro usuario) no se vuelven a
+    generar las variantes.
+
+    Raises:
+        InvalidAvatar: si no es una imagen aceptada
+    """
+    digest = await storage.run(avatar_digest, data, AVATAR_SPEC)
+    if not await storage.run(avatar_store.exists, _blob_key(digest, COMPLETE_VARIANT)):
+        variants = await avatar_pool.run(render_variants, data, AVATAR_SIZES, AVATAR_QUALITY, AVATAR_MAX_PIXELS)
+        await storage.run(_put_variants, digest, variants)
+    return digest
+
+
+def choose_variant(size: Optional[int], accept: str) -> str:
+    """Variante más chica con lado >= `size` (la más grande si ninguna alcanza), en WebP si el cliente lo acepta"""
+    side = AVATAR_SIZES[0]
+    if size is not None:
+        side = next((candidate for candidate in reversed(AVATAR_SIZES) if candidate >= size), side)
+    extension = "webp" if "image/webp" in accept else "jpg"
+    return f"{side}.{extension}"
+
+
+def variant_content_type(variant: str) -> str:
+    return VARIANT_FORMATS[variant.rsplit(".", 1)[1]][1]
+
+
+async def load_avatar(digest: str, variant: str) -> Optional[bytes]:
+    """Contenido de una variante o None si el avatar no existe"""
+    return await storage.run(avatar_store.get, _blob_key(digest, variant))
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class ExpiringLRUCache:
+    """
+    Caché LRU acotada en la que cada entrada vence en su propio instante
+
+    Es segura entre hilos porque se usa desde el event loop y desde el pool de
+    storage. `generation` aumenta con cada invalidación: quien lee del backend
+    la toma antes de leer y la pasa a `set`, así una lectura que empezó antes
+    de una escritura no vuelve a guardar el valor viejo.
+    """
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna el valor vigente o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, expires_at: float, generation: Optional[int] = None) -> bool:
+        """
+        Guarda un valor hasta `expires_at` (en la escala de `clock`)
+
+        Returns:
+            False si no se guardó porque ya venció o hubo invalidaciones desde `generation`
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if expires_at <= self._clock():
+                return False
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, key: Hashable):
+        """Elimina una entrada"""
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        """Elimina las entradas cuyo valor cumple `predicate` (recorre toda la caché)"""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+# Respuestas más chicas que esto se envían sin comprimir (no compensa el costo)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# Calidad 4-5 comprime casi como gzip -9 en una fracción del tiempo; 11 es demasiado lenta para respuestas en línea
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Cuerpos más grandes que esto se comprimen en un hilo para no bloquear el event loop
+COMPRESSION_OFFLOAD_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Codificaciones aceptadas con su peso q (las de q=0 quedan excluidas)"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[name.strip().lower()] = q
+    return {name: q for name, q in encodings.items() if q > 0}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Elige br o gzip según Accept-Encoding (br si empatan y está disponible)"""
+    accepted = parse_accept_encoding(accept_encoding)
+    candidates = [("gzip", accepted.get("gzip", accepted.get("*", 0)))]
+    if brotli is not None:
+        candidates.insert(0, ("br", accepted.get("br", accepted.get("*", 0))))
+    encoding, q = max(candidates, key=lambda candidate: candidate[1])
+    return encoding if q > 0 else None
+
+
+class _Compressor:
+    """Compresor incremental con la misma interfaz para gzip y brotli"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+    def compress_all(self, data: bytes) -> bytes:
+        return self.compress(data) + self.finish()
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES or content_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas con brotli o gzip según Accept-Encoding
+
+    Solo comprime tipos de texto/JSON de al menos `minimum_size` bytes. Las
+    respuestas en streaming (exportación) se comprimen por partes; los
+    eventos SSE (text/event-stream) no se tocan porque se deben enviar en
+    cuanto se generan.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, self._send_with_vary(send))
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] < 200 or message["status"] in (204, 304) or not _is_compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                # Esperar el primer fragmento del cuerpo para decidir
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(scope=start_message)
+                if not more_body:
+                    # Respuesta completa en un solo mensaje
+                    headers.add_vary_header("Accept-Encoding")
+                    if len(body) < self.minimum_size:
+                        await send(start_message)
+                        await send(message)
+                        return
+                    body = await self._compress_all(encoding, body)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                # Streaming: el largo final no se conoce
+                compressor = _Compressor(encoding)
+                headers.add_vary_header("Accept-Encoding")
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(start_message)
+
+            chunk = compressor.compress(body)
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _send_with_vary(send):
+        """Sin compresión, las respuestas comprimibles igual avisan a las caches que dependen de Accept-Encoding"""
+        async def wrapped(message):
+            if message["type"] == "http.response.start" and _is_compressible(Headers(raw=message["headers"])):
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            await send(message)
+        return wrapped
+
+    @staticmethod
+    async def _compress_all(encoding: str, body: bytes) -> bytes:
+        if len(body) < COMPRESSION_OFFLOAD_SIZE:
+            return _Compressor(encoding).compress_all(body)
+        # zlib y brotli liberan el GIL mientras comprimen
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _Compressor(encoding).compress_all, body)
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+# Columnas exportadas, en orden
+EXPORT_COLUMNS = ["id", "name", "description", "quantity", "price", "categoryId", "categoryName"]
+
+# Formatos soportados: media type de cada uno
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Documentos leídos del stream de Firestore por cada salto al pool de storage
+EXPORT_CHUNK_SIZE = 500
+
+
+def to_export_row(data: Dict[str, Any], category_names: Dict[str, str]) -> Dict[str, Any]:
+    """Convierte un documento de item en una fila de exportación con el nombre de su categoría"""
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "description": data.get("description", ""),
+        "quantity": data["quantity"],
+        "price": data["price"],
+        "categoryId": data["categoryId"],
+        "categoryName": category_names.get(data["categoryId"], "Categoría no encontrada"),
+    }
+
+
+def format_ndjson(rows: Iterable[Dict[str, Any]]) -> str:
+    """Serializa filas como JSON delimitado por saltos de línea"""
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def format_csv(rows: Iterable[Dict[str, Any]], header: bool = False) -> str:
+    """Serializa filas como CSV, opcionalmente con la fila de encabezado"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _next_chunk(documents, size: int) -> List[Dict[str, Any]]:
+    """Lee hasta `size` documentos del iterador (bloqueante)"""
+    chunk = []
+    for data in documents:
+        chunk.append(data)
+        if len(chunk) >= size:
+            break
+    return chunk
+
+
+async def stream_export(storage, export_format: str,
+                        chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    Genera el export del inventario por bloques
+
+    Las categorías se resuelven con un único mapa precargado y los items se
+    leen del stream de Firestore de a `chunk_size`, así la memoria se mantiene
+    constante y el primer bloque se envía antes de terminar de leer la colección.
+    """
+    category_names = await storage.get_category_names()
+    documents = storage.backend.stream_items()
+
+    first = True
+    while True:
+        chunk = await storage.run(_next_chunk, documents, chunk_size)
+        if not chunk and not first:
+            break
+
+        rows = [to_export_row(data, category_names) for data in chunk]
+        if export_format == "csv":
+            yield format_csv(rows, header=first)
+        else:
+            yield format_ndjson(rows)
+        first = False
+
+        if len(chunk) < chunk_size:
+            break
@@ -1,27 +1,29 @@
-from fastapi import HTTPException, status
+import hashlib
+from typing import List, Optional
+from urllib.parse import urlencode
+from fastapi import HTTPException, Request, Response, status
 from models.item import ItemWithCategory
 from models.category import CategoryResponse
-from storage.firebase_storage import storage
+from storage.async_storage import storage
 
-def get_item_with_category(item) -> ItemWithCategory:
+async def get_item_with_category(item) -> ItemWithCategory:
     """Obtiene un item con información de su categoría"""
-    category = storage.get_category_by_id(item.categoryId)
-    category_name = category.name if category else "Categoría no encontrada"
-    
-    return ItemWithCategory(
-        id=item.id,
-        name=item.name,
-        description=item.description,
-        quantity=item.quantity,
-        price=item.price,
-        categoryId=item.categoryId,
-        categoryName=category_name
-    )
-
-
-def validate_category_exists(category_id: str):
+    category = await storage.get_category_by_id(item.categoryId)
+    return ItemWithCategory.from_item(item, category.name if category else None)
+
+
+async def get_items_with_category(items) -> List[ItemWithCategory]:
+    """Agrega el nombre de su categoría a varios items con una sola lectura de categorías"""
+    categories = await storage.get_categories_by_ids([item.categoryId for item in items])
+    return [
+        ItemWithCategory.from_item(item, categories[item.categoryId].name if item.categoryId in categories else None)
+        for item in items
+    ]
+
+
+async def validate_category_exists(category_id: str):
     """Valida que una categoría existe, lanza excepción si no"""
-    if not storage.category_exists(category_id):
+    if not await storage.category_exists(category_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La categoría especificada no existe"
@@ -35,3 +37,49 @@ def validate_resource_exists(resource, resource_type: str):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"{resource_type} no encontrado"
         )
+
+
+async def validate_cursor(page_coroutine):
+    """Espera una consulta paginada y convierte un cursor inválido en error 400"""
+    try:
+        return await page_coroutine
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara If-None-Match con un ETag (comparación débil, acepta lista y *)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+async def check_collection_etag(request: Request, response: Response, *collections: str) -> Optional[Response]:
+    """
+    Responde 304 a un listado si las colecciones que usa no cambiaron
+
+    El ETag sale de las versiones de `collections`, que cambian con cada
+    escritura, así que no hace falta leer ni serializar el listado para
+    compararlo. Lleva además un hash de la ruta y los parámetros (en
+    cualquier orden), así otro filtro, página o cursor tiene otro ETag. Retorna la respuesta 304 si If-None-Match coincide; si no,
+    agrega el ETag a `response` y retorna None.
+
+    Se llama antes de leer los datos: si una escritura ocurre en medio, el
+    ETag queda desactualizado y el siguiente request descarga de nuevo.
+    """
+    versions = await storage.get_collection_versions()
+    query = urlencode(sorted(request.query_params.multi_items()))
+    url_hash = hashlib.blake2b(f"{request.url.path}?{query}".encode(), digest_size=6).hexdigest()
+    etag = 'W/"' + ".".join(f"{collection[0]}{versions[collection]}" for collection in collections) + f'-{url_hash}"'
+    # no-cache: el navegador guarda la respuesta pero la revalida siempre con If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,178 @@
+"""
+Cambios del inventario en vivo para los dashboards conectados (Server-Sent Events).
+
+Cada proceso usa un solo listener por colección (items y categorías), el
+mismo que el índice de búsqueda y la réplica (`storage.watch`), y reparte
+cada lote de cambios a todos los clientes, así las lecturas a la base no
+crecen con la cantidad de dashboards abiertos. Cada cliente tiene una cola
+acotada: si no la vacía a tiempo (conexión lenta o pestaña congelada) se le
+envía `reset` y se cierra su stream, en lugar de acumular memoria o frenar a
+los demás. Al reconectarse recibe `ready` y vuelve a pedir los listados.
+"""
+import asyncio
+import functools
+import logging
+import os
+from typing import AsyncIterator, Callable, List, Optional, Set
+import orjson
+from storage.async_storage import storage
+from storage.base import DocumentChange, WATCHED_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Mensajes pendientes por cliente antes de considerarlo lento y desconectarlo
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "256"))
+# Segundos sin cambios tras los que se envía un comentario para que proxies y navegador no corten la conexión
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+# Clientes conectados a la vez por proceso
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", "1000"))
+# Milisegundos que espera EventSource antes de reconectarse
+STREAM_RETRY_MS = 3000
+
+HEARTBEAT = b": ping\n\n"
+
+
+def format_event(event: str, data) -> bytes:
+    """Serializa un evento SSE"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+
+class StreamFull(Exception):
+    """Se alcanzó STREAM_MAX_CLIENTS"""
+
+
+class Subscription:
+    """Cola de mensajes ya serializados de un cliente (None cierra el stream)"""
+
+    __slots__ = ("queue",)
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+
+
+class InventoryFeed:
+    """
+    Listener compartido de items y categorías con reparto a los clientes SSE
+
+    Los listeners se abren con el primer cliente y siguen abiertos hasta el
+    cierre de la aplicación: reabrirlos en Firestore vuelve a cobrar la
+    lectura inicial de toda la colección.
+    """
+
+    def __init__(self, collections=WATCHED_COLLECTIONS, queue_size: int = STREAM_QUEUE_SIZE,
+                 max_clients: int = STREAM_MAX_CLIENTS, heartbeat: float = STREAM_HEARTBEAT_SECONDS):
+        self.collections = tuple(collections)
+        self.queue_size = max(queue_size, 2)
+        self.max_clients = max_clients
+        self.heartbeat = heartbeat
+        self._subscriptions: Set[Subscription] = set()
+        self._unsubscribers: List[Callable[[], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        # Contadores expuestos en /metrics
+        self.changes_received = 0
+        self.messages_sent = 0
+        self.dropped_clients = 0
+
+    @property
+    def clients(self) -> int:
+        return len(self._subscriptions)
+
+    async def _start(self):
+        """Abre un listener por colección (una sola vez por proceso)"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._unsubscribers:
+                return
+            self._loop = asyncio.get_running_loop()
+            for collection in self.collections:
+                callback = functools.partial(self._on_changes, collection)
+                self._unsubscribers.append(await storage.watch(collection, callback))
+
+    def _on_changes(self, collection: str, changes: List[DocumentChange]):
+        """Recibe un lote desde el hilo del listener y lo pasa al event loop"""
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, collection, changes)
+        except RuntimeError:
+            # El event loop ya se cerró (apagado de la aplicación)
+            pass
+
+    def _dispatch(self, collection: str, changes: List[DocumentChange]):
+        """Serializa el lote una vez y lo encola para cada cliente"""
+        self.changes_received += len(changes)
+        if not self._subscriptions:
+            return
+        message = format_event("change", {
+            "collection": collection,
+            "changes": [{"type": change.type, "id": change.id, "data": change.data} for change in changes],
+        })
+        for subscription in list(self._subscriptions):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        """Desconecta a un cliente que no vacía su cola; al reconectarse vuelve a cargar los listados"""
+        self._subscriptions.discard(subscription)
+        self.dropped_clients += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(format_event("reset", {"reason": "slow_client"}))
+        subscription.queue.put_nowait(None)
+        logger.warning("Cliente del stream de inventario desconectado por no leer a tiempo")
+
+    async def subscribe(self) -> Subscription:
+        """
+        Registra un cliente; los cambios posteriores quedan en su cola
+
+        Raises:
+            StreamFull: Si ya hay STREAM_MAX_CLIENTS clientes conectados
+        """
+        if len(self._subscriptions) >= self.max_clients:
+            raise StreamFull()
+        await self._start()
+        subscription = Subscription(self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+
+    async def events(self, subscription: Subscription) -> AsyncIterator[bytes]:
+        """Cuerpo SSE de un cliente: `ready`, luego cada lote de cambios y comentarios de keep-alive"""
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n".encode() + format_event("ready", {"collections": self.collections})
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                self.messages_sent += 1
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+
+    def stop(self):
+        """Cierra los listeners y los streams abiertos"""
+        for unsubscribe in self._unsubscribers:
+            try:
+                unsubscribe()
+            except Exception:
+                logger.exception("Error cerrando un listener de cambios")
+        self._unsubscribers = []
+        for subscription in list(self._subscriptions):
+            self._drop_quietly(subscription)
+
+    def _drop_quietly(self, subscription: Subscription):
+        self._subscriptions.discard(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+inventory_feed = InventoryFeed()
@@ -1,13 +1,19 @@
 import jwt
 from datetime import datetime, timedelta
 from typing import Dict, Any
-import os
+from utils.jwt_keys import JWT_ALGORITHM, JWT_KEYS_DIR, KeyRing
 
-# Clave secreta para firmar JWT (en producción usar variable de entorno)
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production-12345")
-ALGORITHM = "HS256"
 EXPIRATION_HOURS = 24
 
+# Llaves de firma (la más reciente firma; todas verifican y se publican en /.well-known/jwks.json).
+# La aplicación las lee al arrancar, en el pool de storage; después se releen en segundo plano
+keyring = KeyRing(JWT_KEYS_DIR, JWT_ALGORITHM, timedelta(hours=EXPIRATION_HOURS))
+
+
+class UnknownSigningKey(Exception):
+    """El token está firmado con un `kid` que este proceso todavía no leyó"""
+    pass
+
 def create_access_token(data: Dict[str, Any]) -> str:
     """
     Crea un JWT con los datos del usuario
@@ -16,7 +22,7 @@ def create_access_token(data: Dict[str, Any]) -> str:
         data: Diccionario con información del usuario (id, email, name, lastName)
     
     Returns:
-        Token JWT firmado
+        Token JWT firmado con la llave actual (su `kid` va en el header)
     """
     to_encode = data.copy()
     
@@ -25,7 +31,8 @@ def create_access_token(data: Dict[str, Any]) -> str:
     to_encode.update({"exp": expire})
     
     # Codificar y firmar el JWT
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    key = keyring.signing_key()
+    encoded_jwt = jwt.encode(to_encode, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid})
     
     return encoded_jwt
 
@@ -41,10 +48,16 @@ def verify_access_token(token: str) -> Dict[str, Any]:
         Datos del payload del JWT
     
     Raises:
-        jwt.InvalidTokenError: Si el token es inválido o expirado
+        UnknownSigningKey: Si el `kid` no está entre las llaves leídas
+        Exception: Si el token es inválido o expirado
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # La llave y el algoritmo salen del `kid`, nunca del `alg` que trae el token
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = keyring.get(kid)
+        if key is None:
+            raise UnknownSigningKey(f"kid desconocido: {kid}")
+        payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
         return payload
     except jwt.ExpiredSignatureError:
         raise Exception("Token expirado")
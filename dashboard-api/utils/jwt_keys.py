@@ -0,0 +1,286 @@
+"""
+Llaves asimétricas para firmar los JWT (EdDSA o ES256), con rotación.
+
+Cada llave privada es un archivo PEM en JWT_KEYS_DIR cuyo nombre es su `kid`.
+Los tokens se firman con la más reciente y las llaves públicas de todas se
+publican en /.well-known/jwks.json, así otros servicios verifican los tokens
+localmente sin llamar a esta API.
+
+Crear la primera llave (la API no arranca sin llaves):
+    python -m utils.jwt_keys init
+
+Rotar la llave (la anterior se conserva mientras haya tokens firmados con ella):
+    python -m utils.jwt_keys rotate
+"""
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directorio con las llaves privadas (no versionar)
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", os.path.join(BASE_DIR, "keys"))
+# Algoritmo de las llaves nuevas: EdDSA (Ed25519) o ES256 (P-256)
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "EdDSA")
+# Segundos entre revisiones del directorio para tomar llaves rotadas por otro proceso
+JWT_KEYS_RELOAD_INTERVAL = float(os.getenv("JWT_KEYS_RELOAD_INTERVAL", "60"))
+
+ALGORITHMS = ("EdDSA", "ES256")
+KID_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+# Mínimo entre recargas forzadas por un `kid` desconocido (ver KeyRing.refresh)
+MIN_FORCED_RELOAD_SECONDS = 1.0
+
+
+def generate_private_key(algorithm: str):
+    """Genera una llave privada para el algoritmo indicado"""
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    raise ValueError(f"Algoritmo JWT no soportado: {algorithm}. Usar uno de: {', '.join(ALGORITHMS)}")
+
+
+def algorithm_for(private_key) -> str:
+    """Algoritmo JWT que corresponde al tipo de llave"""
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(private_key.curve, ec.SECP256R1):
+        return "ES256"
+    raise ValueError(f"Tipo de llave no soportado: {type(private_key).__name__}")
+
+
+def new_kid(now: Optional[datetime] = None, after: Optional[str] = None) -> str:
+    """
+    `kid` que ordena las llaves por fecha de creación
+
+    Con `after` (el `kid` más reciente) queda siempre después de él, aunque se
+    cree en el mismo segundo: la llave que firma es la de mayor `kid`.
+    """
+    now = now or datetime.now(timezone.utc)
+    previous = kid_created_at(after) if after is not None else None
+    if previous is not None and now < previous + timedelta(seconds=1):
+        now = previous + timedelta(seconds=1)
+    return f"{now.strftime(KID_TIME_FORMAT)}-{secrets.token_hex(4)}"
+
+
+def kid_created_at(kid: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(kid.split("-", 1)[0], KID_TIME_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class NoSigningKeys(Exception):
+    """El directorio de llaves no tiene ninguna llave de firma"""
+    pass
+
+
+class SigningKey:
+    """Llave privada con su `kid` y su algoritmo"""
+
+    __slots__ = ("kid", "algorithm", "private_key", "public_key")
+
+    def __init__(self, kid: str, private_key):
+        self.kid = kid
+        self.algorithm = algorithm_for(private_key)
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+
+    def jwk(self) -> Dict[str, Any]:
+        """Llave pública en formato JWK"""
+        to_jwk = OKPAlgorithm.to_jwk if self.algorithm == "EdDSA" else ECAlgorithm.to_jwk
+        return {**to_jwk(self.public_key, as_dict=True), "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """
+    Llaves de firma guardadas en un directorio
+
+    Firma con la llave más reciente y verifica con cualquiera de las
+    publicadas. Las llaves se crean solo con `ensure_key` o `rotate` (desde la
+    línea de comandos): leer un directorio sin llaves es un error.
+
+    Las lecturas (`signing_key`, `get`, `jwks`) no tocan el disco salvo la
+    primera vez: cada `reload_interval` segundos el directorio se relee en un
+    hilo aparte, así no bloquean el event loop.
+    """
+
+    def __init__(self, directory: str, algorithm: str = JWT_ALGORITHM, token_lifetime: timedelta = timedelta(hours=24),
+                 reload_interval: float = JWT_KEYS_RELOAD_INTERVAL):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algoritmo JWT no soportado: {algorithm}. Usar uno de: {', '.join(ALGORITHMS)}")
+        self.directory = directory
+        self.algorithm = algorithm
+        self.token_lifetime = token_lifetime
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._keys: Dict[str, SigningKey] = {}
+        self._current: Optional[SigningKey] = None
+        self._loaded_at: Optional[float] = None
+        self._reloading = False
+        self._removed_listeners: List[Callable[[Set[str]], None]] = []
+
+    def _path(self, kid: str) -> str:
+        return os.path.join(self.directory, f"{kid}.pem")
+
+    def _kids(self) -> List[str]:
+        """`kid` de las llaves guardadas en el directorio, de la más antigua a la más reciente"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(".pem")] for name in os.listdir(self.directory) if name.endswith(".pem"))
+
+    def _load(self):
+        """
+        Lee las llaves del directorio (requiere el lock)
+
+        Raises:
+            NoSigningKeys: Si el directorio no tiene llaves
+        """
+        keys = {}
+        for kid in self._kids():
+            with open(self._path(kid), "rb") as f:
+                private_key = serialization.load_pem_private_key(f.read(), password=None)
+            keys[kid] = SigningKey(kid, private_key)
+        if not keys:
+            raise NoSigningKeys(
+                f"No hay llaves JWT en {self.directory}; crear la primera con: python -m utils.jwt_keys init"
+            )
+        removed = set(self._keys) - set(keys)
+        self._keys = keys
+        self._current = keys[max(keys)]
+        if removed:
+            logger.info("Llaves JWT retiradas: %s", ", ".join(sorted(removed)))
+            for listener in self._removed_listeners:
+                listener(removed)
+
+    def on_keys_removed(self, listener: Callable[[Set[str]], None]):
+        """Registra una función que recibe los `kid` que dejaron de estar en el directorio al releerlo"""
+        self._removed_listeners.append(listener)
+
+    def _write_new_key(self) -> SigningKey:
+        """Genera una llave y la guarda con permisos solo para el dueño"""
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        key = SigningKey(new_kid(after=max(self._kids(), default=None)), generate_private_key(self.algorithm))
+        pem = key.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        # Escribir con otro nombre y renombrar para que otro proceso nunca lea un archivo a medias
+        temp_path = os.path.join(self.directory, f".{key.kid}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(temp_path, self._path(key.kid))
+        return key
+
+    def refresh(self, force: bool = False):
+        """
+        Relee el directorio si pasaron `reload_interval` segundos desde la última lectura (bloqueante)
+
+        Con `force` alcanza con MIN_FORCED_RELOAD_SECONDS: se usa ante un
+        `kid` desconocido, por si otro proceso rotó la llave.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded_at is not None:
+                elapsed = now - self._loaded_at
+                if elapsed < (MIN_FORCED_RELOAD_SECONDS if force else self.reload_interval):
+                    return
+            self._load()
+            self._loaded_at = now
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Error releyendo las llaves JWT de %s", self.directory)
+        finally:
+            self._reloading = False
+
+    def _check_refresh(self):
+        """Carga las llaves la primera vez; después, si toca releerlas, lo hace en otro hilo"""
+        if self._loaded_at is None:
+            self.refresh()
+            return
+        if self._reloading or time.monotonic() - self._loaded_at < self.reload_interval:
+            return
+        self._reloading = True
+        threading.Thread(target=self._background_refresh, name="jwt-keys", daemon=True).start()
+
+    def signing_key(self) -> SigningKey:
+        """Llave con la que se firman los tokens nuevos"""
+        self._check_refresh()
+        return self._current
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """Llave por `kid` entre las ya leídas (None si no se conoce; ver `refresh`)"""
+        self._check_refresh()
+        if kid is None:
+            return None
+        return self._keys.get(kid)
+
+    def jwks(self) -> Dict[str, Any]:
+        """Llaves públicas vigentes en formato JWKS"""
+        self._check_refresh()
+        return {"keys": [key.jwk() for key in self._keys.values()]}
+
+    def ensure_key(self) -> Optional[SigningKey]:
+        """Crea la primera llave si el directorio no tiene ninguna; retorna la creada (None si ya había)"""
+        with self._lock:
+            if self._kids():
+                return None
+            key = self._write_new_key()
+            self._load()
+            self._loaded_at = time.monotonic()
+        return key
+
+    def rotate(self) -> SigningKey:
+        """
+        Crea una llave nueva que pasa a firmar los tokens
+
+        Elimina las llaves reemplazadas hace más de `token_lifetime`, porque ya
+        no puede quedar un token vigente firmado con ellas.
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            key = self._write_new_key()
+            kids = self._kids()
+            for kid, successor in zip(kids, kids[1:]):
+                replaced_at = kid_created_at(successor)
+                if replaced_at is not None and now - replaced_at > self.token_lifetime:
+                    os.remove(self._path(kid))
+            self._load()
+            self._loaded_at = time.monotonic()
+        return key
+
+
+def main_cli():
+    from utils.jwt_handler import keyring
+
+    command = sys.argv[1:]
+    if command == ["init"]:
+        key = keyring.ensure_key()
+        if key is None:
+            print(f"{keyring.directory} ya tiene llaves; para reemplazar la actual usar: python -m utils.jwt_keys rotate")
+            return
+    elif command == ["rotate"]:
+        key = keyring.rotate()
+    else:
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    print(f"Nueva llave {key.kid} ({key.algorithm}) en {keyring.directory}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,285 @@
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Límites (en segundos) de los buckets de los histogramas
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STORAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Cada cuánto se mide el retraso del event loop
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+# Starlette agrega "; charset=utf-8" a los tipos text/*
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Métrica con etiquetas, en el formato de texto de Prometheus"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Líneas de muestras de la métrica"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class ValueMetric(Metric):
+    """Métrica de un solo valor por etiqueta; con `function` se lee al exponer las métricas"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Counter(ValueMetric):
+    """Contador que solo aumenta"""
+
+    type = "counter"
+
+
+class Gauge(ValueMetric):
+    """Valor que sube y baja"""
+
+    type = "gauge"
+
+    def set(self, value: float, *label_values: str):
+        with self._lock:
+            self._values[label_values] = value
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    """Distribución de valores en buckets acumulativos"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Por combinación de etiquetas: [conteos por bucket (+Inf al final), suma]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        lines = []
+        bucket_labels = self.labels + ("le",)
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+# =================== MÉTRICAS HTTP ===================
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Latencia de los requests HTTP por ruta y código de estado",
+    ("method", "route", "status"),
+    HTTP_BUCKETS,
+))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight",
+    "Requests HTTP en curso",
+))
+
+# =================== MÉTRICAS DE STORAGE ===================
+
+STORAGE_CALLS = registry.register(Counter(
+    "storage_calls_total",
+    "Llamadas al backend de storage por método y resultado",
+    ("method", "result"),
+))
+STORAGE_CALL_DURATION = registry.register(Histogram(
+    "storage_call_duration_seconds",
+    "Duración de las llamadas al backend de storage por método",
+    ("method",),
+    STORAGE_BUCKETS,
+))
+
+STORAGE_REPLICA_APPLY_DELAY = registry.register(Histogram(
+    "storage_replica_apply_seconds",
+    "Tiempo desde que empieza una escritura hasta que la réplica en memoria la aplica",
+    (),
+    STORAGE_BUCKETS,
+))
+
+# =================== EVENT LOOP ===================
+
+EVENT_LOOP_LAG = registry.register(Histogram(
+    "event_loop_lag_seconds",
+    "Retraso del event loop respecto al intervalo de muestreo",
+    (),
+    LOOP_LAG_BUCKETS,
+))
+
+
+def record_storage_call(method: str, seconds: float, ok: bool):
+    """Registra una llamada al backend de storage"""
+    STORAGE_CALLS.inc(method, "ok" if ok else "error")
+    STORAGE_CALL_DURATION.observe(seconds, method)
+
+
+def record_replica_apply(seconds: float):
+    """Registra cuánto tardó una escritura propia en llegar a la réplica"""
+    STORAGE_REPLICA_APPLY_DELAY.observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide la latencia de cada request
+
+    Usa la plantilla de la ruta (/items/{item_id}) como etiqueta para que la
+    cantidad de series no crezca con cada ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            )
+
+
+class EventLoopMonitor:
+    """Mide periódicamente cuánto tarda el event loop en despertar una tarea dormida"""
+
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag > 1.0:
+                logger.warning("Event loop bloqueado %.3f s", lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+event_loop_monitor = EventLoopMonitor()
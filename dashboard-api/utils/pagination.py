@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Dict
+
+# Tamaños de página permitidos en los endpoints paginados
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Codifica los valores de ordenamiento del último documento como un cursor opaco"""
+    raw = json.dumps(values, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decodifica un cursor generado por encode_cursor
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(values, dict) or "__name__" not in values:
+        raise ValueError("Cursor inválido")
+    return values
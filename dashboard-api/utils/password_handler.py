@@ -1,20 +1,37 @@
+import logging
+import os
+from typing import Optional
+
 import bcrypt
-from typing import Tuple
 
-def hash_password(password: str) -> str:
+from utils.worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Factor de costo de bcrypt (cada +1 duplica el tiempo de hash)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Tipo de pool: "process" (por defecto) o "thread"
+PASSWORD_POOL_KIND = os.getenv("PASSWORD_POOL_KIND", "process")
+# Workers del pool y máximo de operaciones de contraseña en curso por worker de uvicorn
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(os.cpu_count() or 1, 4))))
+PASSWORD_MAX_CONCURRENCY = int(os.getenv("PASSWORD_MAX_CONCURRENCY", str(PASSWORD_POOL_WORKERS * 2)))
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """
     Encripta una contraseña usando bcrypt
-    
+
     Args:
         password: Contraseña en texto plano
-    
+        rounds: Factor de costo de bcrypt
+
     Returns:
         Contraseña encriptada (hash)
     """
     # Generar salt y hashear la contraseña
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    
+
     # Convertir a string para almacenar en Firestore
     return hashed.decode('utf-8')
 
@@ -22,11 +39,11 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifica si una contraseña en texto plano coincide con su hash
-    
+
     Args:
         plain_password: Contraseña en texto plano (la que el usuario ingresa)
         hashed_password: Hash almacenado en la base de datos
-    
+
     Returns:
         True si coincide, False si no
     """
@@ -37,5 +54,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
             hashed_password.encode('utf-8')
         )
     except Exception as e:
-        print(f"Error verificando contraseña: {str(e)}")
+        logger.warning("Error verificando contraseña: %s", e)
         return False
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Obtiene el factor de costo de un hash bcrypt ($2b$<rounds>$...)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Indica si el hash fue generado con un factor de costo distinto al configurado"""
+    return get_hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
+
+# =================== POOL DE WORKERS ===================
+
+password_pool = WorkerPool("bcrypt", PASSWORD_POOL_KIND, PASSWORD_POOL_WORKERS, PASSWORD_MAX_CONCURRENCY)
+
+
+async def hash_password_async(password: str) -> str:
+    """Versión no bloqueante de hash_password"""
+    return await password_pool.run(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versión no bloqueante de verify_password"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Por clase de modelo: True si su __dict__ es exactamente lo que produce model_dump()
+_plain_models: Dict[type, bool] = {}
+
+
+def _is_plain_model(cls: type) -> bool:
+    """Un modelo sin alias, serializadores propios ni campos calculados se serializa igual desde __dict__"""
+    plain = _plain_models.get(cls)
+    if plain is None:
+        decorators = cls.__pydantic_decorators__
+        plain = (
+            not decorators.field_serializers
+            and not decorators.model_serializers
+            and not decorators.computed_fields
+            and all(field.alias is None and field.serialization_alias is None for field in cls.model_fields.values())
+        )
+        _plain_models[cls] = plain
+    return plain
+
+
+def _default(value: Any) -> Any:
+    """Convierte lo que orjson no serializa por sí mismo (modelos Pydantic)"""
+    if isinstance(value, BaseModel):
+        # __dict__ evita construir un dict nuevo por fila; orjson vuelve a llamar aquí para los modelos anidados
+        return value.__dict__ if _is_plain_model(type(value)) else value.model_dump(mode="json")
+    raise TypeError(f"Tipo no serializable a JSON: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Respuesta JSON serializada con orjson
+
+    Acepta modelos Pydantic (sueltos, en listas o anidados) además de tipos
+    nativos. Retornarla desde un endpoint evita la validación contra
+    `response_model` y el paso por `jsonable_encoder`; `response_model` se
+    mantiene para documentar la respuesta en OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Construye una FastJSONResponse
+
+    Con `response` (el parámetro que FastAPI inyecta en el endpoint) copia los
+    headers que ya se le agregaron, como el ETag.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
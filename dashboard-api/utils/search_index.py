@@ -0,0 +1,263 @@
+"""
+Búsqueda de productos por nombre y descripción con un índice invertido en memoria.
+
+El índice se arma una vez con la carga inicial de items y se actualiza con
+cada cambio que entrega `storage.watch`, así buscar no lee Firestore. Los
+textos se normalizan a minúsculas y sin tildes ("Cámara" y "camara" son el
+mismo término) y cada palabra de la consulta también encuentra los términos
+que empiezan con ella, para buscar mientras se escribe.
+
+Puntaje de un producto: por cada palabra de la consulta, el mejor término que
+coincide (peso del campo × rareza del término, a la mitad si solo coincide el
+prefijo); se suman las palabras y solo entran los productos que coinciden con
+todas.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+from storage.async_storage import storage
+from storage.base import DocumentChange
+
+logger = logging.getLogger(__name__)
+
+# Peso de un término según el campo donde aparece
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+# Factor de una coincidencia solo por prefijo respecto a la palabra completa
+PREFIX_FACTOR = 0.5
+# Palabras más cortas solo coinciden completas (un prefijo de una letra abarca casi todo el vocabulario)
+MIN_PREFIX_LENGTH = 2
+# Palabras de la consulta que se usan (el resto se ignora)
+MAX_QUERY_TOKENS = 8
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin tildes ni diéresis (la ñ queda como n)"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Palabras normalizadas de un texto"""
+    return TOKEN_RE.findall(fold(text or ""))
+
+
+def document_terms(data: Dict[str, Any]) -> Dict[str, float]:
+    """Términos de un item con el peso del campo más importante donde aparece"""
+    terms = {term: DESCRIPTION_WEIGHT for term in tokenize(data.get("description", ""))}
+    for term in tokenize(data.get("name", "")):
+        terms[term] = NAME_WEIGHT
+    return terms
+
+
+class ItemSearchIndex:
+    """
+    Índice invertido de items: término -> (IDs con el término en el nombre, IDs con el término solo en la descripción)
+
+    Las listas son sets para que las intersecciones y uniones de la búsqueda
+    corran en C. El vocabulario se mantiene ordenado para resolver prefijos
+    con búsqueda binaria. Las actualizaciones llegan desde el hilo del
+    listener y las búsquedas desde el pool del storage; ambas toman el mismo
+    lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        self._vocabulary: List[str] = []
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        # _loaded cambia en el hilo del listener; _ready es el mismo estado visto desde el event loop
+        self._loaded = False
+        self._ready = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unsubscribe = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def terms(self) -> int:
+        return len(self._vocabulary)
+
+    # =================== ACTUALIZACIÓN ===================
+
+    async def start(self):
+        """Se suscribe a los cambios de items; el índice queda listo con la carga inicial"""
+        self._loop = asyncio.get_running_loop()
+        self._unsubscribe = await storage.watch("items", self._on_changes, include_initial=True)
+
+    def stop(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def _on_changes(self, changes: List[DocumentChange]):
+        """Aplica un lote del listener (el primero es la colección completa)"""
+        if not self._loaded:
+            self._loaded = True
+            self.load(change.data for change in changes if change.data is not None)
+            logger.info("Índice de búsqueda cargado con %d productos", len(self))
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                # El event loop ya se cerró (apagado de la aplicación)
+                pass
+            return
+        self.apply(changes)
+
+    def load(self, rows):
+        """Reemplaza el contenido del índice con los documentos dados"""
+        postings: Dict[str, Tuple[Set[str], Set[str]]] = {}
+        docs = {}
+        doc_terms = {}
+        for data in rows:
+            item_id = data["id"]
+            terms = document_terms(data)
+            docs[item_id] = data
+            doc_terms[item_id] = terms
+            for term, weight in terms.items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = (set(), set())
+                posting[0 if weight == NAME_WEIGHT else 1].add(item_id)
+        with self._lock:
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._docs = docs
+            self._doc_terms = doc_terms
+
+    def apply(self, changes: List[DocumentChange]):
+        """Actualiza el índice con un lote de cambios"""
+        with self._lock:
+            for change in changes:
+                self._remove(change.id)
+                if change.data is not None:
+                    self._add(change.id, change.data)
+
+    def _add(self, item_id: str, data: Dict[str, Any]):
+        terms = document_terms(data)
+        self._docs[item_id] = data
+        self._doc_terms[item_id] = terms
+        for term, weight in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = (set(), set())
+                bisect.insort(self._vocabulary, term)
+            posting[0 if weight == NAME_WEIGHT else 1].add(item_id)
+
+    def _remove(self, item_id: str):
+        self._docs.pop(item_id, None)
+        for term in self._doc_terms.pop(item_id, ()):
+            name_ids, description_ids = self._postings[term]
+            name_ids.discard(item_id)
+            description_ids.discard(item_id)
+            if not name_ids and not description_ids:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    # =================== BÚSQUEDA ===================
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Términos que coinciden con una palabra de la consulta y su factor (requiere el lock)"""
+        matches = [(token, 1.0)] if token in self._postings else []
+        if len(token) >= MIN_PREFIX_LENGTH:
+            vocabulary = self._vocabulary
+            index = bisect.bisect_right(vocabulary, token)
+            while index < len(vocabulary) and vocabulary[index].startswith(token):
+                matches.append((vocabulary[index], PREFIX_FACTOR))
+                index += 1
+        return matches
+
+    def _levels(self, token: str) -> List[Tuple[float, Set[str]]]:
+        """
+        Grupos de IDs que coinciden con una palabra, del puntaje más alto al más bajo (requiere el lock)
+
+        Cada término que coincide aporta un grupo por campo con puntaje
+        peso del campo × factor × rareza del término.
+        """
+        levels = []
+        for term, factor in self._expand(token):
+            name_ids, description_ids = self._postings[term]
+            idf = math.log(1 + len(self._docs) / (len(name_ids) + len(description_ids)))
+            if name_ids:
+                levels.append((NAME_WEIGHT * factor * idf, name_ids))
+            if description_ids:
+                levels.append((DESCRIPTION_WEIGHT * factor * idf, description_ids))
+        levels.sort(key=lambda level: level[0], reverse=True)
+        return levels
+
+    @staticmethod
+    def _top_single(levels: List[Tuple[float, Set[str]]], limit: int) -> List[Tuple[str, float]]:
+        """Mejores IDs de una sola palabra: se recorren los grupos hasta juntar `limit`, sin puntuar el resto"""
+        ranked = []
+        seen: Set[str] = set()
+        for score, ids in levels:
+            new = ids - seen
+            if not new:
+                continue
+            missing = limit - len(ranked)
+            # Los empates se resuelven por ID para que el resultado sea estable
+            chosen = sorted(new) if len(new) <= missing else heapq.nsmallest(missing, new)
+            ranked.extend((item_id, score) for item_id in chosen)
+            if len(ranked) >= limit:
+                break
+            seen |= new
+        return ranked
+
+    @staticmethod
+    def _top_many(token_levels: List[List[Tuple[float, Set[str]]]], matching: Set[str],
+                  limit: int) -> List[Tuple[str, float]]:
+        """Mejores IDs de varias palabras: suma, por palabra, el mejor grupo de cada ID que coincide con todas"""
+        scores = dict.fromkeys(matching, 0.0)
+        for levels in token_levels:
+            seen: Set[str] = set()
+            for score, ids in levels:
+                hits = (ids & matching) - seen
+                for item_id in hits:
+                    scores[item_id] += score
+                seen |= hits
+        return heapq.nsmallest(limit, scores.items(), key=lambda entry: (-entry[1], entry[0]))
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Documentos que coinciden con todas las palabras de `query`, del más relevante al menos"""
+        tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return []
+
+        with self._lock:
+            token_levels = [self._levels(token) for token in tokens]
+            if not all(token_levels):
+                return []
+
+            if len(token_levels) == 1:
+                ranked = self._top_single(token_levels[0], limit)
+            else:
+                # Productos que coinciden con todas las palabras, empezando por la más selectiva
+                matching = None
+                for levels in sorted(token_levels, key=lambda levels: sum(len(ids) for _, ids in levels)):
+                    ids = set().union(*(ids for _, ids in levels))
+                    matching = ids if matching is None else matching & ids
+                    if not matching:
+                        return []
+                ranked = self._top_many(token_levels, matching, limit)
+            results = [(score, self._docs[item_id]) for item_id, score in ranked]
+
+        results.sort(key=lambda result: (-result[0], result[1]["name"]))
+        return [data for _, data in results]
+
+
+# Instancia global usada por el router de items
+item_search_index = ItemSearchIndex()
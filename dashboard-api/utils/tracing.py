@@ -0,0 +1,179 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Requests más lentos que este umbral se registran con el detalle de sus spans
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+# Headers de respuesta con los totales del request
+READS_HEADER = "X-Storage-Reads"
+WRITES_HEADER = "X-Storage-Writes"
+CALLS_HEADER = "X-Storage-Calls"
+STORAGE_MS_HEADER = "X-Storage-Ms"
+TRACE_HEADERS = [READS_HEADER, WRITES_HEADER, CALLS_HEADER, STORAGE_MS_HEADER, "Server-Timing"]
+
+
+class Span:
+    """Una llamada al storage: operación, documentos leídos/escritos por colección y duración"""
+
+    __slots__ = ("operation", "reads", "writes", "duration", "ok")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.reads: Dict[str, int] = {}
+        self.writes: Dict[str, int] = {}
+        self.duration = 0.0
+        self.ok = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "reads": self.reads,
+            "writes": self.writes,
+            "ms": round(self.duration * 1000, 3),
+            "ok": self.ok,
+        }
+
+
+class RequestTrace:
+    """Spans de storage de un request (las llamadas concurrentes llegan desde el pool de hilos)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._unscoped: Optional[Span] = None
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def unscoped(self) -> Span:
+        """Span para lecturas hechas fuera de una llamada envuelta (ej. storage.run en la exportación)"""
+        with self._lock:
+            if self._unscoped is None:
+                self._unscoped = Span("unscoped")
+                self.spans.append(self._unscoped)
+            return self._unscoped
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "calls": sum(1 for span in spans if span is not self._unscoped),
+            "reads": sum(sum(span.reads.values()) for span in spans),
+            "writes": sum(sum(span.writes.values()) for span in spans),
+            "storage_ms": round(sum(span.duration for span in spans) * 1000, 3),
+        }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("storage_span", default=None)
+
+
+def _active_span() -> Optional[Span]:
+    span = _current_span.get()
+    if span is not None:
+        return span
+    trace = _current_trace.get()
+    return trace.unscoped() if trace is not None else None
+
+
+def count_reads(collection: str, count: int = 1):
+    """Suma documentos leídos al span actual (no hace nada fuera de un request)"""
+    span = _active_span()
+    if span is not None and count:
+        span.reads[collection] = span.reads.get(collection, 0) + count
+
+
+def count_writes(collection: str, count: int = 1):
+    """Suma documentos escritos al span actual (no hace nada fuera de un request)"""
+    span = _active_span()
+    if span is not None and count:
+        span.writes[collection] = span.writes.get(collection, 0) + count
+
+
+@contextmanager
+def storage_span(operation: str):
+    """Registra una llamada al storage como span del request actual"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    span = Span(operation)
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except Exception:
+        span.ok = False
+        raise
+    finally:
+        span.duration = time.perf_counter() - start
+        _current_span.reset(token)
+        trace.add(span)
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que agrupa los spans de storage de cada request
+
+    Retorna los totales en headers (lecturas, escrituras, llamadas y tiempo en
+    storage) y registra los requests lentos con el detalle de cada span.
+    """
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        status_code = 500
+        event_stream = False
+
+        async def send_with_totals(message):
+            nonlocal status_code, event_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                event_stream = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+                totals = trace.totals()
+                headers = MutableHeaders(scope=message)
+                headers.append(READS_HEADER, str(totals["reads"]))
+                headers.append(WRITES_HEADER, str(totals["writes"]))
+                headers.append(CALLS_HEADER, str(totals["calls"]))
+                headers.append(STORAGE_MS_HEADER, str(totals["storage_ms"]))
+                headers.append("Server-Timing", f"storage;dur={totals['storage_ms']}")
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_totals)
+        finally:
+            _current_trace.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Un stream SSE dura lo que el cliente siga conectado: no es un request lento
+            if duration_ms >= self.slow_request_ms and not event_stream:
+                route = scope.get("route")
+                logger.warning(json.dumps({
+                    "event": "slow_request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route.path if route is not None else None,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    **trace.totals(),
+                    "spans": [span.to_dict() for span in trace.spans],
+                }, ensure_ascii=False))
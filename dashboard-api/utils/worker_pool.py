@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+
+def _timed_call(func, *args) -> Tuple[Any, float]:
+    """Ejecuta la función en el worker y retorna también el instante en que empezó"""
+    started_at = time.time()
+    return func(*args), started_at
+
+
+class WorkerPool:
+    """
+    Ejecuta trabajo de CPU (bcrypt, imágenes) fuera del event loop en un pool acotado.
+
+    Un semáforo limita las operaciones en curso; las que superan el límite
+    esperan en cola y ese tiempo de espera queda registrado en las métricas.
+    Con un pool de procesos las funciones y sus argumentos se envían por
+    pickle, así que deben estar definidas a nivel de módulo.
+    """
+
+    def __init__(self, name: str, kind: str, workers: int, max_concurrency: int):
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {
+            "completed": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "queue_seconds_total": 0.0,
+            "queue_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix=self.name
+                )
+            else:
+                # "spawn" evita heredar los hilos de Firestore al hacer fork
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func, *args):
+        """Ejecuta func(*args) en el pool respetando el límite de concurrencia"""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+
+        self._stats["waiting"] += 1
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            self._stats["waiting"] -= 1
+
+        self._stats["in_flight"] += 1
+        try:
+            result, started_at = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._stats["in_flight"] -= 1
+            self._get_semaphore().release()
+
+        queue_seconds = max(started_at - submitted_at, 0.0)
+        self._stats["completed"] += 1
+        self._stats["queue_seconds_total"] += queue_seconds
+        self._stats["queue_seconds_max"] = max(self._stats["queue_seconds_max"], queue_seconds)
+        self._stats["run_seconds_total"] += time.time() - started_at
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del pool (tiempos en segundos)"""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            **self._stats,
+        }
+
+    def shutdown(self):
+        """Libera los workers del pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
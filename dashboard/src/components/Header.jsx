@@ -4,6 +4,7 @@ import { Link, useNavigate } from 'react-router-dom';
 import '@szhsin/react-menu/dist/index.css';
 import '@szhsin/react-menu/dist/transitions/slide.css';
 import { useAuthStore } from "../stores/authStore";
+import { avatarSrc } from "../utils/avatar";
 import toast from "react-hot-toast";
 
 const Header = () => {
@@ -31,7 +32,8 @@ const Header = () => {
   // Avatar a mostrar
   const getAvatarSrc = () => {
     if (currentUser?.avatar) {
-      return currentUser.avatar;
+      // El avatar más grande del header es de 40px
+      return avatarSrc(currentUser.avatar, 80);
     }
     return `https://ui-avatars.com/api/?name=${getInitials()}&background=0D8ABC&color=fff`;
   };
@@ -42,12 +42,12 @@ export const AvatarSection = ({
           type="file"
           id="avatar"
           className="hidden"
-          accept="image/png,image/jpeg,image/jpg"
+          accept="image/png,image/jpeg,image/webp"
           onChange={onFileChange}
         />
       </div>
       <p className="text-gray-500 text-sm">
-        Tipos permitidos: PNG, JPG, JPEG (máx. 2MB)
+        Tipos permitidos: PNG, JPG, WebP (máx. 5MB)
       </p>
     </div>
   </div>
@@ -0,0 +1,30 @@
+import { useEffect } from 'react';
+import { useInventoryStore } from '../stores/inventoryStore';
+import { useCategoryStore } from '../stores/categoryStore';
+import { subscribeInventory } from '../services/inventoryStream';
+
+// Hook que mantiene productos y categorías al día con los cambios del backend
+export const useInventoryStream = () => {
+    useEffect(() => {
+        const unsubscribe = subscribeInventory({
+            onReady: (reconnected) => {
+                // La carga inicial la hace cada página; tras una reconexión se pudieron perder cambios
+                if (!reconnected) {
+                    return;
+                }
+                useCategoryStore.getState().fetchCategories().catch(() => {});
+                useInventoryStore.getState().fetchItems().catch(() => {});
+            },
+            onChange: (collection, changes) => {
+                if (collection === 'items') {
+                    useInventoryStore.getState().applyChanges(changes);
+                } else if (collection === 'categories') {
+                    useCategoryStore.getState().applyChanges(changes);
+                }
+            },
+        });
+        return unsubscribe;
+    }, []);
+};
+
+export default useInventoryStream;
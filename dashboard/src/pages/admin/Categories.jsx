@@ -3,6 +3,7 @@ import { RiAddLine, RiPencilLine, RiDeleteBinLine } from "react-icons/ri";
 import { useCategoryStore } from "../../stores/categoryStore";
 import { useInventoryStore } from "../../stores/inventoryStore";
 import CategoryModal from "./CategoryModal"; 
+import { useInventoryStream } from "../../hooks/useInventoryStream";
 import toast from "react-hot-toast";
 
 const Categories = () => {
@@ -11,6 +12,9 @@ const Categories = () => {
   const { categories, loading, fetchCategories, deleteCategory } = useCategoryStore();
   const items = useInventoryStore((state) => state.items);
 
+  // Cambios hechos desde otros dashboards
+  useInventoryStream();
+
   // Cargar categorías al montar el componente
   useEffect(() => {
     fetchCategories().catch((error) => {
@@ -1,34 +1,42 @@
-import React, { useEffect } from "react";
+import React, { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 import { RiBarChart2Line, RiArchiveStackLine, RiUserLine, RiShoppingCartLine } from "react-icons/ri";
-import { useInventoryStore } from "../../stores/inventoryStore";
-import { useCategoryStore } from "../../stores/categoryStore";
+import { itemService } from "../../services/itemService";
 import { useAuthStore } from "../../stores/authStore";
+import { statsService } from "../../services/statsService";
 import { formatCurrency } from "../../utils/formatters";
 
 const Dashboard = () => {
-  const items = useInventoryStore((state) => state.items);
-  const fetchItems = useInventoryStore((state) => state.fetchItems);
-  const categories = useCategoryStore((state) => state.categories);
-  const fetchCategories = useCategoryStore((state) => state.fetchCategories);
+  const [lowStockPreview, setLowStockPreview] = useState([]);
+  const [hasMoreLowStock, setHasMoreLowStock] = useState(false);
   const currentUser = useAuthStore((state) => state.user);
+  const [summary, setSummary] = useState(null);
 
   // Cargar datos al montar el componente
   useEffect(() => {
     const loadData = async () => {
       try {
-        await Promise.all([fetchItems(), fetchCategories()]);
+        const [summaryData, lowStockPage] = await Promise.all([
+          statsService.getSummary(),
+          itemService.getLowStock({ limit: 5 }),
+        ]);
+        setSummary(summaryData);
+        setLowStockPreview(lowStockPage.items);
+        setHasMoreLowStock(Boolean(lowStockPage.next_cursor));
       } catch (error) {
         console.error("Error loading dashboard data:", error);
       }
     };
     loadData();
-  }, [fetchItems, fetchCategories]);
+  }, []);
 
-  const totalItems = items.length;
-  const totalCategories = categories.length;
-  const lowStockItems = items.filter(item => item.quantity < 5).length;
-  const totalValue = items.reduce((sum, item) => sum + (item.price * item.quantity), 0);
+  // Totales calculados en el backend
+  const totalItems = summary?.totalItems ?? 0;
+  const totalCategories = summary?.totalCategories ?? 0;
+  // Cuenta con el umbral general; la vista previa aplica el umbral de cada categoría
+  const lowStockItems = summary?.lowStockItems ?? 0;
+  const lowStockThreshold = summary?.lowStockThreshold ?? 5;
+  const totalValue = summary?.totalValue ?? 0;
 
   const statsCards = [
     {
@@ -46,7 +54,7 @@ const Dashboard = () => {
       link: "/dashboard/categorias"
     },
     {
-      title: "Stock Bajo",
+      title: `Stock Bajo (menos de ${lowStockThreshold} u., umbral general)`,
       value: lowStockItems,
       icon: <RiBarChart2Line className="text-2xl" />,
       color: "bg-yellow-500",
@@ -93,16 +101,14 @@ const Dashboard = () => {
       </div>
 
       {/* Productos con stock bajo */}
-      {lowStockItems > 0 && (
+      {lowStockPreview.length > 0 && (
         <div className="bg-secondary-100 p-8 rounded-xl">
-          <h2 className="text-xl font-bold text-white mb-4">
+          <h2 className="text-xl font-bold text-white mb-1">
             ⚠️ Productos con Stock Bajo
           </h2>
+          <p className="text-gray-400 text-sm mb-4">Según el umbral de stock bajo de cada categoría</p>
           <div className="space-y-2">
-            {items
-              .filter(item => item.quantity < 5)
-              .slice(0, 5)
-              .map((item) => (
+            {lowStockPreview.map((item) => (
                 <div key={item.id} className="flex justify-between items-center py-2 px-4 bg-secondary-900 rounded-lg">
                   <span className="text-gray-300">{item.name}</span>
                   <span className="text-yellow-400 font-semibold">
@@ -111,9 +117,9 @@ const Dashboard = () => {
                 </div>
               ))}
           </div>
-          {lowStockItems > 5 && (
+          {hasMoreLowStock && (
             <Link 
-              to="/dashboard/inventario" 
+              to="/dashboard/stock-bajo" 
               className="inline-block mt-4 text-primary hover:text-primary/80 transition-colors"
             >
               Ver todos los productos con stock bajo →
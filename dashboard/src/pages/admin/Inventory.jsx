@@ -2,8 +2,10 @@ import React, { useState, useEffect } from "react";
 import { RiAddLine, RiPencilLine, RiDeleteBinLine } from "react-icons/ri";
 import { useInventoryStore } from "../../stores/inventoryStore";
 import { useCategoryStore } from "../../stores/categoryStore";
+import { itemService } from "../../services/itemService";
 import { formatCurrency } from "../../utils/formatters";
 import InventoryModal from "../../components/InventoryModal";
+import { useInventoryStream } from "../../hooks/useInventoryStream";
 import toast from "react-hot-toast";
 
 const Inventory = () => {
@@ -11,9 +13,13 @@ const Inventory = () => {
   const [itemToEdit, setItemToEdit] = useState(null);
   const [search, setSearch] = useState("");
   const [debounced, setDebounced] = useState("");
+  const [searchIds, setSearchIds] = useState(null);
   const { items, loading, fetchItems, deleteItem } = useInventoryStore();
   const { categories, fetchCategories } = useCategoryStore();
 
+  // Cambios hechos desde otros dashboards
+  useInventoryStream();
+
   // Cargar items y categorías al montar el componente
   useEffect(() => {
     const loadData = async () => {
@@ -39,19 +45,42 @@ const Inventory = () => {
     return () => clearTimeout(id);
   }, [search]);
 
+  // Búsqueda en el backend (sin tildes, por prefijo y ordenada por relevancia)
+  useEffect(() => {
+    if (!debounced) {
+      setSearchIds(null);
+      return;
+    }
+    let cancelled = false;
+    itemService
+      .search(debounced)
+      .then((results) => !cancelled && setSearchIds(results.map((item) => item.id)))
+      .catch(() => !cancelled && setSearchIds(null));
+    return () => {
+      cancelled = true;
+    };
+  }, [debounced]);
+
   const filteredItems = React.useMemo(() => {
     if (!debounced) return items;
-    return items.filter((item) => {
-      const name = (item.name || "").toLowerCase();
-      const desc = (item.description || "").toLowerCase();
-      const cat = getCategoryName(item.categoryId).toLowerCase();
-      return (
-        name.includes(debounced) ||
-        desc.includes(debounced) ||
-        cat.includes(debounced)
-      );
-    });
-  }, [debounced, items, categories]);
+    const categoryMatches = (item) =>
+      getCategoryName(item.categoryId).toLowerCase().includes(debounced);
+
+    // Sin respuesta del backend se filtra localmente
+    if (!searchIds) {
+      return items.filter((item) => {
+        const name = (item.name || "").toLowerCase();
+        const desc = (item.description || "").toLowerCase();
+        return name.includes(debounced) || desc.includes(debounced) || categoryMatches(item);
+      });
+    }
+
+    // Resultados del backend con los datos actuales del store, y después los que coinciden por categoría
+    const byId = new Map(items.map((item) => [item.id, item]));
+    const found = new Set(searchIds);
+    const ranked = searchIds.map((id) => byId.get(id)).filter(Boolean);
+    return [...ranked, ...items.filter((item) => !found.has(item.id) && categoryMatches(item))];
+  }, [debounced, searchIds, items, categories]);
 
   const handleOpenModal = () => {
     setItemToEdit(null);
@@ -1,31 +1,36 @@
 import React, { useState, useEffect } from "react";
 import { RiAlertLine } from "react-icons/ri";
-import { useInventoryStore } from "../../stores/inventoryStore";
-import { useCategoryStore } from "../../stores/categoryStore";
+import { itemService } from "../../services/itemService";
 import { formatCurrency } from "../../utils/formatters";
 import toast from "react-hot-toast";
 
+const PAGE_SIZE = 50;
+
 const LowStock = () => {
-  const { items, loading, fetchItems } = useInventoryStore();
-  const { categories } = useCategoryStore();
+  const [lowStockItems, setLowStockItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(false);
 
-  // Cargar items al montar el componente
-  useEffect(() => {
-    fetchItems().catch((error) => {
+  // Cargar una página de productos con stock bajo (el filtro se hace en el backend)
+  const loadPage = async (cursor) => {
+    setLoading(true);
+    try {
+      const page = await itemService.getLowStock({ limit: PAGE_SIZE, cursor });
+      setLowStockItems((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+    } catch (error) {
       console.error("Error loading items:", error);
       toast.error("Error al cargar productos", { duration: 3000 });
-    });
-  }, []);
-
-  // Filtrar productos con stock bajo (< 5)
-  const lowStockItems = items.filter((item) => item.quantity < 5);
-
-  // Obtener nombre de categoría por ID
-  const getCategoryName = (categoryId) => {
-    const category = categories.find((cat) => cat.id === categoryId);
-    return category ? category.name : "Sin categoría";
+    } finally {
+      setLoading(false);
+    }
   };
 
+  // Cargar la primera página al montar el componente
+  useEffect(() => {
+    loadPage(null);
+  }, []);
+
   return (
     <>
       <div className="bg-secondary-100 p-8 rounded-xl mb-8">
@@ -33,7 +38,7 @@ const LowStock = () => {
           <RiAlertLine className="text-yellow-500 text-2xl" />
           <h1 className="text-xl text-white">Productos con Stock Bajo</h1>
         </div>
-        <p className="text-gray-400 mb-4">Productos con cantidad menor a 5 unidades</p>
+        <p className="text-gray-400 mb-4">Productos con cantidad menor al umbral de su categoría (5 unidades por defecto)</p>
         <hr className="my-8 border-gray-500/30" />
 
         <div className="overflow-x-auto">
@@ -74,7 +79,7 @@ const LowStock = () => {
                       </div>
                     </td>
                     <td className="py-2 px-4 text-gray-300">
-                      {getCategoryName(item.categoryId)}
+                      {item.categoryName}
                     </td>
                     <td className="py-2 px-4 text-center">
                       <span
@@ -99,6 +104,16 @@ const LowStock = () => {
           </table>
         </div>
 
+        {nextCursor && (
+          <button
+            onClick={() => loadPage(nextCursor)}
+            disabled={loading}
+            className="mt-4 text-primary hover:text-primary/80 transition-colors disabled:opacity-50"
+          >
+            {loading ? "Cargando..." : "Cargar más"}
+          </button>
+        )}
+
         {lowStockItems.length > 0 && (
           <div className="mt-6 p-4 bg-yellow-500/10 border border-yellow-500/30 rounded-lg">
             <p className="text-yellow-500 text-sm">
@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useCallback } from "react";
 import { useAuthStore } from "../../stores/authStore";
 import { profileService } from "../../services/profileService";
-import { compressImage } from "../../utils/imageCompression";
+import { avatarSrc, validateAvatarFile } from "../../utils/avatar";
 import {
   AvatarSection,
   EditFieldSection,
@@ -43,7 +43,7 @@ const Profile = () => {
         email: currentUser.email || "",
       }));
       if (currentUser.avatar) {
-        setAvatarPreview(currentUser.avatar);
+        setAvatarPreview(avatarSrc(currentUser.avatar, 224));
       }
     }
   }, [currentUser]);
@@ -55,20 +55,26 @@ const Profile = () => {
     return (first + last).toUpperCase() || "U";
   }, [currentUser]);
 
-  // Handle file upload with compression
-  const handleFileChange = useCallback(async (e) => {
+  // Handle file selection (the server crops and resizes on upload)
+  const handleFileChange = useCallback((e) => {
     const file = e.target.files?.[0];
     if (!file) return;
 
     try {
-      const compressedDataUrl = await compressImage(file);
-      setAvatarPreview(compressedDataUrl);
-      setAvatar(compressedDataUrl);
+      validateAvatarFile(file);
+      setAvatarPreview(URL.createObjectURL(file));
+      setAvatar(file);
     } catch (error) {
       toast.error(error.message || "Error al procesar imagen");
     }
   }, []);
 
+  // Release the local preview URL when it is replaced
+  useEffect(() => {
+    if (!avatarPreview?.startsWith("blob:")) return;
+    return () => URL.revokeObjectURL(avatarPreview);
+  }, [avatarPreview]);
+
   // Handle input change
   const handleInputChange = useCallback((field, value) => {
     setFormData((prev) => ({ ...prev, [field]: value }));
@@ -125,10 +131,12 @@ const Profile = () => {
 
       try {
         setLoading((prev) => ({ ...prev, profile: true }));
+        if (avatar) {
+          await profileService.uploadAvatar(currentUser?.id, avatar);
+        }
         const updateData = {
           name: formData.name.trim(),
           lastName: formData.lastName.trim(),
-          ...(avatar && { avatar }),
         };
 
         const updatedUser = await profileService.updateProfile(
@@ -139,7 +147,7 @@ const Profile = () => {
         setAvatar(null);
         toast.success("Perfil actualizado correctamente");
       } catch (error) {
-        toast.error(error.message || "Error al actualizar perfil");
+        toast.error(error.detail || error.message || "Error al actualizar perfil");
       } finally {
         setLoading((prev) => ({ ...prev, profile: false }));
       }
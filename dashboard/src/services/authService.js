@@ -30,7 +30,8 @@ export const authService = {
     },
 
     // Obtener datos del usuario actual (validando JWT)
-    getCurrentUser: async () => {
+    // El avatar solo se pide cuando se va a mostrar (el header lo usa al cargar la app)
+    getCurrentUser: async ({ includeAvatar = true } = {}) => {
         try {
             const token = localStorage.getItem('auth-token');
             if (!token) {
@@ -38,7 +39,9 @@ export const authService = {
             }
 
             // Llamar a /auth/me - el interceptor agrega el Bearer token automáticamente
-            const response = await api.get('/auth/me');
+            const response = await api.get('/auth/me', {
+                params: includeAvatar ? { include_avatar: true } : {},
+            });
             return response.data;
         } catch (error) {
             throw error;
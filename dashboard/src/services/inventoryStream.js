@@ -0,0 +1,33 @@
+import { API_URL } from './api';
+
+// Suscripción a los cambios del inventario en vivo (Server-Sent Events)
+// onReady(reconnected): conexión lista; tras una reconexión conviene recargar los listados
+// onChange(collection, changes): lote de cambios de 'items' o 'categories'
+export const subscribeInventory = ({ onReady, onChange }) => {
+    if (typeof EventSource === 'undefined') {
+        return () => {};
+    }
+
+    const source = new EventSource(`${API_URL}/stream/inventory`);
+    let connected = false;
+
+    source.addEventListener('ready', () => {
+        onReady?.(connected);
+        connected = true;
+    });
+
+    source.addEventListener('change', (event) => {
+        try {
+            const { collection, changes } = JSON.parse(event.data);
+            onChange?.(collection, changes);
+        } catch (error) {
+            console.error('Error procesando cambio del inventario:', error);
+        }
+    });
+
+    // Con 'reset' el servidor cierra el stream; EventSource se reconecta solo y vuelve a recibir 'ready'
+
+    return () => source.close();
+};
+
+export default subscribeInventory;
@@ -12,6 +12,33 @@ export const itemService = {
         }
     },
 
+    // Obtener items filtrados y ordenados en el servidor
+    // filters: { price_min, price_max, qty_min, qty_lt, category_in: [ids], sort: 'name' | '-price' | ..., limit, cursor }
+    getFiltered: async ({ category_in, ...filters } = {}) => {
+        try {
+            const params = Object.fromEntries(
+                Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+            );
+            if (category_in?.length) params.category_in = category_in.join(',');
+            const response = await api.get('/items', { params });
+            return response.data;
+        } catch (error) {
+            console.error('Error filtering items:', error);
+            throw error.response?.data || { detail: 'Error al filtrar productos' };
+        }
+    },
+
+    // Buscar items por nombre y descripción, ordenados por relevancia
+    search: async (query, limit = 100) => {
+        try {
+            const response = await api.get('/items/search', { params: { q: query, limit } });
+            return response.data;
+        } catch (error) {
+            console.error('Error searching items:', error);
+            throw error.response?.data || { detail: 'Error al buscar productos' };
+        }
+    },
+
     // Obtener un item por ID
     getById: async (id) => {
         try {
@@ -32,6 +59,18 @@ export const itemService = {
         }
     },
 
+    // Obtener una página de items con stock bajo ({ items, next_cursor })
+    getLowStock: async ({ limit = 50, cursor } = {}) => {
+        try {
+            const response = await api.get('/items/low-stock', {
+                params: { limit, ...(cursor ? { cursor } : {}) },
+            });
+            return response.data;
+        } catch (error) {
+            throw error.response?.data || { detail: 'Error al obtener productos con stock bajo' };
+        }
+    },
+
     // Crear nuevo item
     create: async (itemData) => {
         try {
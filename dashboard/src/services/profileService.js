@@ -25,6 +25,18 @@ export const profileService = {
         }
     },
 
+    // Subir avatar (el cuerpo es el archivo; responde el usuario con la URL del avatar)
+    uploadAvatar: async (userId, file) => {
+        try {
+            const response = await api.put(`/profile/${userId}/avatar`, file, {
+                headers: { 'Content-Type': file.type },
+            });
+            return response.data;
+        } catch (error) {
+            throw error.response?.data || { detail: 'Error al subir avatar' };
+        }
+    },
+
     // Cambiar email
     updateEmail: async (userId, newEmail) => {
         try {
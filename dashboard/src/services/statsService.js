@@ -0,0 +1,13 @@
+import api from './api';
+
+export const statsService = {
+    // Obtener resumen del dashboard (totales calculados en el backend)
+    getSummary: async () => {
+        try {
+            const response = await api.get('/stats/summary');
+            return response.data;
+        } catch (error) {
+            throw error.response?.data || { detail: 'Error al obtener resumen' };
+        }
+    },
+};
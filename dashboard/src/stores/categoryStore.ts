@@ -6,6 +6,13 @@ export interface Category {
   name: string;
 }
 
+// Cambio recibido por el stream de inventario (data es null cuando se eliminó)
+export interface CategoryChange {
+  type: "added" | "modified" | "removed";
+  id: string;
+  data: Omit<Category, "id"> | null;
+}
+
 interface CategoryState {
   categories: Category[];
   loading: boolean;
@@ -16,6 +23,7 @@ interface CategoryState {
   updateCategory: (id: string, name: string) => Promise<void>;
   deleteCategory: (id: string) => Promise<void>;
   setCategories: (categories: Category[]) => void;
+  applyChanges: (changes: CategoryChange[]) => void;
 }
 
 export const useCategoryStore = create<CategoryState>()(
@@ -43,7 +51,8 @@ export const useCategoryStore = create<CategoryState>()(
       try {
         const newCategory = await categoryService.create(name);
         set((state) => ({
-          categories: [...state.categories, newCategory],
+          // El stream pudo haberla agregado antes de que llegara la respuesta
+          categories: [...state.categories.filter((cat) => cat.id !== newCategory.id), newCategory],
           loading: false,
         }));
       } catch (error: any) {
@@ -89,5 +98,19 @@ export const useCategoryStore = create<CategoryState>()(
 
     // Establecer categorías manualmente
     setCategories: (categories) => set({ categories }),
+
+    // Aplicar cambios recibidos en vivo desde el backend
+    applyChanges: (changes) =>
+      set((state) => {
+        const byId = new Map(state.categories.map((cat) => [cat.id, cat]));
+        for (const change of changes) {
+          if (change.type === "removed" || !change.data) {
+            byId.delete(change.id);
+          } else {
+            byId.set(change.id, { id: change.id, name: change.data.name });
+          }
+        }
+        return { categories: Array.from(byId.values()) };
+      }),
   })
 );
@@ -10,6 +10,13 @@ export interface Item {
   categoryId: string;
 }
 
+// Cambio recibido por el stream de inventario (data es null cuando se eliminó)
+export interface ItemChange {
+  type: "added" | "modified" | "removed";
+  id: string;
+  data: Omit<Item, "id"> | null;
+}
+
 interface InventoryState {
   items: Item[];
   loading: boolean;
@@ -21,6 +28,7 @@ interface InventoryState {
   updateItem: (id: string, item: Omit<Item, 'id'>) => Promise<void>;
   deleteItem: (id: string) => Promise<void>;
   setItems: (items: Item[]) => void;
+  applyChanges: (changes: ItemChange[]) => void;
 }
 
 export const useInventoryStore = create<InventoryState>()(
@@ -48,7 +56,8 @@ export const useInventoryStore = create<InventoryState>()(
       try {
         const newItem = await itemService.create(item);
         set((state) => ({
-          items: [...state.items, newItem],
+          // El stream pudo haberlo agregado antes de que llegara la respuesta
+          items: [...state.items.filter((i) => i.id !== newItem.id), newItem],
           loading: false,
         }));
       } catch (error: any) {
@@ -94,5 +103,20 @@ export const useInventoryStore = create<InventoryState>()(
 
     // Establecer items manualmente
     setItems: (items) => set({ items }),
+
+    // Aplicar cambios recibidos en vivo desde el backend
+    applyChanges: (changes) =>
+      set((state) => {
+        const byId = new Map(state.items.map((item) => [item.id, item]));
+        for (const change of changes) {
+          if (change.type === "removed" || !change.data) {
+            byId.delete(change.id);
+          } else {
+            const { name, description, quantity, price, categoryId } = change.data;
+            byId.set(change.id, { id: change.id, name, description: description ?? "", quantity, price, categoryId });
+          }
+        }
+        return { items: Array.from(byId.values()) };
+      }),
   })
 );
\ No newline at end of file
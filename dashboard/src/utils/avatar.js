@@ -0,0 +1,22 @@
+import { API_URL } from "../services/api";
+
+// Tipos y tamaño aceptados por PUT /profile/{id}/avatar (el servidor recorta y redimensiona)
+export const AVATAR_TYPES = ["image/png", "image/jpeg", "image/webp"];
+export const AVATAR_MAX_MB = 5;
+
+export const validateAvatarFile = (file) => {
+  if (!AVATAR_TYPES.includes(file.type)) {
+    throw new Error("Solo se permiten archivos PNG, JPG o WebP");
+  }
+  if (file.size > AVATAR_MAX_MB * 1024 * 1024) {
+    throw new Error(`El archivo no debe superar ${AVATAR_MAX_MB}MB`);
+  }
+};
+
+// URL para mostrar un avatar con `size` píxeles de lado (las de la API son relativas a ella)
+export const avatarSrc = (avatar, size) => {
+  if (avatar?.startsWith("/avatars/")) {
+    return `${API_URL}${avatar}?size=${size}`;
+  }
+  return avatar;
+};